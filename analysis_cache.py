@@ -0,0 +1,315 @@
+import os
+import re
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from config import (
+    ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_DISK, ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_DISK_MAX_BYTES
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts):
+    """将任意可JSON序列化的键组成部分转换为稳定的哈希字符串"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(file_path):
+    """源文件指纹：绝对路径、大小和修改时间"""
+    stat = os.stat(file_path)
+    return [os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns]
+
+
+def estimate_size(obj):
+    """估算缓存对象占用的字节数（主要统计numpy数组）"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(estimate_size(v) for v in obj.values()) + 64 * len(obj)
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_size(v) for v in obj) + 8 * len(obj)
+    return 64
+
+
+def freeze(obj):
+    """把对象中的numpy数组设为只读，调用方修改缓存返回的数组时会报错而不是破坏缓存"""
+    if isinstance(obj, np.ndarray):
+        obj.setflags(write=False)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            freeze(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            freeze(value)
+    return obj
+
+
+class AnalysisCache:
+    """分析结果两级缓存：进程内LRU（按字节预算）+ 磁盘持久化
+
+    每个条目属于一个命名空间（如 事件_探测器）和一个版本（如 数据文件指纹 + 处理参数），
+    写入新版本时同一命名空间下的旧版本会从内存和磁盘中清除。磁盘缓存按字节预算
+    删除最久未访问的文件。缓存的数组是只读的。
+    """
+
+    def __init__(self, max_bytes=ANALYSIS_CACHE_MAX_BYTES, cache_dir=ANALYSIS_CACHE_DIR,
+                 use_disk=ANALYSIS_CACHE_DISK, disk_max_bytes=ANALYSIS_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.use_disk = use_disk
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, namespace, version)
+        self._bytes = 0
+        self._disk_files = None  # 文件名 -> [字节数, 最近访问时间]，首次访问磁盘时扫描目录
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self._pending = {}
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+
+    @staticmethod
+    def _safe_name(name):
+        return re.sub(r'[^A-Za-z0-9_-]', '_', str(name))
+
+    def _disk_path(self, key, namespace, version):
+        return os.path.join(
+            self.cache_dir,
+            f"{self._safe_name(namespace)}.{self._safe_name(version)}.{key}.pkl"
+        )
+
+    def get(self, key, namespace='default', version='0'):
+        """读取缓存，依次查找内存和磁盘，未命中返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return entry[0]
+
+        if self.use_disk:
+            path = self._disk_path(key, namespace, version)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        value = freeze(pickle.load(f))
+                    self._put_memory(key, value, namespace, version)
+                    self._touch_disk(path)
+                    with self._lock:
+                        self.stats['disk_hits'] += 1
+                    logger.info(f"命中磁盘分析缓存: {os.path.basename(path)}")
+                    return value
+                except Exception as e:
+                    logger.warning(f"读取磁盘分析缓存失败 {path}: {e}")
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, value, namespace='default', version='0'):
+        """写入缓存（内存和磁盘），并清除同一命名空间下的旧版本；value中的数组被设为只读"""
+        freeze(value)
+        self._put_memory(key, value, namespace, version)
+        if self.use_disk:
+            self._put_disk(key, value, namespace, version)
+
+    @contextmanager
+    def key_lock(self, key):
+        """同一个键的互斥锁，用于保证并发请求只计算一次"""
+        with self._lock:
+            lock, waiters = self._pending.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._pending[key] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiters = self._pending[key]
+                if waiters <= 1:
+                    del self._pending[key]
+                else:
+                    self._pending[key] = (lock, waiters - 1)
+
+    def get_or_compute(self, key, compute, namespace='default', version='0'):
+        """读取缓存，未命中时调用compute计算并写入
+
+        同一个键的并发请求只计算一次，其余请求等待结果。
+        """
+        value = self.get(key, namespace, version)
+        if value is not None:
+            return value
+
+        with self.key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+
+            value = compute()
+            if value is not None:
+                self.put(key, value, namespace, version)
+            return value
+
+    def invalidate(self, namespace):
+        """清除某个命名空间下的全部缓存"""
+        safe = self._safe_name(namespace)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if self._safe_name(e[2]) == safe]:
+                self._drop(key)
+        if self.use_disk and os.path.isdir(self.cache_dir):
+            with self._lock:
+                for name in [n for n in self._disk_index() if n.startswith(safe + '.')]:
+                    self._remove_disk(name)
+
+    def clear(self):
+        """清空内存缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _put_memory(self, key, value, namespace, version):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"分析结果过大 ({size} bytes)，不放入内存缓存")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            # 同一命名空间的旧版本已经失效
+            for old_key in [k for k, e in self._entries.items()
+                            if e[2] == namespace and e[3] != version]:
+                self._drop(old_key)
+
+            self._entries[key] = (value, size, namespace, version)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                old_key = next(iter(self._entries))
+                self._drop(old_key)
+                self.stats['evictions'] += 1
+
+    def _disk_index(self):
+        """磁盘缓存文件索引，调用方需持有锁"""
+        if self._disk_files is None:
+            self._scan_disk()
+        return self._disk_files
+
+    def _scan_disk(self):
+        """扫描缓存目录重建索引（包括其他进程写入的文件），调用方需持有锁"""
+        files = {}
+        if os.path.isdir(self.cache_dir):
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.pkl'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files[entry.name] = [stat.st_size, stat.st_mtime]
+        self._disk_files = files
+        self._disk_bytes = sum(size for size, _ in files.values())
+
+    def _touch_disk(self, path):
+        """记录磁盘缓存文件的访问时间（文件修改时间），用于按最久未访问淘汰"""
+        try:
+            os.utime(path)
+        except OSError:
+            return
+        with self._lock:
+            entry = self._disk_index().get(os.path.basename(path))
+            if entry is not None:
+                entry[1] = time.time()
+
+    def _remove_disk(self, name):
+        """删除磁盘缓存文件并更新索引，调用方需持有锁"""
+        entry = self._disk_index().pop(name, None)
+        if entry is not None:
+            self._disk_bytes -= entry[0]
+        self._remove_file(os.path.join(self.cache_dir, name))
+
+    def _put_disk(self, key, value, namespace, version):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key, namespace, version)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except Exception:
+                self._remove_file(tmp_path)
+                raise
+
+            name = os.path.basename(path)
+            prefix = self._safe_name(namespace) + '.'
+            current = prefix + self._safe_name(version) + '.'
+            with self._lock:
+                files = self._disk_index()
+                old = files.pop(name, None)
+                if old is not None:
+                    self._disk_bytes -= old[0]
+                files[name] = [os.path.getsize(path), time.time()]
+                self._disk_bytes += files[name][0]
+
+                # 同一命名空间的旧版本（旧数据文件或旧处理参数）已经失效
+                for stale in [n for n in files if n.startswith(prefix) and not n.startswith(current)]:
+                    self._remove_disk(stale)
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._evict_disk(keep=name)
+        except Exception as e:
+            logger.warning(f"写入磁盘分析缓存失败: {e}")
+
+    def _evict_disk(self, keep=None):
+        """删除最久未访问的磁盘缓存文件，直到总大小不超过预算，调用方需持有锁"""
+        # 重新扫描目录，计入其他进程写入的文件
+        self._scan_disk()
+        for name, _ in sorted(self._disk_files.items(), key=lambda item: item[1][1]):
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            if name == keep:
+                continue
+            self._remove_disk(name)
+            self.stats['disk_evictions'] += 1
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes,
+                        max_bytes=self.max_bytes, disk_bytes=self._disk_bytes,
+                        disk_max_bytes=self.disk_max_bytes)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """进程内共享的分析结果缓存"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AnalysisCache()
+        return _shared_cache
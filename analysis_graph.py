@@ -0,0 +1,115 @@
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStage:
+    """分析流程中的一个命名阶段：依赖若干上游输出，产生一个输出"""
+
+    __slots__ = ('name', 'func', 'deps', 'description')
+
+    def __init__(self, name, func, deps=(), description=''):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.description = description
+
+    def __repr__(self):
+        return f"AnalysisStage({self.name!r}, deps={self.deps})"
+
+
+class AnalysisGraph:
+    """由命名阶段组成的依赖图
+
+    阶段的依赖可以是其他阶段，也可以是运行时提供的输入（如 file_path）。
+    新的阶段（时频图、白化、相干性等）通过 add_stage 注册，直接复用已有阶段的输出。
+    observer 为可选的回调 observer(阶段名, 耗时秒数)，每个阶段计算完成后调用。
+    """
+
+    def __init__(self, observer=None):
+        self._stages = OrderedDict()
+        self.observer = observer
+
+    def add_stage(self, name, func, deps=(), description='', replace=False):
+        """注册一个阶段，func按deps的顺序接收各依赖的输出"""
+        if name in self._stages and not replace:
+            raise ValueError(f"分析阶段已存在: {name}")
+        self._stages[name] = AnalysisStage(name, func, deps, description)
+        return self._stages[name]
+
+    def has_stage(self, name):
+        return name in self._stages
+
+    def stage_names(self):
+        return list(self._stages.keys())
+
+    def stage(self, name):
+        try:
+            return self._stages[name]
+        except KeyError:
+            raise ValueError(f"未知的分析阶段: {name}") from None
+
+    def plan(self, targets, available=()):
+        """计算得到targets需要依次运行的阶段（拓扑顺序，已有的输出不再计算）"""
+        available = set(available)
+        order = []
+        state = {}  # name -> 'visiting' | 'done'
+
+        def visit(name, path):
+            if name in available or state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"分析阶段存在循环依赖: {' -> '.join(path + [name])}")
+            stage = self.stage(name)
+            state[name] = 'visiting'
+            for dep in stage.deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for target in targets:
+            visit(target, [])
+        return order
+
+    def run(self, **inputs):
+        """创建一次分析运行，inputs为运行时输入"""
+        return AnalysisRun(self, inputs)
+
+
+class AnalysisRun:
+    """一次分析运行：按需计算阶段输出，每个阶段在一次运行中最多计算一次"""
+
+    def __init__(self, graph, inputs):
+        self.graph = graph
+        self.values = dict(inputs)
+        self.timings = OrderedDict()
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        return name in self.values
+
+    def get(self, name):
+        """获取阶段输出，未计算时先计算其依赖"""
+        if name not in self.values:
+            self.compute(name)
+        return self.values[name]
+
+    def compute(self, *targets):
+        """计算多个目标阶段，共享的中间结果只计算一次"""
+        for name in self.graph.plan(targets, self.values.keys()):
+            stage = self.graph.stage(name)
+            start = time.perf_counter()
+            self.values[name] = stage.func(*(self.values[dep] for dep in stage.deps))
+            self.timings[name] = time.perf_counter() - start
+            logger.debug(f"分析阶段 {name} 完成，耗时 {self.timings[name]:.4f} 秒")
+            if self.graph.observer is not None:
+                self.graph.observer(name, self.timings[name])
+        return self
+
+    def computed_stages(self):
+        """本次运行中实际计算过的阶段（按计算顺序）"""
+        return list(self.timings.keys())
@@ -0,0 +1,131 @@
+import io
+import json
+import base64
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# API支持的数组传输格式：
+# json - 数组转换为JSON数字列表（默认）
+# b64  - 数组编码为base64类型化数组 {'dtype': 'f4', 'bdata': ...}（与Plotly的类型化数组格式相同）
+# npz  - 二进制NPZ响应，数组保持原始精度，其余字段以JSON存放在 __metadata__ 中
+TRANSPORT_FORMATS = ('json', 'b64', 'npz')
+NPZ_MIMETYPE = 'application/x-npz'
+
+# 可以无损缩小到float32的数值范围（非零值的绝对值），超出时保留float64（例如 ~1e-46 的PSD）
+_FLOAT32_TINY = float(np.finfo(np.float32).tiny)
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# 类型化数组使用的 dtype 代码
+_TYPED_ARRAY_CODES = {
+    np.dtype(np.float32): 'f4', np.dtype(np.float64): 'f8',
+    np.dtype(np.int8): 'i1', np.dtype(np.int16): 'i2', np.dtype(np.int32): 'i4',
+    np.dtype(np.uint8): 'u1', np.dtype(np.uint16): 'u2', np.dtype(np.uint32): 'u4'
+}
+
+
+def transport_array(array):
+    """传输用的数组：浮点数在float32范围内时转为float32，64位整数在范围内时转为int32"""
+    array = np.asarray(array)
+    if array.dtype.kind == 'f':
+        if array.dtype == np.float32 or array.size == 0:
+            return array.astype(np.float32, copy=False)
+        magnitude = np.abs(array[np.isfinite(array)])
+        nonzero = magnitude[magnitude > 0]
+        if nonzero.size == 0 or (nonzero.min() >= _FLOAT32_TINY and nonzero.max() <= _FLOAT32_MAX):
+            return array.astype(np.float32)
+        return array.astype(np.float64, copy=False)
+    if array.dtype.kind in 'iu':
+        if array.size == 0 or (array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max):
+            return array.astype(np.int32, copy=False)
+        return array.astype(np.float64)
+    if array.dtype.kind == 'b':
+        return array.astype(np.uint8)
+    return array
+
+
+def to_typed_array(array):
+    """把数组编码为base64类型化数组，多维数组附带 shape（如 "3, 4"）"""
+    array = np.ascontiguousarray(transport_array(array))
+    code = _TYPED_ARRAY_CODES.get(array.dtype)
+    if code is None:
+        return array.tolist()
+    little_endian = array.astype(array.dtype.newbyteorder('<'), copy=False)
+    spec = {'dtype': code, 'bdata': base64.b64encode(little_endian).decode('ascii')}
+    if array.ndim > 1:
+        spec['shape'] = ', '.join(str(size) for size in array.shape)
+    return spec
+
+
+def from_typed_array(spec):
+    """解码base64类型化数组"""
+    dtype = np.dtype(spec['dtype']).newbyteorder('<')
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=dtype)
+    if 'shape' in spec:
+        array = array.reshape([int(size) for size in str(spec['shape']).split(',')])
+    return array
+
+
+def encode_arrays(obj, encoder):
+    """递归地用encoder转换对象中的numpy数组，numpy标量转换为Python标量"""
+    if isinstance(obj, np.ndarray):
+        return encoder(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, dict):
+        return {k: encode_arrays(v, encoder) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode_arrays(item, encoder) for item in obj]
+    return obj
+
+
+def split_arrays(obj):
+    """把嵌套对象中的numpy数组替换为 {'__array__': "a/b/c"} 占位符，返回 (元数据, {路径: 数组})"""
+    arrays = {}
+
+    def strip(value, path):
+        if isinstance(value, np.ndarray):
+            arrays[path] = value
+            return {'__array__': path}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, dict):
+            return {k: strip(v, f"{path}/{k}" if path else str(k)) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [strip(item, f"{path}/{index}") for index, item in enumerate(value)]
+        return value
+
+    return strip(obj, ''), arrays
+
+
+def is_array_placeholder(value):
+    return isinstance(value, dict) and set(value) == {'__array__'}
+
+
+def restore_arrays(metadata, resolve):
+    """split_arrays 的逆操作，resolve(路径) 返回对应的数组"""
+    if is_array_placeholder(metadata):
+        return resolve(metadata['__array__'])
+    if isinstance(metadata, dict):
+        return {k: restore_arrays(v, resolve) for k, v in metadata.items()}
+    if isinstance(metadata, list):
+        return [restore_arrays(item, resolve) for item in metadata]
+    return metadata
+
+
+def pack_npz(obj):
+    """把嵌套字典打包为NPZ字节串：数组按 "a/b/c" 路径存放，其余字段以JSON存放在 __metadata__"""
+    metadata, arrays = split_arrays(obj)
+    buffer = io.BytesIO()
+    np.savez(buffer, __metadata__=np.array(json.dumps(metadata, ensure_ascii=False)), **arrays)
+    return buffer.getvalue()
+
+
+def unpack_npz(data):
+    """pack_npz 的逆操作"""
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files if name != '__metadata__'}
+        metadata = json.loads(str(archive['__metadata__']))
+    return restore_arrays(metadata, arrays.__getitem__)
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import fnmatch
+import logging
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import ANALYSIS_CHECKPOINT_FILE, BATCH_ANALYSIS_WORKERS
+from database import DataManager
+from data_processor import DataProcessor
+from analysis_cache import AnalysisCache, make_cache_key, file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def _analyze_event_worker(event_name):
+    """批量分析工作函数：分析单个事件并保存结果
+
+    工作进程内部按顺序分析各探测器（避免嵌套进程池），
+    分析结果只写入磁盘缓存，不占用工作进程的内存缓存。
+    """
+    start = time.perf_counter()
+    processor = DataProcessor(result_cache=AnalysisCache(max_bytes=0), executor='serial')
+    results = processor.analyze_event_data(event_name)
+    if not results or not results.get('detectors'):
+        return {'status': 'failed', 'seconds': time.perf_counter() - start, 'error': '没有可分析的数据'}
+
+    output_dir = processor.save_analysis_results(event_name, results)
+    return {
+        'status': 'completed' if output_dir else 'failed',
+        'seconds': time.perf_counter() - start,
+        'output_dir': output_dir,
+        'detectors': list(results['detectors'].keys())
+    }
+
+
+class BatchAnalyzer:
+    """全目录批量分析：多进程分析所有已下载事件，支持断点续跑"""
+
+    def __init__(self, workers=BATCH_ANALYSIS_WORKERS, checkpoint_file=ANALYSIS_CHECKPOINT_FILE, force=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_file = checkpoint_file
+        self.force = force
+        self.db = DataManager()
+        self.processor = DataProcessor(use_result_cache=False, executor='serial')
+
+    def load_checkpoint(self):
+        """加载断点记录"""
+        try:
+            if os.path.exists(self.checkpoint_file):
+                with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"加载断点记录失败: {e}")
+        return {}
+
+    def save_checkpoint(self, checkpoint):
+        """原子写入断点记录"""
+        directory = os.path.dirname(self.checkpoint_file)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    def event_fingerprint(self, event_name):
+        """事件数据文件和处理参数的指纹，任一变化都需要重新分析"""
+        event_info = self.processor.get_event_info(event_name)
+        if not event_info:
+            return None
+        files = []
+        for file_info in event_info.get('data_files', []):
+            file_path = file_info.get('file_path')
+            if file_path and os.path.exists(file_path):
+                files.append([file_info.get('detector'), file_fingerprint(file_path)])
+        if not files:
+            return None
+        return make_cache_key(sorted(files), self.processor.processing_params())
+
+    def select_events(self, event_names=None, pattern=None):
+        """选择要分析的事件：指定列表或全部事件，再按通配符过滤"""
+        names = list(event_names) if event_names else list(self.db.load_events().keys())
+        if pattern:
+            names = [name for name in names if fnmatch.fnmatch(name, pattern)]
+        return names
+
+    def run(self, event_names=None, pattern=None):
+        """运行批量分析，返回每个事件的结果摘要"""
+        checkpoint = self.load_checkpoint()
+        summary = {}
+        pending = {}
+
+        for event_name in self.select_events(event_names, pattern):
+            fingerprint = self.event_fingerprint(event_name)
+            if fingerprint is None:
+                summary[event_name] = {'status': 'no_data', 'seconds': 0.0}
+                continue
+
+            done = checkpoint.get(event_name)
+            if (not self.force and done and done.get('fingerprint') == fingerprint
+                    and done.get('output_dir') and os.path.isdir(done['output_dir'])):
+                summary[event_name] = {'status': 'up_to_date', 'seconds': 0.0}
+                continue
+            pending[event_name] = fingerprint
+
+        logger.info(f"批量分析: {len(pending)} 个事件待分析, {len(summary)} 个跳过, 工作进程: {self.workers}")
+        if not pending:
+            return summary
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+            futures = {executor.submit(_analyze_event_worker, name): name for name in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                event_name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"批量分析事件 {event_name} 失败: {e}", exc_info=True)
+                    result = {'status': 'failed', 'seconds': 0.0, 'error': str(e)}
+
+                summary[event_name] = result
+                logger.info(f"[{i}/{len(pending)}] {event_name}: {result['status']} ({result['seconds']:.2f} 秒)")
+
+                # 每完成一个事件就写入断点，进程中断后可从断点继续
+                if result['status'] == 'completed':
+                    checkpoint[event_name] = {
+                        'fingerprint': pending[event_name],
+                        'output_dir': result.get('output_dir'),
+                        'detectors': result.get('detectors', []),
+                        'seconds': round(result['seconds'], 3),
+                        'completed_at': datetime.now().isoformat()
+                    }
+                    self.save_checkpoint(checkpoint)
+
+        return summary
+
+
+def print_summary(summary, total_seconds):
+    """打印每个事件的耗时汇总"""
+    print(f"\n{'事件':<24} {'状态':<12} {'耗时(秒)':>10}")
+    print("-" * 50)
+    for event_name, result in sorted(summary.items(), key=lambda item: -item[1]['seconds']):
+        print(f"{event_name:<24} {result['status']:<12} {result['seconds']:>10.2f}")
+    print("-" * 50)
+
+    counts = {}
+    for result in summary.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    analyzed = [r['seconds'] for r in summary.values() if r['status'] == 'completed']
+    print("状态统计: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    if analyzed:
+        print(f"分析耗时: 合计 {sum(analyzed):.2f} 秒, 平均 {sum(analyzed) / len(analyzed):.2f} 秒, "
+              f"最长 {max(analyzed):.2f} 秒")
+    print(f"总耗时: {total_seconds:.2f} 秒")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据处理各阶段基准测试
+
+在确定性的合成事件数据（aLIGO设计灵敏度色噪声 + 0PN啁啾信号，4kHz和16kHz）上
+分别计时 load_data_file、preprocess_data、compute_fft、compute_psd、detect_peaks、
+compute_statistics 和 analyze_event_data（不使用结果缓存），结果写入JSON，
+指定 --baseline 时与保存的基线比较，耗时增加超过容差的阶段视为性能回退（退出码为1）。
+
+仓库中的 benchmark_baseline.json 是参考机器上的结果（环境信息记录在文件中），只作参考；
+耗时与机器相关，应先在本机保存基线再比较。
+
+用法:
+    python benchmark_analysis.py
+    python benchmark_analysis.py --save-baseline my_baseline.json
+    python benchmark_analysis.py --baseline my_baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from data_processor import DataProcessor
+from synthetic_data import generate_event_strain, write_gwosc_file
+
+# 计时的阶段，按处理顺序
+STAGES = ('load_data_file', 'preprocess_data', 'compute_fft', 'compute_psd',
+          'detect_peaks', 'compute_statistics', 'analyze_event_data')
+
+BENCHMARK_EVENT = 'GWBENCH'
+BENCHMARK_GPS = 1126259447
+
+
+class _SyntheticProcessor(DataProcessor):
+    """从合成数据目录读取事件信息的数据处理器，不读写真实的事件数据库"""
+
+    def __init__(self, events, **kwargs):
+        super().__init__(**kwargs)
+        self._events = events
+
+    def get_event_info(self, event_name):
+        event = self._events.get(event_name)
+        return dict(event) if event else None
+
+
+def _best_time(func, repeat):
+    """重复执行并返回最短耗时和最后一次的结果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _write_event(work_dir, sample_rate, duration, detectors=('H1', 'L1')):
+    """写入一个合成事件的各探测器数据文件，返回事件信息"""
+    data_files = []
+    for index, detector in enumerate(detectors):
+        strain = generate_event_strain(sample_rate, duration, seed=sample_rate + index)
+        file_path = write_gwosc_file(work_dir, detector, sample_rate, BENCHMARK_GPS,
+                                     duration=duration, data=strain)
+        data_files.append({'detector': detector, 'file_path': file_path})
+    return {
+        'event_id': BENCHMARK_EVENT,
+        'common_name': BENCHMARK_EVENT,
+        'gps_time': BENCHMARK_GPS + duration * 0.75,
+        'data_files': data_files
+    }
+
+
+def benchmark_rate(sample_rate, duration=32, repeat=3):
+    """对一个采样率计时各阶段，返回 {阶段: 秒}"""
+    work_dir = tempfile.mkdtemp(prefix='gwosc_bench_')
+    try:
+        event = _write_event(work_dir, sample_rate, duration)
+        processor = _SyntheticProcessor({BENCHMARK_EVENT: event}, use_strain_cache=False,
+                                        use_result_cache=False, executor='serial')
+        file_path = event['data_files'][0]['file_path']
+
+        timings = {}
+        timings['load_data_file'], series = _best_time(lambda: processor.load_data_file(file_path), repeat)
+        timings['preprocess_data'], processed = _best_time(lambda: processor.preprocess_data(series), repeat)
+        timings['compute_fft'], fft_result = _best_time(lambda: processor.compute_fft(processed), repeat)
+        timings['compute_psd'], psd_result = _best_time(lambda: processor.compute_psd(processed), repeat)
+        timings['detect_peaks'], _ = _best_time(lambda: processor.detect_peaks(processed), repeat)
+        timings['compute_statistics'], _ = _best_time(
+            lambda: processor.compute_statistics(processed, fft_result, psd_result), repeat)
+        timings['analyze_event_data'], results = _best_time(
+            lambda: processor.analyze_event_data(BENCHMARK_EVENT), repeat)
+        if not results or len(results['detectors']) != len(event['data_files']):
+            raise RuntimeError(f"{sample_rate} Hz 事件分析失败")
+
+        return {
+            'sample_rate': sample_rate,
+            'duration': duration,
+            'samples': len(series),
+            'seconds': {stage: round(timings[stage], 5) for stage in STAGES}
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmark(rates=(4096, 16384), duration=32, repeat=3):
+    """对每个采样率运行基准测试，返回可写入JSON的结果"""
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine()
+        },
+        'repeat': repeat,
+        'results': [benchmark_rate(rate, duration, repeat) for rate in rates]
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance=0.2):
+    """逐阶段与基线比较，返回比较结果列表（耗时比值超过 1+tolerance 为回退）"""
+    baseline_results = {(r['sample_rate'], r['duration']): r for r in baseline.get('results', [])}
+    comparisons = []
+    for result in report['results']:
+        reference = baseline_results.get((result['sample_rate'], result['duration']))
+        if reference is None:
+            continue
+        for stage, seconds in result['seconds'].items():
+            base = reference['seconds'].get(stage)
+            if not base:
+                continue
+            ratio = seconds / base
+            comparisons.append({
+                'sample_rate': result['sample_rate'],
+                'stage': stage,
+                'baseline_seconds': base,
+                'seconds': seconds,
+                'ratio': round(ratio, 3),
+                'regression': ratio > 1 + tolerance
+            })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据处理各阶段基准测试")
+    parser.add_argument('--rates', type=int, nargs='+', default=[4096, 16384], help='采样率（Hz，可指定多个）')
+    parser.add_argument('--duration', type=int, default=32, help='合成数据时长（秒）')
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段的重复次数（取最短耗时）')
+    parser.add_argument('--baseline', metavar='FILE', help='与该基线JSON比较（默认不比较）')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的耗时增加比例（默认0.2，即20%%）')
+    parser.add_argument('--save-baseline', metavar='FILE', help='将本次结果保存为基线JSON')
+    parser.add_argument('--output', metavar='FILE', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    report = run_benchmark(args.rates, args.duration, args.repeat)
+
+    print("=== 数据处理各阶段基准测试 ===")
+    print(f"{'阶段':<20}" + "".join(f"{str(r['sample_rate']) + ' Hz(秒)':>16}" for r in report['results']))
+    for stage in STAGES:
+        print(f"{stage:<20}" + "".join(f"{r['seconds'][stage]:>16.5f}" for r in report['results']))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != report['environment']:
+            print(f"\n注意: 基线的运行环境 {baseline.get('environment')} 与本机 {report['environment']} 不同，"
+                  "比较结果仅供参考")
+        comparisons = compare_with_baseline(report, baseline, args.tolerance)
+        report['baseline'] = args.baseline
+        report['comparison'] = comparisons
+        regressions = [c for c in comparisons if c['regression']]
+
+        print(f"\n与基线比较（{args.baseline}，容差 {args.tolerance:.0%}）:")
+        print(f"{'采样率':>8} {'阶段':<20} {'基线(秒)':>10} {'本次(秒)':>10} {'比值':>7}")
+        for c in comparisons:
+            flag = '  回退' if c['regression'] else ''
+            print(f"{c['sample_rate']:>8} {c['stage']:<20} {c['baseline_seconds']:>10.5f} "
+                  f"{c['seconds']:>10.5f} {c['ratio']:>6.2f}x{flag}")
+        if regressions:
+            print(f"发现 {len(regressions)} 个阶段性能回退")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存到: {args.save_baseline}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫吞吐量基准测试
+
+在本地模拟GWOSC服务器上运行 GWOSCCrawler.crawl_all_events，
+统计事件/秒和MB/秒，用于离线评估并发、缓存和重试等改动的效果。
+
+用法:
+    python benchmark_crawler.py --events 20 --latency 0.02 --error-rate 0.05
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from crawler import GWOSCCrawler
+from database import DataManager
+from mock_gwosc_server import MockGWOSCServer
+
+
+def run_benchmark(num_events=10, sample_rate=4096, detectors=('H1', 'L1'), latency=0.0,
+                  jitter=0.0, error_rate=0.0, request_delay=0.0, work_dir=None):
+    """运行一次爬虫基准测试，返回结果字典"""
+    cleanup = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='gwosc_bench_')
+    try:
+        db = DataManager(
+            events_file=os.path.join(work_dir, 'events.json'),
+            data_files_dir=os.path.join(work_dir, 'files'),
+            download_log_file=os.path.join(work_dir, 'download_log.json')
+        )
+        with MockGWOSCServer(num_events=num_events, detectors=detectors, sample_rate=sample_rate,
+                             latency=latency, jitter=jitter, error_rate=error_rate) as server:
+            # 预先生成应变文件，避免把合成数据的耗时计入爬虫吞吐量
+            for name in server.event_names():
+                for strain in server.event_detail(name)['events'][name]['strain']:
+                    server.strain_file(os.path.basename(strain['url']))
+
+            crawler = GWOSCCrawler(data_url=server.allevents_url, data_dir=work_dir,
+                                   db=db, request_delay=request_delay)
+            start = time.perf_counter()
+            success_count = crawler.crawl_all_events()
+            elapsed = time.perf_counter() - start
+            stats = dict(server.stats)
+
+        mb = stats['bytes_sent'] / (1024 * 1024)
+        return {
+            'events': num_events,
+            'detectors': list(detectors),
+            'sample_rate': sample_rate,
+            'latency': latency,
+            'error_rate': error_rate,
+            'files_downloaded': success_count,
+            'files_expected': num_events * len(detectors),
+            'requests': stats['requests'],
+            'errors_injected': stats['errors_injected'],
+            'megabytes': round(mb, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'events_per_second': round(num_events / elapsed, 3) if elapsed > 0 else None,
+            'mb_per_second': round(mb / elapsed, 3) if elapsed > 0 else None
+        }
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GWOSC爬虫吞吐量基准测试（本地模拟服务器）")
+    parser.add_argument('--events', type=int, default=10, help='合成事件数量')
+    parser.add_argument('--rate', type=int, default=4096, choices=[4096, 16384], help='应变数据采样率')
+    parser.add_argument('--detectors', default='H1,L1', help='探测器列表，逗号分隔')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回503错误的概率')
+    parser.add_argument('--delay', type=float, default=0.0, help='爬虫在事件之间的等待时间（秒）')
+    parser.add_argument('--output', metavar='FILE', help='将结果写入JSON文件')
+    parser.add_argument('--verbose', action='store_true', help='输出爬虫日志')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    result = run_benchmark(
+        num_events=args.events,
+        sample_rate=args.rate,
+        detectors=tuple(d.strip() for d in args.detectors.split(',') if d.strip()),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        request_delay=args.delay
+    )
+
+    print("=== 爬虫吞吐量基准测试 ===")
+    print(f"事件数量: {result['events']}  探测器: {','.join(result['detectors'])}  采样率: {result['sample_rate']} Hz")
+    print(f"下载文件: {result['files_downloaded']}/{result['files_expected']}  "
+          f"请求数: {result['requests']}  注入错误: {result['errors_injected']}")
+    print(f"传输数据: {result['megabytes']:.2f} MB  耗时: {result['elapsed_seconds']:.2f} 秒")
+    print(f"吞吐量: {result['events_per_second']} 事件/秒, {result['mb_per_second']} MB/秒")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应变文本解析基准测试
+
+在合成的4kHz和16kHz GWOSC txt文件上比较 np.loadtxt 和
+DataProcessor 的快速解析路径（不经过二进制缓存）。
+
+用法:
+    python benchmark_parser.py --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from data_processor import DataProcessor
+from synthetic_data import write_gwosc_file
+
+
+def _best_time(func, repeat):
+    """重复执行并返回最短耗时和最后一次的结果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(rates=(4096, 16384), repeat=3):
+    """对每个采样率生成一个文件并比较各解析方法，返回结果列表"""
+    processor = DataProcessor(use_strain_cache=False)
+    work_dir = tempfile.mkdtemp(prefix='gwosc_parser_')
+    results = []
+    try:
+        for rate in rates:
+            file_path = write_gwosc_file(work_dir, 'H1', rate, 1126259447)
+            loadtxt_time, reference = _best_time(lambda: np.loadtxt(file_path), repeat)
+            fast_time, fast_data = _best_time(lambda: processor._parse_strain_text(file_path), repeat)
+
+            results.append({
+                'sample_rate': rate,
+                'samples': int(len(reference)),
+                'loadtxt_seconds': round(loadtxt_time, 4),
+                'fast_parser_seconds': round(fast_time, 4),
+                'speedup_vs_loadtxt': round(loadtxt_time / fast_time, 2),
+                'max_relative_error': float(np.max(np.abs(fast_data - reference) / np.abs(reference)))
+            })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应变文本解析基准测试")
+    parser.add_argument('--repeat', type=int, default=3, help='每种方法的重复次数（取最短耗时）')
+    parser.add_argument('--output', metavar='FILE', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run_benchmark(repeat=args.repeat)
+
+    print("=== 应变文本解析基准测试 ===")
+    print(f"{'采样率':>8} {'数据点':>9} {'loadtxt':>9} {'快速解析':>9} {'加速比':>7} {'最大相对误差':>12}")
+    for r in results:
+        print(f"{r['sample_rate']:>8} {r['samples']:>9} {r['loadtxt_seconds']:>9.4f} "
+              f"{r['fast_parser_seconds']:>9.4f} {r['speedup_vs_loadtxt']:>6.2f}x "
+              f"{r['max_relative_error']:>12.2e}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
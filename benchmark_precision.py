@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数值精度报告与基准测试
+
+在合成的4kHz和16kHz应变数据上分别以 float64 和 float32 精度运行
+预处理、FFT、PSD和统计，报告各阶段相对双精度结果的误差、耗时和内存。
+
+用法:
+    python benchmark_precision.py --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from data_processor import DataProcessor
+from synthetic_data import generate_strain
+from timeseries import TimeSeries
+
+
+def _best_time(func, repeat):
+    """重复执行并返回最短耗时和最后一次的结果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _relative_error(value, reference):
+    """相对于参考结果最大绝对值的最大误差"""
+    value = np.asarray(value, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    scale = np.max(np.abs(reference))
+    return float(np.max(np.abs(value - reference)) / scale) if scale > 0 else 0.0
+
+
+def _run_precision(precision, series, repeat):
+    """以指定精度运行各阶段，返回耗时和结果"""
+    processor = DataProcessor(use_strain_cache=False, use_result_cache=False, executor='serial')
+    processor.precision = precision
+
+    timings = {}
+    timings['preprocess'], processed = _best_time(lambda: processor.preprocess_data(series), repeat)
+    timings['fft'], fft_result = _best_time(lambda: processor.compute_fft(processed), repeat)
+    timings['psd'], psd_result = _best_time(lambda: processor.compute_psd(processed), repeat)
+    stats = processor.compute_statistics(processed, fft_result, psd_result)
+    return {
+        'timings': timings,
+        'processed': processed.data,
+        'fft': fft_result[1],
+        'psd': psd_result[1],
+        'stats': stats,
+        'bytes': processed.data.nbytes + fft_result[1].nbytes + psd_result[1].nbytes
+    }
+
+
+def run_benchmark(rates=(4096, 16384), duration=32, repeat=3):
+    """对每个采样率比较 float64 与 float32 路径，返回结果列表"""
+    results = []
+    for rate in rates:
+        series = TimeSeries(generate_strain(rate, duration, seed=rate), rate)
+        reference = _run_precision('float64', series, repeat)
+        single = _run_precision('float32', series, repeat)
+
+        ref_time = reference['stats']['time_domain']
+        single_time = single['stats']['time_domain']
+        results.append({
+            'sample_rate': rate,
+            'samples': len(series),
+            'float64_seconds': {k: round(v, 4) for k, v in reference['timings'].items()},
+            'float32_seconds': {k: round(v, 4) for k, v in single['timings'].items()},
+            'float64_bytes': reference['bytes'],
+            'float32_bytes': single['bytes'],
+            'max_relative_error': {
+                'processed': _relative_error(single['processed'], reference['processed']),
+                'fft': _relative_error(single['fft'], reference['fft']),
+                'psd': _relative_error(single['psd'], reference['psd']),
+                'std': abs(single_time['std'] - ref_time['std']) / ref_time['std'],
+                'rms': abs(single_time['rms'] - ref_time['rms']) / ref_time['rms']
+            }
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数值精度报告与基准测试")
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段的重复次数（取最短耗时）')
+    parser.add_argument('--duration', type=int, default=32, help='合成数据时长（秒）')
+    parser.add_argument('--output', metavar='FILE', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run_benchmark(duration=args.duration, repeat=args.repeat)
+
+    print("=== float32 与 float64 精度对比 ===")
+    for r in results:
+        print(f"\n采样率 {r['sample_rate']} Hz, 数据点 {r['samples']}")
+        print(f"{'阶段':<12} {'float64(秒)':>12} {'float32(秒)':>12} {'加速比':>7}")
+        for stage, seconds in r['float64_seconds'].items():
+            single = r['float32_seconds'][stage]
+            print(f"{stage:<12} {seconds:>12.4f} {single:>12.4f} {seconds / single:>6.2f}x")
+        print(f"结果内存: float64 {r['float64_bytes'] / 1e6:.2f} MB, float32 {r['float32_bytes'] / 1e6:.2f} MB")
+        print("最大相对误差: " + ", ".join(f"{k}={v:.2e}" for k, v in r['max_relative_error'].items()))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式处理基准测试
+
+生成一个长时段的合成GWOSC txt文件，比较整段加载分析与按块流式分析
+（因果高通滤波、Welch功率谱累加、时域统计累加）的耗时和峰值内存（tracemalloc）。
+
+用法:
+    python benchmark_streaming.py --duration 512 --block 32
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from data_processor import DataProcessor
+from synthetic_data import write_gwosc_file
+
+
+def _measure(func):
+    """执行func，返回 (耗时, 峰值内存字节数, 结果)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run_benchmark(sample_rate=4096, duration=512, block_seconds=32):
+    """对一个长时段文件比较整段分析和流式分析，返回结果字典"""
+    processor = DataProcessor(use_strain_cache=False, use_result_cache=False, executor='serial')
+    work_dir = tempfile.mkdtemp(prefix='gwosc_stream_')
+    try:
+        file_path = write_gwosc_file(work_dir, 'H1', sample_rate, 1126259447, duration=duration)
+
+        def whole_file():
+            series = processor.load_data_file(file_path)
+            processed = processor.preprocess_data(series)
+            psd = processor.compute_psd(processed)
+            return processor.compute_statistics(processed, psd_result=psd)
+
+        whole_seconds, whole_peak, _ = _measure(whole_file)
+        stream_seconds, stream_peak, result = _measure(
+            lambda: processor.analyze_file_streaming(file_path, block_seconds=block_seconds))
+
+        return {
+            'sample_rate': sample_rate,
+            'duration': duration,
+            'samples': result['samples'],
+            'block_seconds': block_seconds,
+            'blocks': result['blocks'],
+            'whole_file_seconds': round(whole_seconds, 3),
+            'whole_file_peak_mb': round(whole_peak / 1e6, 2),
+            'streaming_seconds': round(stream_seconds, 3),
+            'streaming_peak_mb': round(stream_peak / 1e6, 2)
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式处理基准测试")
+    parser.add_argument('--rate', type=int, default=4096, help='采样率（Hz）')
+    parser.add_argument('--duration', type=int, default=512, help='合成数据时长（秒）')
+    parser.add_argument('--block', type=float, default=32, help='流式处理的块时长（秒）')
+    parser.add_argument('--output', metavar='FILE', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    r = run_benchmark(args.rate, args.duration, args.block)
+
+    print("=== 流式处理基准测试 ===")
+    print(f"数据: {r['sample_rate']} Hz x {r['duration']} 秒 ({r['samples']} 个数据点), "
+          f"块时长 {r['block_seconds']} 秒 ({r['blocks']} 块)")
+    print(f"{'模式':<10} {'耗时(秒)':>10} {'峰值内存(MB)':>14}")
+    print(f"{'整段':<10} {r['whole_file_seconds']:>10.3f} {r['whole_file_peak_mb']:>14.2f}")
+    print(f"{'流式':<10} {r['streaming_seconds']:>10.3f} {r['streaming_peak_mb']:>14.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(r, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,7 @@ GWOSC_DOWNLOAD_BASE = "https://gwosc.org/eventapi/json/"
 EVENTS_FILE = os.path.join(DATA_DIR, 'events.json')
 DATA_FILES_DIR = os.path.join(DATA_DIR, 'files')
 DOWNLOAD_LOG_FILE = os.path.join(DATA_DIR, 'download_log.json')
+ANALYSIS_CHECKPOINT_FILE = os.path.join(DATA_DIR, 'analysis_checkpoint.json')
 
 # Flask配置
 FLASK_HOST = '127.0.0.1'
@@ -31,10 +32,93 @@ FLASK_DEBUG = True
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
 CHUNK_SIZE = 8192
+CRAWL_DELAY = 1  # 每个事件之间的等待时间（秒）
 
 # 数据配置
 SAMPLE_RATE = 16384  # 16KHz
 DURATION = 32  # 32秒
+RESAMPLE_RATE = None  # 加载时重采样到的目标采样率，None表示保留文件原始采样率
+
+# 应变数据二进制缓存（.npy，按源文件路径、大小和修改时间索引）
+STRAIN_CACHE_ENABLED = True
+STRAIN_CACHE_DIR = os.path.join(CACHE_DIR, 'strain')
+
+# 分析结果缓存（进程内LRU + 磁盘持久化）
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 内存缓存字节预算
+ANALYSIS_CACHE_DISK = True
+ANALYSIS_CACHE_DIR = os.path.join(CACHE_DIR, 'analysis')
+ANALYSIS_CACHE_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 磁盘缓存字节预算，超出时删除最久未访问的文件
+
+# 分析结果文件（save_analysis_results）：数组存为NPZ，其余字段存为小的JSON元数据文件
+RESULT_STORE_COMPRESS = False  # True时使用压缩NPZ（应变噪声数据只能压缩约5%，保存耗时约增加50倍）；不压缩时加载对访问到的数组做内存映射
+
+# 多探测器并行分析
+ANALYSIS_EXECUTOR = 'process'  # 'process'（进程池）, 'thread'（线程池）或 'serial'（顺序执行）
+WEB_ANALYSIS_EXECUTOR = 'thread'  # Web服务（多线程）中使用的执行器，请求线程中不创建进程池
+ANALYSIS_PROCESS_START_METHOD = 'forkserver'  # 进程池的启动方式：'forkserver' 或 'spawn'（不从多线程的父进程fork）
+ANALYSIS_WORKERS = None  # 工作进程数，None表示 min(4, CPU核数)；单核机器上自动顺序执行
+BATCH_ANALYSIS_WORKERS = None  # 批量分析的工作进程数，None表示CPU核数
+
+# 数值精度：'float64'（默认）或 'float32'（滤波和变换使用单精度，内存和FFT耗时约减半）
+ANALYSIS_PRECISION = 'float64'
+
+# FFT后端：'scipy'（多线程scipy.fft）或 'pyfftw'（复用FFTW计划，未安装时回退到scipy）
+FFT_BACKEND = 'scipy'
+FFT_WORKERS = None  # FFT线程数，None表示CPU核数；进程池工作进程中为 CPU核数 // 工作进程数
+
+# 时频图（短时傅里叶谱图 / 常Q变换），按固定时长的时频块计算和缓存
+TF_TILE_DURATION = 1.0  # 时频块时长（秒）
+TF_DEFAULT_SPAN = 2.0  # 未指定时间窗口时，显示并合时刻前后的秒数
+TF_MAX_TILES = 64  # 单次请求最多计算的时频块数
+TF_FREQ_RANGE = (20, 1024)  # 默认频率范围（Hz）
+TF_SPECTROGRAM_SEGMENT = 1 / 16  # 谱图分段时长（秒），决定频率分辨率
+TF_Q = 8  # 常Q变换的Q值
+TF_Q_FREQUENCIES = 64  # 常Q变换的频率行数
+TF_Q_TIME_BINS = 128  # 每个时频块的常Q时间箱数
+TF_Q_PAD = 0.5  # 常Q变换在时频块两侧额外使用的数据（秒）
+
+# 白化：除以Welch噪声幅度谱密度，再施加SOS带通滤波
+WHITEN_PSD_SEGMENT = 4  # 噪声PSD估计的Welch分段时长（秒）
+WHITEN_BANDPASS = (30, 400)  # 带通频率范围（Hz）
+WHITEN_FILTER_ORDER = 4  # 带通Butterworth滤波器阶数
+
+# 匹配滤波模板库（0PN驻相近似啁啾模板，按啁啾质量对数均匀取值）
+MF_CHIRP_MASS_RANGE = (5, 60)  # 啁啾质量范围（太阳质量）
+MF_TEMPLATES = 128  # 模板数量
+MF_FREQ_RANGE = (20, 1024)  # 匹配滤波频率范围（Hz）
+MF_BATCH_SIZE = 32  # 每批同时处理的模板数（决定批量逆FFT的内存占用）
+
+# 探测器噪声图谱：按观测运行和探测器汇总的中位数功率谱密度
+NOISE_ATLAS_FILE = os.path.join(DATA_DIR, 'noise_atlas.npz')
+NOISE_ATLAS_FREQUENCIES = (10, 2048, 400)  # 存储用的对数频率网格：起始、终止频率（Hz）和点数
+# 观测运行的GPS时间范围
+OBSERVING_RUNS = [
+    ('O1', 1126051217, 1137254417),
+    ('O2', 1164556817, 1187733618),
+    ('O3a', 1238166018, 1253977218),
+    ('O3b', 1256655618, 1269363618),
+    ('O4a', 1368975618, 1389456018),
+    ('O4b', 1396796418, 1422118818),
+]
+WHITEN_PSD_SOURCE = 'data'  # 白化使用的噪声PSD：'data'（由数据本身估计）或 'atlas'（噪声图谱，缺失时回退到data）
+
+# 探测器间互相关和相干性（基于白化数据）
+CORRELATION_MAX_DELAY = 0.010  # 搜索的最大时间延迟（秒），略大于LIGO两站间的光传播时间
+CORRELATION_COHERENCE_RESOLUTION = 1.0  # 相干性的频率分辨率（Hz），相邻频率点分块平均
+
+# 峰值检测
+PEAK_TOP_K = 100  # 每个探测器保留的最高峰值数量
+PEAK_MIN_SEPARATION = 0.005  # 相邻峰值的最小间隔（秒）
+PEAK_API_LIMIT = 20  # API默认返回的峰值数量
+
+# 长时段数据的流式处理
+STREAM_BLOCK_SECONDS = 64  # 每块数据时长（秒），峰值内存只与块大小有关
+STREAM_MIN_DURATION = 1024  # 数据文件时长达到该值（秒）时，analyze_event_data 以流式分析计算 psd 和 stats，None表示始终整段分析
+
+# 分析阶段计时
+TIMING_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # 耗时直方图的桶上界（秒）
+SERVER_TIMING_ENABLED = True  # 在API响应中添加 Server-Timing 头，?debug=1 时在JSON中附加各阶段耗时
 
 # 日志配置
 LOG_LEVEL = 'INFO'
@@ -0,0 +1,116 @@
+import logging
+
+import numpy as np
+import scipy.fft
+
+logger = logging.getLogger(__name__)
+
+
+def detector_pairs(detectors):
+    """全部探测器对 (i, j)，i < j，返回探测器名称对列表和两个索引数组"""
+    first, second = np.triu_indices(len(detectors), k=1)
+    names = [(detectors[i], detectors[j]) for i, j in zip(first, second)]
+    return names, first, second
+
+
+def align_series(series):
+    """把各探测器的序列截取到共同的GPS时间区间
+
+    series 为 {探测器: (数据, 采样率, GPS起始时间)}；与第一个探测器采样率不同的探测器被跳过。
+    返回 (探测器列表, 数据[探测器, 时间], 采样率, GPS起始时间)，不足两个探测器时返回None。
+    """
+    detectors = list(series)
+    if not detectors:
+        return None
+    sample_rate = series[detectors[0]][1]
+    usable = []
+    for detector in detectors:
+        _, rate, _ = series[detector]
+        if rate != sample_rate:
+            logger.warning(f"探测器 {detector} 的采样率 {rate} Hz 与 {sample_rate} Hz 不同，跳过")
+            continue
+        usable.append(detector)
+    if len(usable) < 2:
+        return None
+
+    starts = {d: series[d][2] or 0.0 for d in usable}
+    start = max(starts.values())
+    end = min(starts[d] + len(series[d][0]) / sample_rate for d in usable)
+    n = int(np.floor((end - start) * sample_rate))
+    if n <= 0:
+        logger.warning("探测器数据没有共同的时间区间")
+        return None
+
+    rows = []
+    for detector in usable:
+        offset = int(round((start - starts[detector]) * sample_rate))
+        rows.append(np.asarray(series[detector][0][offset:offset + n], dtype=np.float64))
+    return usable, np.vstack(rows), sample_rate, start
+
+
+def _block_average(values, bins):
+    """沿最后一个轴按每bins个相邻频率点分块平均"""
+    blocks = values.shape[-1] // bins
+    return values[..., :blocks * bins].reshape(values.shape[:-1] + (blocks, bins)).mean(axis=-1)
+
+
+def correlate_detectors(data, sample_rate, max_delay=0.010, coherence_resolution=1.0,
+                        fft_backend=None):
+    """对所有探测器对一次性计算归一化互相关、时间延迟和相干性
+
+    data 为 [探测器, 时间] 的白化数据（已去均值、边缘加窗），每个探测器只做一次rfft，
+    所有探测器对的互谱由同一组频谱向量化得到：
+    - 互相关为互谱的逆FFT，只保留 ±max_delay 内的延迟；由于边缘已加窗到零，
+      循环相关在这些延迟上与线性相关一致；
+    - 相干性为互谱和自谱按 coherence_resolution（Hz）分块平均后的 |Sxy|^2 / (Sxx Syy)。
+    正的延迟表示信号先到达第二个探测器。
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = data.shape[1]
+    # 后端的rfft/irfft沿最后一个轴批量计算
+    rfft = fft_backend.rfft if fft_backend is not None else scipy.fft.rfft
+    irfft = fft_backend.irfft if fft_backend is not None else scipy.fft.irfft
+    spectra = rfft(data)
+
+    _, first, second = detector_pairs(list(range(len(data))))
+    cross = spectra[first] * np.conj(spectra[second])
+
+    # 互相关：逆FFT后按两个序列的能量归一化到 [-1, 1]
+    energy = np.sum(np.square(data), axis=1)
+    norm = np.sqrt(energy[first] * energy[second])
+    correlation = irfft(cross, n)
+    correlation /= np.where(norm > 0, norm, np.inf)[:, None]
+
+    max_lag = min(int(np.ceil(max_delay * sample_rate)), n // 2)
+    lags = np.arange(-max_lag, max_lag + 1)
+    window = correlation[:, lags]
+
+    # 绝对值最大处为时间延迟（探测器方位不同，相关可能为负），抛物线插值得到亚采样精度
+    peak = np.argmax(np.abs(window), axis=1)
+    rows = np.arange(len(window))
+    left = np.abs(window[rows, np.maximum(peak - 1, 0)])
+    center = np.abs(window[rows, peak])
+    right = np.abs(window[rows, np.minimum(peak + 1, len(lags) - 1)])
+    curvature = left - 2 * center + right
+    shift = np.divide(left - right, 2 * curvature, out=np.zeros_like(center), where=curvature < 0)
+    interior = (peak > 0) & (peak < len(lags) - 1)
+    shift = np.where(interior, shift, 0.0)
+
+    # 相干性：相邻频率点分块平均
+    duration = n / sample_rate
+    bins = max(1, int(round(coherence_resolution * duration)))
+    freqs = _block_average(scipy.fft.rfftfreq(n, 1 / sample_rate), bins)
+    auto = _block_average(np.square(np.abs(spectra)), bins)
+    cross_avg = _block_average(cross, bins)
+    denominator = auto[first] * auto[second]
+    coherence = np.divide(np.square(np.abs(cross_avg)), denominator,
+                          out=np.zeros_like(denominator), where=denominator > 0)
+
+    return {
+        'lags': lags / sample_rate,
+        'correlation': window,
+        'delay': (lags[peak] + shift) / sample_rate,
+        'peak_correlation': window[rows, peak],
+        'coherence_frequencies': freqs,
+        'coherence': coherence
+    }
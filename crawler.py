@@ -8,7 +8,7 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from config import (
     GWOSC_BASE_URL, GWOSC_DATA_URL, GWOSC_DOWNLOAD_BASE,
-    REQUEST_TIMEOUT, MAX_RETRIES, CHUNK_SIZE, DATA_DIR
+    REQUEST_TIMEOUT, MAX_RETRIES, CHUNK_SIZE, DATA_DIR, CRAWL_DELAY
 )
 from database import DataManager
 
@@ -17,19 +17,23 @@ logger = logging.getLogger(__name__)
 class GWOSCCrawler:
     """GWOSC数据爬虫类"""
     
-    def __init__(self):
+    def __init__(self, data_url=GWOSC_DATA_URL, data_dir=DATA_DIR, db=None, request_delay=CRAWL_DELAY):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
-        self.db = DataManager()
+        # 事件列表地址和数据目录可替换，便于指向本地模拟服务器
+        self.data_url = data_url
+        self.data_dir = data_dir
+        self.request_delay = request_delay
+        self.db = db if db is not None else DataManager()
     
     def get_events_list(self):
         """获取事件列表 - 使用JSON API"""
         try:
             logger.info("开始获取事件列表...")
             
-            response = self.session.get(GWOSC_DATA_URL, timeout=REQUEST_TIMEOUT)
+            response = self.session.get(self.data_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             events_data = response.json()
             
@@ -164,7 +168,7 @@ class GWOSCCrawler:
         """下载数据文件并自动解压"""
         try:
             # 创建事件目录
-            event_dir = os.path.join(DATA_DIR, event_name)
+            event_dir = os.path.join(self.data_dir, event_name)
             os.makedirs(event_dir, exist_ok=True)
             
             file_path = os.path.join(event_dir, filename)
@@ -303,7 +307,8 @@ class GWOSCCrawler:
                         success_count += 1
                 
                 # 添加延迟避免请求过快
-                time.sleep(1)
+                if self.request_delay:
+                    time.sleep(self.request_delay)
             
             logger.info(f"爬取完成: 成功处理 {success_count} 个数据文件")
             return success_count
@@ -317,8 +322,7 @@ class GWOSCCrawler:
         try:
             logger.info(f"开始下载事件数据: {event_name}")
             # 从数据库获取事件信息
-            from database import DataManager
-            db = DataManager()
+            db = self.db
             event = db.get_event_by_name(event_name)
             if not event:
                 logger.error(f"事件 {event_name} 不存在于数据库")
@@ -3,24 +3,410 @@ import pandas as pd
 import os
 import logging
 import json
+import hashlib
+import tempfile
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import rfftfreq
 import matplotlib.pyplot as plt
 import seaborn as sns
-from config import SAMPLE_RATE, DURATION, DATA_DIR, EVENTS_FILE
+from config import (
+    SAMPLE_RATE, DURATION, DATA_DIR, RESAMPLE_RATE,
+    STRAIN_CACHE_ENABLED, STRAIN_CACHE_DIR, ANALYSIS_CACHE_ENABLED,
+    ANALYSIS_EXECUTOR, ANALYSIS_WORKERS, ANALYSIS_PRECISION, ANALYSIS_PROCESS_START_METHOD,
+    TF_TILE_DURATION, TF_DEFAULT_SPAN, TF_MAX_TILES, TF_FREQ_RANGE, TF_SPECTROGRAM_SEGMENT,
+    TF_Q, TF_Q_FREQUENCIES, TF_Q_TIME_BINS, TF_Q_PAD,
+    WHITEN_PSD_SEGMENT, WHITEN_BANDPASS, WHITEN_FILTER_ORDER,
+    MF_CHIRP_MASS_RANGE, MF_TEMPLATES, MF_FREQ_RANGE, MF_BATCH_SIZE, STREAM_BLOCK_SECONDS, STREAM_MIN_DURATION,
+    PEAK_TOP_K, PEAK_MIN_SEPARATION, PEAK_API_LIMIT, WHITEN_PSD_SOURCE,
+    CORRELATION_MAX_DELAY, CORRELATION_COHERENCE_RESOLUTION
+)
+from analysis_cache import get_shared_cache, make_cache_key, file_fingerprint
+from timeseries import TimeSeries, parse_gwosc_filename
+from analysis_graph import AnalysisGraph
+from fft_backend import get_fft_backend
+from matched_filter import TemplateBank, matched_filter
+from noise_atlas import get_noise_atlas, observing_run
+from correlation import detector_pairs, align_series, correlate_detectors
+from event_catalog import get_event_catalog, get_file_manifest
+from moments import Moments
+from array_transport import encode_arrays, to_typed_array
+from result_store import save_results, load_results
+from stage_timing import span, record_span, begin_request_spans, end_request_spans
+from streaming import (
+    iter_text_blocks, iter_array_blocks, StreamingFilter, StreamingWelch
+)
+from time_frequency import (
+    TF_KINDS, tile_bounds, spectrogram_tile, q_frequencies, qtransform_tile, normalize_qtransform
+)
 
 logger = logging.getLogger(__name__)
 
+# 分析流程版本，修改处理算法时递增以使旧的缓存结果失效
+ANALYSIS_VERSION = 7
+# 只出现在缓存键中的派生参数，不对应可直接设置的处理器属性
+DERIVED_PARAMS = ('version', 'noise_atlas_version')
+
+# 可单独请求的分析产物及其在结果字典中的字段
+ANALYSIS_PRODUCTS = ('time_series', 'fft', 'psd', 'peaks', 'stats', 'whitened', 'matched_filter')
+# 长时段数据流式分析时可以计算的产物
+STREAM_PRODUCTS = ('psd', 'stats')
+# 未指定产物时计算的默认产物
+DEFAULT_PRODUCTS = ('time_series', 'fft', 'psd', 'peaks', 'stats')
+PRODUCT_FIELDS = {
+    'time_series': ('raw_data', 'processed_data', 'time'),
+    'fft': ('fft_frequencies', 'fft_magnitude'),
+    'psd': ('psd_frequencies', 'psd_power'),
+    'peaks': ('peaks',),
+    'stats': ('statistics',),
+    'whitened': ('whitened_data',),
+    'matched_filter': ('matched_filter',)
+}
+
+# 每个分析产物需要的流程阶段
+PRODUCT_STAGES = {
+    'time_series': ('raw', 'processed', 'time'),
+    'fft': ('fft',),
+    'psd': ('psd',),
+    'peaks': ('peaks',),
+    'stats': ('stats',),
+    'whitened': ('whitened',),
+    'matched_filter': ('matched_filter',)
+}
+
+# 支持的数值精度
+PRECISION_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32
+}
+
+# 峰值检测结果的列
+PEAK_COLUMNS = ('index', 'time', 'amplitude', 'prominence')
+
+def empty_peaks():
+    """没有峰值时的列式结果"""
+    return {
+        'index': np.empty(0, dtype=np.int64),
+        'time': np.empty(0),
+        'amplitude': np.empty(0),
+        'prominence': np.empty(0)
+    }
+
+def top_peaks(peaks, limit):
+    """按幅度绝对值取前limit个峰值，结果仍按时间排序"""
+    if peaks is None or limit is None or len(peaks['index']) <= limit:
+        return peaks
+    keep = np.sort(np.argsort(np.abs(peaks['amplitude']))[::-1][:limit])
+    return {column: peaks[column][keep] for column in PEAK_COLUMNS}
+
+@lru_cache(maxsize=32)
+def get_window(length, sym=True, dtype=np.float64):
+    """按(长度, 对称性, 数据类型)缓存的Hann窗（只读数组，所有处理阶段共享）"""
+    window = signal.windows.hann(length, sym=sym).astype(dtype, copy=False)
+    window.setflags(write=False)
+    return window
+
+@lru_cache(maxsize=32)
+def get_filter_sos(order, cutoff, sample_rate, btype='high'):
+    """按(阶数, 截止频率, 采样率, 类型)缓存的Butterworth滤波器系数（SOS形式）
+    
+    scipy的SOS滤波实现要求系数数组可写，因此这里不设置只读标志，调用方不应修改返回值。
+    """
+    nyquist = sample_rate / 2
+    if isinstance(cutoff, tuple):
+        wn = [c / nyquist for c in cutoff]
+    else:
+        wn = cutoff / nyquist
+    return signal.butter(order, wn, btype=btype, output='sos')
+
+@lru_cache(maxsize=32)
+def get_tukey_window(length, alpha=0.1):
+    """按长度缓存的Tukey窗（只读），用于白化前抑制数据边缘"""
+    window = signal.windows.tukey(length, alpha=alpha)
+    window.setflags(write=False)
+    return window
+
+@lru_cache(maxsize=32)
+def get_bandpass_response(order, band, sample_rate, length):
+    """SOS带通滤波器在长度为length的rfft频率网格上的零相位功率响应 |H(f)|^2（只读）
+    
+    与对同一SOS滤波器执行sosfiltfilt（前向+反向）的幅度响应相同，
+    因此可以在白化的同一次频域运算中完成带通滤波。
+    """
+    sos = get_filter_sos(order, tuple(band), sample_rate, 'bandpass')
+    freqs = rfftfreq(length, 1 / sample_rate)
+    _, response = signal.sosfreqz(sos, worN=freqs, fs=sample_rate)
+    power = np.square(np.abs(response))
+    power.setflags(write=False)
+    return power
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(kind=ANALYSIS_EXECUTOR, workers=ANALYSIS_WORKERS):
+    """获取进程内共享的探测器分析执行器
+    
+    kind为'serial'或只有一个可用工作单元时返回None（在当前线程中顺序执行）。
+    """
+    if kind not in ('process', 'thread'):
+        return None
+    workers = workers or min(4, os.cpu_count() or 1)
+    if workers < 2:
+        return None
+    with _executors_lock:
+        executor = _executors.get((kind, workers))
+        if executor is None:
+            if kind == 'process':
+                # 不从（可能是多线程的）父进程fork；每个工作进程的FFT线程数按工作进程数均分CPU核
+                fft_workers = max(1, (os.cpu_count() or 1) // workers)
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context(ANALYSIS_PROCESS_START_METHOD),
+                    initializer=_init_analysis_worker, initargs=(fft_workers,))
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='detector-analysis')
+            _executors[(kind, workers)] = executor
+            logger.info(f"创建探测器分析执行器: {kind}, 工作数量: {workers}")
+        return executor
+
+def _discard_executor(executor):
+    """移除已损坏的执行器，下次使用时重新创建"""
+    with _executors_lock:
+        for key, value in list(_executors.items()):
+            if value is executor:
+                del _executors[key]
+    executor.shutdown(wait=False)
+
+_worker_fft_workers = None
+
+def _init_analysis_worker(fft_workers):
+    """进程池工作进程初始化：限制FFT线程数，避免 工作进程数 × CPU核数 个线程争用CPU"""
+    global _worker_fft_workers
+    _worker_fft_workers = fft_workers
+
+def _analyze_detector_worker(detector, file_path, settings, use_strain_cache, products):
+    """进程池工作函数：在子进程中按父进程处理器的设置（worker_settings）分析单个探测器
+    
+    返回 (分析结果, 计时区间列表)，子进程中的计时由父进程记入耗时直方图。
+    """
+    processor = DataProcessor(use_strain_cache=use_strain_cache, use_result_cache=False, executor='serial')
+    for name, value in settings.items():
+        setattr(processor, name, value)
+    if _worker_fft_workers is not None:
+        processor.fft_backend = get_fft_backend(workers=_worker_fft_workers)
+    token, spans = begin_request_spans()
+    try:
+        return processor._analyze_detector(detector, file_path, products), spans
+    finally:
+        end_request_spans(token)
+
 class DataProcessor:
     """引力波数据处理类"""
     
-    def __init__(self):
+    def __init__(self, use_strain_cache=STRAIN_CACHE_ENABLED, result_cache=None,
+                 use_result_cache=ANALYSIS_CACHE_ENABLED, executor=ANALYSIS_EXECUTOR,
+                 workers=ANALYSIS_WORKERS):
         self.sample_rate = SAMPLE_RATE
         self.duration = DURATION
         self.expected_samples = SAMPLE_RATE * DURATION
+        self.use_strain_cache = use_strain_cache
+        self.strain_cache_dir = STRAIN_CACHE_DIR
+        
+        # 处理参数
+        self.highpass_cutoff = 10  # 10 Hz 高通滤波
+        self.filter_order = 4
+        self.psd_segment_length = 8192
+        self.peak_threshold = 0.1
+        self.peak_top_k = PEAK_TOP_K
+        self.peak_min_separation = PEAK_MIN_SEPARATION
+        self.resample_rate = RESAMPLE_RATE
+        self.precision = ANALYSIS_PRECISION
+        self.whiten_psd_segment = WHITEN_PSD_SEGMENT
+        self.whiten_bandpass = WHITEN_BANDPASS
+        self.whiten_filter_order = WHITEN_FILTER_ORDER
+        self.whiten_psd_source = WHITEN_PSD_SOURCE
+        self.stream_min_duration = STREAM_MIN_DURATION
+        self.noise_atlas = get_noise_atlas()
+        self.template_bank = TemplateBank.from_range(*MF_CHIRP_MASS_RANGE, MF_TEMPLATES, *MF_FREQ_RANGE)
+        self.matched_filter_batch = MF_BATCH_SIZE
+        self.correlation_max_delay = CORRELATION_MAX_DELAY
+        self.coherence_resolution = CORRELATION_COHERENCE_RESOLUTION
+        self.fft_backend = get_fft_backend()
+        self.event_catalog = get_event_catalog()
+        self.file_manifest = get_file_manifest()
+        
+        # 分析结果缓存
+        self.use_result_cache = use_result_cache
+        if use_result_cache:
+            self.result_cache = result_cache if result_cache is not None else get_shared_cache()
+        else:
+            self.result_cache = None
+        
+        # 多探测器并行分析
+        self.executor_kind = executor
+        self.workers = workers
+        
+        # 单探测器分析流程的阶段依赖图
+        self.pipeline = self._build_pipeline()
+    
+    def _build_pipeline(self):
+        """构建默认的分析阶段依赖图，新阶段可通过 self.pipeline.add_stage 注册"""
+        pipeline = AnalysisGraph(observer=lambda name, seconds: record_span(f"analysis.{name}", seconds))
+        pipeline.add_stage('raw', self.load_data_file, ('file_path',), '加载应变数据')
+        pipeline.add_stage('processed', self.preprocess_data, ('raw',), '去均值、加窗和高通滤波')
+        pipeline.add_stage('time', lambda series: series.times() if series is not None else [],
+                           ('processed',), '时间轴')
+        pipeline.add_stage('fft', self.compute_fft, ('processed',), '幅度谱')
+        pipeline.add_stage('psd', self.compute_psd, ('processed',), 'Welch功率谱密度')
+        pipeline.add_stage('peaks', self.detect_peaks, ('processed',), '峰值检测')
+        pipeline.add_stage('stats', self.compute_statistics, ('processed', 'fft', 'psd'), '统计信息')
+        pipeline.add_stage('noise_psd', self._noise_psd_stage, ('file_path', 'raw'), '噪声功率谱密度估计')
+        pipeline.add_stage('whitened', self.whiten_data, ('raw', 'noise_psd'), '白化和带通滤波')
+        pipeline.add_stage('matched_filter', self.search_templates, ('raw', 'noise_psd'), '模板库匹配滤波')
+        return pipeline
+    
+    def run_pipeline(self, file_path, stages):
+        """对单个数据文件运行指定的分析阶段，返回带有全部中间结果的AnalysisRun"""
+        run = self.pipeline.run(file_path=file_path)
+        if run['raw'] is not None:
+            run.compute(*stages)
+        return run
     
-    def load_data_file(self, file_path):
-        """加载数据文件"""
+    def processing_params(self):
+        """影响分析结果的处理参数，用作缓存键的一部分"""
+        params = {
+            'version': ANALYSIS_VERSION,
+            'sample_rate': self.sample_rate,
+            'resample_rate': self.resample_rate,
+            'duration': self.duration,
+            'highpass_cutoff': self.highpass_cutoff,
+            'filter_order': self.filter_order,
+            'psd_segment_length': self.psd_segment_length,
+            'peak_threshold': self.peak_threshold,
+            'peak_top_k': self.peak_top_k,
+            'peak_min_separation': self.peak_min_separation,
+            'precision': self.precision,
+            'whiten_psd_segment': self.whiten_psd_segment,
+            'whiten_bandpass': list(self.whiten_bandpass),
+            'whiten_filter_order': self.whiten_filter_order,
+            'template_bank': [float(self.template_bank.chirp_masses[0]), float(self.template_bank.chirp_masses[-1]),
+                              len(self.template_bank), self.template_bank.fmin, self.template_bank.fmax],
+            'whiten_psd_source': self.whiten_psd_source,
+            'stream_min_duration': self.stream_min_duration
+        }
+        if self.whiten_psd_source == 'atlas':
+            # 噪声图谱重建后，依赖它的白化和匹配滤波结果失效
+            params['noise_atlas_version'] = self.noise_atlas.version
+        return params
+    
+    def worker_settings(self):
+        """子进程中重建处理器所需的属性值
+        
+        取 processing_params 中对应的实际属性（例如 template_bank 为模板库对象而不是缓存键中的摘要），
+        只用于缓存键的派生字段（version、noise_atlas_version）不传递。
+        """
+        return {name: getattr(self, name) for name in self.processing_params()
+                if name not in DERIVED_PARAMS}
+    
+    @property
+    def dtype(self):
+        """滤波和变换使用的数据类型"""
+        try:
+            return PRECISION_DTYPES[self.precision]
+        except KeyError:
+            raise ValueError(f"不支持的数值精度: {self.precision}") from None
+    
+    def _strain_cache_path(self, file_path):
+        """根据源文件路径、大小和修改时间生成缓存文件路径"""
+        stat = os.stat(file_path)
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+        return key, os.path.join(self.strain_cache_dir, f"{key}-{stat.st_size}-{stat.st_mtime_ns}.npy")
+    
+    def _load_cached_strain(self, file_path):
+        """从二进制缓存中以内存映射方式读取应变数据，缓存不存在时返回None"""
+        try:
+            _, cache_path = self._strain_cache_path(file_path)
+            if not os.path.exists(cache_path):
+                return None
+            data = np.load(cache_path, mmap_mode='r')
+            logger.info(f"命中应变数据缓存: {cache_path}")
+            return data
+        except Exception as e:
+            logger.warning(f"读取应变数据缓存失败 {file_path}: {e}")
+            return None
+    
+    def _store_cached_strain(self, file_path, data):
+        """将解析后的应变数据写入二进制缓存，并清理同一源文件的旧缓存"""
+        try:
+            key, cache_path = self._strain_cache_path(file_path)
+            os.makedirs(self.strain_cache_dir, exist_ok=True)
+            
+            # 先写临时文件再原子替换，避免其他进程读到不完整的缓存
+            fd, tmp_path = tempfile.mkstemp(dir=self.strain_cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(data))
+                os.replace(tmp_path, cache_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            for name in os.listdir(self.strain_cache_dir):
+                stale_path = os.path.join(self.strain_cache_dir, name)
+                if name.startswith(key + '-') and stale_path != cache_path:
+                    os.remove(stale_path)
+            logger.info(f"应变数据已写入缓存: {cache_path}")
+        except Exception as e:
+            logger.warning(f"写入应变数据缓存失败 {file_path}: {e}")
+    
+    def _parse_strain_text(self, file_path):
+        """快速解析应变txt文件
+        
+        使用pandas的C引擎一次性解析整个文件，# 开头的GWOSC注释头由解析器直接跳过，
+        .gz文件自动解压；解析失败时回退到 np.loadtxt。
+        """
+        try:
+            frame = pd.read_csv(
+                file_path,
+                comment='#',
+                header=None,
+                engine='c',
+                dtype=np.float64,
+                na_filter=False
+            )
+        except pd.errors.EmptyDataError:
+            return np.empty(0)
+        except (ValueError, pd.errors.ParserError) as e:
+            logger.warning(f"快速解析失败，回退到np.loadtxt: {e}")
+            return np.loadtxt(file_path)
+        
+        if frame.shape[1] == 1:
+            return frame.iloc[:, 0].to_numpy()
+        return frame.to_numpy()
+    
+    def _read_strain_file(self, file_path):
+        """读取应变数据，优先使用内存映射的二进制缓存"""
+        if self.use_strain_cache:
+            data = self._load_cached_strain(file_path)
+            if data is not None:
+                return data
+        
+        data = self._parse_strain_text(file_path)
+        if self.use_strain_cache:
+            self._store_cached_strain(file_path, data)
+        return data
+    
+    def load_data_file(self, file_path, target_rate=None):
+        """加载数据文件，返回带采样率和GPS起始时间的TimeSeries
+        
+        target_rate 为空时保留文件的原始采样率（默认不重采样）。
+        """
         try:
             # 规范化文件路径
             file_path = os.path.normpath(file_path)
@@ -47,92 +433,72 @@ class DataProcessor:
                     logger.error(f"未找到任何匹配的文件: {base_path}")
                     raise FileNotFoundError(f"文件不存在: {file_path}")
             
-            # 从文件名中获取采样率信息
+            # 从文件名中获取采样率、GPS起始时间和时长
             filename = os.path.basename(file_path)
             logger.info(f"正在加载文件: {filename}")
             
-            if '16KHZ' in filename.upper():
-                expected_rate = 16384
+            file_info = parse_gwosc_filename(filename)
+            if file_info:
+                sample_rate = file_info['sample_rate']
+                gps_start = file_info['gps_start']
+                duration = file_info['duration']
+                logger.info(f"检测到{sample_rate}Hz数据文件, GPS起始时间: {gps_start}")
+            elif '16KHZ' in filename.upper():
+                sample_rate, gps_start, duration = 16384, None, self.duration
                 logger.info("检测到16kHz数据文件")
             elif '4KHZ' in filename.upper():
-                expected_rate = 4096
+                sample_rate, gps_start, duration = 4096, None, self.duration
                 logger.info("检测到4kHz数据文件")
             else:
-                expected_rate = self.sample_rate
-                logger.warning(f"无法从文件名确定采样率，使用默认值: {expected_rate}Hz")
+                sample_rate, gps_start, duration = self.sample_rate, None, self.duration
+                logger.warning(f"无法从文件名确定采样率，使用默认值: {sample_rate}Hz")
             
             # 读取数据文件
             logger.info(f"开始读取数据文件: {file_path}")
             try:
-                data = np.loadtxt(file_path)
+                data = self._read_strain_file(file_path)
                 logger.info(f"成功读取数据，数据点数量: {len(data)}")
             except Exception as e:
                 logger.error(f"读取数据文件失败: {e}", exc_info=True)
                 raise
             
-            # 验证数据长度
-            expected_samples = expected_rate * self.duration
+            # 验证数据长度（不再强制重采样，采样率随数据一起传递）
+            expected_samples = sample_rate * duration
             if len(data) != expected_samples:
                 logger.warning(f"数据长度不匹配: 期望 {expected_samples}, 实际 {len(data)}")
-                # 如果数据长度不匹配，尝试重采样
-                if len(data) > 0:
-                    logger.info(f"开始重采样数据到 {expected_samples} 个点")
-                    data = signal.resample(data, expected_samples)
-                    logger.info(f"数据重采样完成")
             
-            logger.info(f"成功加载数据文件: {file_path}, 数据点: {len(data)}")
-            return data
+            series = TimeSeries(data, sample_rate, gps_start)
+            
+            # 只有明确要求时才重采样，并使用多相滤波
+            if target_rate is None:
+                target_rate = self.resample_rate
+            if target_rate and target_rate != sample_rate and len(data) > 0:
+                series = series.resample(target_rate)
+            
+            logger.info(f"成功加载数据文件: {file_path}, 数据点: {len(series)}, 采样率: {series.sample_rate}Hz")
+            return series
             
         except Exception as e:
             logger.error(f"加载数据文件失败 {file_path}: {e}", exc_info=True)
             return None
     
     def get_event_info(self, event_name):
-        """从数据库获取事件信息"""
+        """从共享的事件目录获取事件信息（副本）
+        
+        事件记录中没有数据文件时，从文件清单中按事件目录下的GWOSC文件名补充。
+        """
         try:
-            if os.path.exists(EVENTS_FILE):
-                with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
-                    events = json.load(f)
-                
-                event_data = events.get(event_name)
-                if event_data:
-                    logger.info(f"成功获取事件信息: {event_name}")
-                    # 添加数据文件信息
-                    if 'data_files' not in event_data:
-                        event_data['data_files'] = []
-                        # 检查L1探测器数据
-                        detectors = ['L1', 'H1']
-                        for detector in detectors:
-                            prefix = 'L-L1' if detector == 'L1' else 'H-H1'
-                            # 检查16kHz数据
-                            file_16k = f"{prefix}_GWOSC_16KHZ_R1-1369419303-32.txt"
-                            file_16k_path = os.path.join(DATA_DIR, event_name, file_16k)
-                            if os.path.exists(file_16k_path):
-                                event_data['data_files'].append({
-                                    'detector': detector,
-                                    'file_path': file_16k_path,
-                                    'sampling_rate': 16384,
-                                    'duration': 32
-                                })
-                                logger.info(f"找到{detector}探测器16kHz数据: {file_16k}")
-                            # 检查4kHz数据
-                            file_4k = f"{prefix}_GWOSC_4KHZ_R1-1369419303-32.txt"
-                            file_4k_path = os.path.join(DATA_DIR, event_name, file_4k)
-                            if os.path.exists(file_4k_path):
-                                event_data['data_files'].append({
-                                    'detector': detector,
-                                    'file_path': file_4k_path,
-                                    'sampling_rate': 4096,
-                                    'duration': 32
-                                })
-                                logger.info(f"找到{detector}探测器4kHz数据: {file_4k}")
-                    return event_data
-                else:
-                    logger.warning(f"未找到事件: {event_name}")
-                    return None
-            else:
-                logger.warning("事件数据库文件不存在")
+            event_data = self.event_catalog.get(event_name)
+            if event_data is None:
+                logger.warning(f"未找到事件: {event_name}")
                 return None
+            
+            if not event_data.get('data_files'):
+                event_data['data_files'] = self.file_manifest.files(event_name)
+                if event_data['data_files']:
+                    logger.info(f"从文件清单找到 {event_name} 的数据文件: "
+                                f"{[os.path.basename(f['file_path']) for f in event_data['data_files']]}")
+            return event_data
                 
         except Exception as e:
             logger.error(f"获取事件信息失败: {e}", exc_info=True)
@@ -212,27 +578,30 @@ class DataProcessor:
             logger.error(f"获取应变数据信息失败: {e}", exc_info=True)
             return []
     
+    def _as_timeseries(self, data):
+        """将普通数组包装为TimeSeries（使用默认采样率），TimeSeries原样返回"""
+        if data is None or isinstance(data, TimeSeries):
+            return data
+        return TimeSeries(data, self.sample_rate)
+    
     def preprocess_data(self, data):
-        """数据预处理"""
+        """数据预处理，返回与输入采样率相同的TimeSeries"""
         try:
             if data is None or len(data) == 0:
                 return None
+            series = self._as_timeseries(data)
+            dtype = self.dtype
             
-            # 去除均值
-            data_centered = data - np.mean(data)
-            
-            # 应用窗函数 (Hann窗)
-            window = signal.windows.hann(len(data_centered))
-            data_windowed = data_centered * window
+            # 去除均值并应用窗函数 (Hann窗)，原地运算只分配一个数组（按配置的精度）
+            data_windowed = np.subtract(series.data, np.mean(series.data), dtype=dtype)
+            data_windowed *= get_window(len(data_windowed), dtype=dtype)
             
-            # 高通滤波 (去除低频噪声)
-            nyquist = self.sample_rate / 2
-            cutoff = 10  # 10 Hz 高通滤波
-            b, a = signal.butter(4, cutoff / nyquist, btype='high')
-            data_filtered = signal.filtfilt(b, a, data_windowed)
+            # 高通滤波 (去除低频噪声)，系数与数据同精度时scipy以该精度滤波
+            sos = get_filter_sos(self.filter_order, self.highpass_cutoff, series.sample_rate, 'high')
+            data_filtered = signal.sosfiltfilt(sos.astype(dtype, copy=False), data_windowed)
             
             logger.info("数据预处理完成")
-            return data_filtered
+            return series.with_data(data_filtered)
             
         except Exception as e:
             logger.error(f"数据预处理失败: {e}")
@@ -243,19 +612,18 @@ class DataProcessor:
         try:
             if data is None or len(data) == 0:
                 return None, None
+            series = self._as_timeseries(data)
             
-            # 应用窗函数以减少频谱泄漏
-            window = signal.windows.hann(len(data))
-            windowed_data = data * window
+            dtype = self.dtype
             
-            # 计算FFT
-            fft_data = fft(windowed_data)
-            freqs = fftfreq(len(data), 1/self.sample_rate)
+            # 应用窗函数以减少频谱泄漏
+            windowed_data = np.multiply(series.data, get_window(len(series), dtype=dtype), dtype=dtype)
             
-            # 只取正频率部分并归一化
-            positive_freqs = freqs[:len(freqs)//2]
-            positive_fft = np.abs(fft_data[:len(fft_data)//2])
-            positive_fft = positive_fft / len(data)  # 归一化
+            # 实数输入FFT只计算非负频率，保留与原先相同的 N//2 个频点
+            n_positive = len(series) // 2
+            positive_freqs = rfftfreq(len(series), 1/series.sample_rate)[:n_positive]
+            positive_fft = np.abs(self.fft_backend.rfft(windowed_data)[:n_positive])
+            positive_fft /= len(series)  # 归一化
             
             logger.info("FFT计算完成")
             return positive_freqs, positive_fft
@@ -269,20 +637,33 @@ class DataProcessor:
         try:
             if data is None or len(data) == 0:
                 return None, None
+            series = self._as_timeseries(data)
             
             # 使用Welch方法计算功率谱密度
             # 使用较大的窗口大小以获得更好的频率分辨率
-            nperseg = min(8192, len(data)//2)
+            nperseg = min(self.psd_segment_length, len(series)//2)
             noverlap = nperseg // 2
+            dtype = self.dtype
             
-            freqs, psd = signal.welch(
-                data,
-                fs=self.sample_rate,
-                nperseg=nperseg,
-                noverlap=noverlap,
-                window='hann',
-                scaling='density'
-            )
+            # 单精度下应变(~1e-21)的平方会下溢，先归一化到单位量级，结果再按双精度还原
+            data = series.data
+            scale = 1.0
+            if dtype != np.float64:
+                scale = float(np.max(np.abs(data))) or 1.0
+                data = np.divide(data, scale, dtype=dtype)
+            
+            # Welch各段的批量FFT同样交给配置的FFT后端（多线程）
+            with self.fft_backend.context():
+                freqs, psd = signal.welch(
+                    data,
+                    fs=series.sample_rate,
+                    nperseg=nperseg,
+                    noverlap=noverlap,
+                    window=get_window(nperseg, sym=False, dtype=dtype),
+                    scaling='density'
+                )
+            if scale != 1.0:
+                psd = psd.astype(np.float64) * scale**2
             
             logger.info("功率谱密度计算完成")
             return freqs, psd
@@ -291,35 +672,210 @@ class DataProcessor:
             logger.error(f"功率谱密度计算失败: {e}")
             return None, None
     
-    def detect_peaks(self, data, threshold=0.1):
-        """检测峰值"""
+    def estimate_noise_psd(self, data):
+        """估计噪声功率谱密度（Welch方法，中位数平均以降低信号本身的影响），返回 (频率, PSD)"""
+        try:
+            if data is None or len(data) == 0:
+                return None, None
+            series = self._as_timeseries(data)
+            nperseg = min(int(self.whiten_psd_segment * series.sample_rate), len(series) // 2)
+            with self.fft_backend.context():
+                freqs, psd = signal.welch(
+                    series.data,
+                    fs=series.sample_rate,
+                    nperseg=nperseg,
+                    noverlap=nperseg // 2,
+                    window=get_window(nperseg, sym=False),
+                    average='median',
+                    scaling='density'
+                )
+            logger.info("噪声功率谱密度估计完成")
+            return freqs, psd
+        except Exception as e:
+            logger.error(f"噪声功率谱密度估计失败: {e}")
+            return None, None
+    
+    def _cache_version(self, fingerprint):
+        """缓存版本：数据文件或处理参数变化后，同一命名空间下旧版本的缓存被清除"""
+        return make_cache_key(fingerprint, self.processing_params())[:16]
+    
+    def _cached_noise_psd(self, file_path, data):
+        """带缓存的噪声PSD估计，白化、匹配滤波等阶段共享同一个估计"""
+        if data is None:
+            return None, None
+        if self.result_cache is None or not file_path:
+            return self.estimate_noise_psd(data)
+        
+        fingerprint = file_fingerprint(file_path)
+        return self.result_cache.get_or_compute(
+            make_cache_key('noise_psd', fingerprint, self.processing_params()),
+            lambda: self.estimate_noise_psd(data),
+            namespace=f"noise_psd_{os.path.basename(file_path)}",
+            version=self._cache_version(fingerprint)
+        )
+    
+    def noise_psd_for_file(self, file_path):
+        """由数据文件本身估计（并缓存）的噪声PSD，返回 (频率, PSD)"""
+        return self._cached_noise_psd(file_path, self.load_data_file(file_path))
+    
+    def get_reference_psd(self, detector, run=None, gps_time=None):
+        """噪声图谱中探测器在某个观测运行（或GPS时间所在运行）的中位数PSD，没有时返回 (None, None)"""
+        if run is None:
+            run = observing_run(gps_time)
+        if run is None or detector is None:
+            return None, None
+        return self.noise_atlas.get(detector, run)
+    
+    def get_event_reference_psd(self, event_name, detectors=None):
+        """事件所在观测运行的各探测器参考PSD，用于与事件数据的PSD对比"""
+        try:
+            event_info = self.get_event_info(event_name)
+            if not event_info:
+                return None
+            run = observing_run(event_info.get('gps_time'))
+            if detectors is None:
+                detectors = self.get_available_detectors(event_name)
+
+            curves = {}
+            for detector in detectors:
+                freqs, psd = self.get_reference_psd(detector, run=run)
+                if freqs is not None:
+                    curves[detector] = {'frequencies': freqs.tolist(), 'power': psd.tolist()}
+            return {'run': run, 'detectors': curves}
+        except Exception as e:
+            logger.error(f"获取参考PSD失败: {e}")
+            return None
+
+    def build_noise_atlas(self, event_names):
+        """由已下载事件的应变数据重建噪声图谱，返回 {(观测运行, 探测器): 文件数}"""
+        events = {}
+        for event_name in event_names:
+            event_info = self.get_event_info(event_name)
+            if event_info:
+                events[event_name] = event_info
+        return self.noise_atlas.build(self, events)
+
+    def _noise_psd_stage(self, file_path, data):
+        """白化和匹配滤波使用的噪声PSD：按配置取噪声图谱的参考曲线，或由数据估计"""
+        if self.whiten_psd_source == 'atlas' and data is not None:
+            detector = (parse_gwosc_filename(file_path) or {}).get('detector')
+            reference = self.get_reference_psd(detector, gps_time=data.gps_start)
+            if reference[0] is not None:
+                return reference
+            logger.warning(f"噪声图谱中没有 {detector} 的参考PSD，改为由数据估计")
+        return self._cached_noise_psd(file_path, data)
+    
+    def whiten_data(self, data, noise_psd=None):
+        """白化并带通滤波：一次rfft/irfft往返中除以噪声幅度谱密度并乘以带通零相位响应
+        
+        noise_psd 为 (频率, PSD)，为空时由数据本身估计。白噪声输入的输出方差约为1。
+        """
         try:
             if data is None or len(data) == 0:
-                return []
+                return None
+            series = self._as_timeseries(data)
+            if noise_psd is None or noise_psd[0] is None:
+                noise_psd = self.estimate_noise_psd(series)
+            psd_freqs, psd = noise_psd
+            n = len(series)
             
-            # 使用scipy的峰值检测
-            peaks, properties = signal.find_peaks(np.abs(data), height=threshold*np.max(np.abs(data)))
+            # 去均值并用Tukey窗抑制边缘，避免循环卷积的边界效应
+            tapered = np.subtract(series.data, np.mean(series.data))
+            tapered *= get_tukey_window(n)
+            spectrum = self.fft_backend.rfft(tapered)
             
-            # 获取峰值信息
-            peak_info = []
-            for i, peak in enumerate(peaks):
-                peak_info.append({
-                    'index': peak,
-                    'time': peak / self.sample_rate,
-                    'amplitude': data[peak],
-                    'prominence': properties['peak_heights'][i] if 'peak_heights' in properties else 0
-                })
+            freqs = rfftfreq(n, 1 / series.sample_rate)
+            asd = np.sqrt(np.interp(freqs, psd_freqs, psd) * series.sample_rate / 2)
+            response = get_bandpass_response(self.whiten_filter_order, tuple(self.whiten_bandpass),
+                                             series.sample_rate, n)
+            spectrum *= np.divide(response, asd, out=np.zeros_like(asd), where=asd > 0)
             
-            logger.info(f"检测到 {len(peak_info)} 个峰值")
-            return peak_info
+            whitened = self.fft_backend.irfft(spectrum, n).astype(self.dtype, copy=False)
+            logger.info("白化和带通滤波完成")
+            return series.with_data(whitened)
+        except Exception as e:
+            logger.error(f"白化失败: {e}")
+            return None
+    
+    def search_templates(self, data, noise_psd=None):
+        """用模板库对应变数据做匹配滤波，返回最佳模板（啁啾质量）、信噪比和并合时刻"""
+        try:
+            if data is None or len(data) == 0:
+                return None
+            series = self._as_timeseries(data)
+            if noise_psd is None or noise_psd[0] is None:
+                noise_psd = self.estimate_noise_psd(series)
+            
+            result = matched_filter(series.data, series.sample_rate, noise_psd, self.template_bank,
+                                    batch_size=self.matched_filter_batch, fft_backend=self.fft_backend)
+            if series.gps_start is not None:
+                result['best_gps_time'] = series.gps_start + result['best_time']
+            logger.info(f"匹配滤波完成: 最佳啁啾质量 {result['best_chirp_mass']:.2f} M☉, "
+                        f"信噪比 {result['best_snr']:.2f}, 时刻 {result['best_time']:.4f} 秒")
+            return result
+        except Exception as e:
+            logger.error(f"匹配滤波失败: {e}")
+            return None
+    
+    def detect_peaks(self, data, threshold=None, top_k=None, min_separation=None):
+        """检测峰值，返回列式结果 {index, time, amplitude, prominence}（按时间排序）
+        
+        threshold 为相对 max(|data|) 的高度阈值；min_separation（秒）内只保留最高的峰值；
+        top_k 只保留幅度最大的k个峰值（为0时保留全部），突出度只对保留的峰值计算。
+        """
+        try:
+            if data is None or len(data) == 0:
+                return empty_peaks()
+            if threshold is None:
+                threshold = self.peak_threshold
+            if top_k is None:
+                top_k = self.peak_top_k
+            if min_separation is None:
+                min_separation = self.peak_min_separation
+            series = self._as_timeseries(data)
+            data = series.data
+            
+            # 使用scipy的峰值检测（最小间隔由C实现按高度优先筛选）
+            magnitude = np.abs(data)
+            distance = max(int(round(min_separation * series.sample_rate)), 1) if min_separation else None
+            indices, properties = signal.find_peaks(magnitude, height=threshold*np.max(magnitude),
+                                                    distance=distance)
+            detected = len(indices)
+            
+            if top_k and detected > top_k:
+                keep = np.argpartition(properties['peak_heights'], -top_k)[-top_k:]
+                indices = np.sort(indices[keep])
+            
+            prominences = signal.peak_prominences(magnitude, indices)[0] if len(indices) else np.empty(0)
+            logger.info(f"检测到 {detected} 个峰值，保留 {len(indices)} 个")
+            return {
+                'index': indices.astype(np.int64),
+                'time': indices / series.sample_rate,
+                'amplitude': data[indices],
+                'prominence': prominences
+            }
             
         except Exception as e:
             logger.error(f"峰值检测失败: {e}")
-            return []
+            return empty_peaks()
     
-    def analyze_event_data(self, event_name, detectors=None):
-        """分析事件数据"""
+    def normalize_products(self, products):
+        """校验并规范化请求的分析产物列表，None表示全部产物"""
+        if not products:
+            return DEFAULT_PRODUCTS
+        unknown = [p for p in products if p not in ANALYSIS_PRODUCTS]
+        if unknown:
+            raise ValueError(f"不支持的分析产物: {', '.join(unknown)}")
+        return tuple(p for p in ANALYSIS_PRODUCTS if p in products)
+    
+    def analyze_event_data(self, event_name, detectors=None, products=None):
+        """分析事件数据
+        
+        products 指定需要的分析产物（time_series, fft, psd, peaks, stats, whitened），
+        只运行这些产物依赖的处理阶段；为空时计算默认产物（除whitened外的全部产物）。
+        """
         try:
+            products = self.normalize_products(products)
             event_info = self.get_event_info(event_name)
             if not event_info:
                 logger.error(f"未找到事件信息: {event_name}")
@@ -340,149 +896,456 @@ class DataProcessor:
                 'detectors': {}
             }
             
-            # 分析每个探测器的数据
+            # 查找每个探测器的数据文件
+            jobs = []
             for detector in available_detectors:
                 logger.info(f"分析探测器: {detector}")
                 
                 # 查找对应的数据文件
-                file_path = None
-                for file_info in event_info.get('data_files', []):
-                    if file_info.get('detector') == detector:
-                        file_path = file_info.get('file_path')
-                        break
-                
+                file_path = self._detector_file(event_info, detector)
                 if not file_path or not os.path.exists(file_path):
                     logger.warning(f"探测器 {detector} 的数据文件不存在: {file_path}")
                     continue
                 
-                # 加载数据
-                data = self.load_data_file(file_path)
-                if data is None:
-                    continue
-                
-                # 预处理
-                processed_data = self.preprocess_data(data)
-                logger.info(f"探测器 {detector} 预处理后数据长度: {len(processed_data) if processed_data is not None else 0}")
-                
-                # 计算FFT
-                freqs, fft_data = self.compute_fft(processed_data)
-                
-                # 计算功率谱密度
-                psd_freqs, psd_data = self.compute_psd(processed_data)
-                
-                # 检测峰值
-                peaks = self.detect_peaks(processed_data)
-                
-                # 统计信息
-                stats = self.compute_statistics(processed_data)
-                
-                # 时间轴
-                time_axis = np.arange(len(processed_data)) / self.sample_rate if processed_data is not None else []
-                
-                analysis_results['detectors'][detector] = {
-                    'raw_data': data,
-                    'processed_data': processed_data,
-                    'time': time_axis,
-                    'fft_frequencies': freqs,
-                    'fft_magnitude': fft_data,
-                    'psd_frequencies': psd_freqs,
-                    'psd_power': psd_data,
-                    'peaks': peaks,
-                    'statistics': stats,
-                    'file_path': file_path
-                }
+                jobs.append((detector, file_path))
+            
+            # 并行分析各探测器，并按探测器顺序合并结果
+            for (detector, _), detector_results in zip(jobs, self._analyze_detectors(event_name, jobs, products)):
+                if detector_results is not None:
+                    analysis_results['detectors'][detector] = detector_results
             
             logger.info(f"事件 {event_name} 分析完成，分析了 {len(analysis_results['detectors'])} 个探测器")
             return analysis_results
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"分析事件 {event_name} 失败: {e}")
             return None
     
-    def compute_statistics(self, data):
-        """计算数据统计信息"""
+    def _detector_file(self, event_info, detector):
+        """事件中某个探测器的数据文件路径，没有时返回None"""
+        for file_info in event_info.get('data_files', []):
+            if file_info.get('detector') == detector:
+                return file_info.get('file_path')
+        return None
+    
+    def _analyze_detector(self, detector, file_path, products=DEFAULT_PRODUCTS):
+        """分析单个探测器的数据文件
+        
+        按阶段依赖图只运行请求的产物所需的阶段，共享的中间结果（预处理数据、FFT、PSD）
+        在一次运行中只计算一次。
+        """
+        if self._use_streaming(file_path):
+            return self._analyze_detector_streaming(detector, file_path, products)
+        
+        stages = [stage for product in products for stage in PRODUCT_STAGES[product]]
+        run = self.run_pipeline(file_path, stages)
+        data = run['raw']
+        if data is None:
+            return None
+        
+        processed_data = run['processed']
+        logger.info(f"探测器 {detector} 预处理后数据长度: {len(processed_data) if processed_data is not None else 0}, "
+                    f"计算阶段: {', '.join(run.computed_stages())}")
+        
+        result = {
+            'sample_rate': data.sample_rate,
+            'gps_start': data.gps_start,
+            'file_path': file_path
+        }
+        if 'time_series' in products:
+            # 时间轴（使用数据文件的真实采样率）
+            result['raw_data'] = data.data
+            result['processed_data'] = processed_data.data if processed_data is not None else None
+            result['time'] = run['time']
+        if 'fft' in products:
+            result['fft_frequencies'], result['fft_magnitude'] = run['fft']
+        if 'psd' in products:
+            result['psd_frequencies'], result['psd_power'] = run['psd']
+        if 'peaks' in products:
+            result['peaks'] = run['peaks']
+        if 'stats' in products:
+            result['statistics'] = run['stats']
+        if 'whitened' in products:
+            whitened = run['whitened']
+            result['whitened_data'] = whitened.data if whitened is not None else None
+        if 'matched_filter' in products:
+            result['matched_filter'] = run['matched_filter']
+        
+        return result
+    
+    def _use_streaming(self, file_path):
+        """数据文件时长（由文件名解析）达到 stream_min_duration 时使用流式分析"""
+        if self.stream_min_duration is None:
+            return False
+        duration = (parse_gwosc_filename(file_path) or {}).get('duration')
+        return duration is not None and duration >= self.stream_min_duration
+    
+    def _streaming_products(self, detector, products):
+        """流式分析可以计算的产物，其余产物需要整段数据，不计算"""
+        skipped = [product for product in products if product not in STREAM_PRODUCTS]
+        if skipped:
+            logger.warning(f"探测器 {detector} 的数据时长达到 {self.stream_min_duration} 秒，"
+                           f"使用流式分析，不计算: {', '.join(skipped)}")
+        return tuple(product for product in products if product in STREAM_PRODUCTS)
+    
+    def _analyze_detector_streaming(self, detector, file_path, products=STREAM_PRODUCTS):
+        """用流式分析计算长时段数据文件的 psd 和 stats
+        
+        统计信息的结构与整段分析相同；频域统计需要整段数据的FFT，流式分析时为空。
+        """
+        streamed = self.analyze_file_streaming(file_path)
+        if streamed is None:
+            return None
+        
+        result = {
+            'sample_rate': streamed['sample_rate'],
+            'gps_start': streamed['gps_start'],
+            'file_path': file_path
+        }
+        if 'psd' in products:
+            result['psd_frequencies'] = streamed['psd_frequencies']
+            result['psd_power'] = streamed['psd_power']
+        if 'stats' in products:
+            result['statistics'] = {
+                'time_domain': streamed['statistics'],
+                'frequency_domain': self._frequency_statistics(None, None),
+                'psd': self._psd_statistics(streamed['psd_frequencies'], streamed['psd_power'])
+            }
+        logger.info(f"探测器 {detector} 流式分析完成: {streamed['samples']} 个数据点")
+        return result
+    
+    def _compute_detector(self, detector, file_path, products, executor=None):
+        """计算单个探测器的分析结果，提供执行器时交给执行器运行"""
+        if executor is None:
+            return self._analyze_detector(detector, file_path, products)
+        
         try:
-            if data is None or len(data) == 0:
+            if isinstance(executor, ProcessPoolExecutor):
+                future = executor.submit(_analyze_detector_worker, detector, file_path,
+                                         self.worker_settings(), self.use_strain_cache, products)
+                result, spans = future.result()
+                for name, seconds in spans:
+                    record_span(name, seconds)
+                return result
+            # 工作线程中的阶段计时仍记入当前请求
+            future = executor.submit(contextvars.copy_context().run, self._analyze_detector,
+                                     detector, file_path, products)
+            return future.result()
+        except BrokenProcessPool as e:
+            logger.error(f"分析进程池异常，改为在当前进程中分析 {detector}: {e}")
+            _discard_executor(executor)
+            return self._analyze_detector(detector, file_path, products)
+    
+    def _cached_detector_analysis(self, event_name, detector, file_path, products=DEFAULT_PRODUCTS,
+                                  executor=None):
+        """带缓存的单探测器分析
+        
+        每个产物单独缓存，缓存键包含事件、探测器、数据文件指纹、处理参数和产物名称；
+        只有缺失的产物会被计算。长时段数据文件只计算可以流式分析的产物。
+        """
+        if self._use_streaming(file_path):
+            products = self._streaming_products(detector, products)
+            if not products:
+                return None
+        if self.result_cache is None:
+            return self._compute_detector(detector, file_path, products, executor)
+        
+        fingerprint = file_fingerprint(file_path)
+        namespace = f"{event_name}_{detector}"
+        version = self._cache_version(fingerprint)
+        base_key = ('detector_analysis', event_name, detector, fingerprint, self.processing_params())
+        
+        def lookup(product):
+            return self.result_cache.get(make_cache_key(*base_key, product), namespace, version)
+        
+        result = {}
+        missing = []
+        with span('analysis.cache_lookup'):
+            for product in products:
+                cached = lookup(product)
+                if cached is None:
+                    missing.append(product)
+                else:
+                    result.update(cached)
+        if not missing:
+            return result
+        
+        # 同一组缺失产物的并发请求只计算一次
+        with self.result_cache.key_lock(make_cache_key(*base_key, missing)):
+            still_missing = []
+            for product in missing:
+                cached = lookup(product)
+                if cached is None:
+                    still_missing.append(product)
+                else:
+                    result.update(cached)
+            if not still_missing:
+                return result
+            
+            computed = self._compute_detector(detector, file_path, tuple(still_missing), executor)
+            if computed is None:
                 return None
             
-            # 时域统计
-            time_stats = {
-                'mean': float(np.mean(data)),
-                'std': float(np.std(data)),
-                'min': float(np.min(data)),
-                'max': float(np.max(data)),
-                'peak_to_peak': float(np.max(data) - np.min(data)),
-                'rms': float(np.sqrt(np.mean(np.square(data)))),
-                'skewness': float(pd.Series(data).skew()),
-                'kurtosis': float(pd.Series(data).kurtosis())
+            common = {k: computed[k] for k in ('sample_rate', 'gps_start', 'file_path')}
+            for product in still_missing:
+                entry = dict(common)
+                entry.update({field: computed[field] for field in PRODUCT_FIELDS[product]})
+                self.result_cache.put(make_cache_key(*base_key, product), entry, namespace, version)
+            result.update(computed)
+        return result
+    
+    def _analyze_detectors(self, event_name, jobs, products=DEFAULT_PRODUCTS):
+        """分析多个探测器，结果按jobs中的探测器顺序返回
+        
+        多个探测器时分发到共享的进程池（或线程池）并行计算，
+        每个探测器仍先经过结果缓存，命中的探测器不会提交计算任务。
+        """
+        executor = get_executor(self.executor_kind, self.workers) if len(jobs) > 1 else None
+        if executor is None:
+            return [self._cached_detector_analysis(event_name, detector, file_path, products)
+                    for detector, file_path in jobs]
+        
+        # 每个探测器用一个轻量线程等待缓存或计算结果，实际计算在执行器中进行
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='detector-wait') as waiters:
+            futures = [
+                waiters.submit(contextvars.copy_context().run, self._cached_detector_analysis,
+                               event_name, detector, file_path, products, executor)
+                for detector, file_path in jobs
+            ]
+            results = []
+            for (detector, _), future in zip(jobs, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"探测器 {detector} 分析失败: {e}", exc_info=True)
+                    results.append(None)
+            return results
+    
+    def analyze_file_streaming(self, file_path, block_seconds=None):
+        """逐块流式分析长时段数据文件，峰值内存只与块大小有关
+        
+        每块依次经过因果高通滤波（块间传递滤波器状态）、Welch功率谱累加和时域统计累加；
+        优先从内存映射的二进制缓存按块读取，没有缓存时按块解析txt文件。
+        与整段分析不同，流式模式不加全局窗函数，并使用因果滤波代替零相位滤波。
+        数据文件时长达到 stream_min_duration 时，analyze_event_data 用该方法计算 psd 和 stats。
+        """
+        try:
+            file_info = parse_gwosc_filename(file_path) or {}
+            sample_rate = file_info.get('sample_rate', self.sample_rate)
+            block_samples = int((block_seconds or STREAM_BLOCK_SECONDS) * sample_rate)
+            
+            cached = self._load_cached_strain(file_path) if self.use_strain_cache else None
+            if cached is not None:
+                blocks = iter_array_blocks(cached, block_samples)
+            else:
+                blocks = iter_text_blocks(file_path, block_samples)
+            
+            sos = get_filter_sos(self.filter_order, self.highpass_cutoff, sample_rate, 'high')
+            highpass = StreamingFilter(sos)
+            nperseg = self.psd_segment_length
+            welch = StreamingWelch(sample_rate, nperseg, window=get_window(nperseg, sym=False),
+                                   fft_backend=self.fft_backend)
+            raw_stats = Moments()
+            filtered_stats = Moments()
+            
+            block_count = 0
+            for block in blocks:
+                raw_stats.update(block)
+                filtered = highpass.process(block)
+                welch.update(filtered)
+                filtered_stats.update(filtered)
+                block_count += 1
+            
+            psd_freqs, psd_power = welch.result()
+            logger.info(f"流式分析完成: {file_path}, {raw_stats.count} 个数据点, {block_count} 个数据块, "
+                        f"{welch.segments} 个Welch分段")
+            return {
+                'file_path': file_path,
+                'sample_rate': sample_rate,
+                'gps_start': file_info.get('gps_start'),
+                'samples': raw_stats.count,
+                'blocks': block_count,
+                'psd_frequencies': psd_freqs,
+                'psd_power': psd_power,
+                'raw_statistics': raw_stats.result(),
+                'statistics': filtered_stats.result()
             }
+        except Exception as e:
+            logger.error(f"流式分析失败 {file_path}: {e}", exc_info=True)
+            return None
+    
+    def compute_time_frequency(self, event_name, detector, kind='spectrogram', start=None, end=None,
+                               fmin=None, fmax=None, resolution=None):
+        """计算探测器在时间窗口 [start, end)（秒，相对数据起点）内的时频图
+        
+        kind 为 'spectrogram'（短时功率谱密度，resolution为分段时长秒数）或
+        'qtransform'（常Q归一化能量，resolution为Q值）。时间窗口按固定时长切分为时频块，
+        每个块按 (事件, 探测器, 数据文件指纹, 类型, 块起点, 分辨率) 缓存，平移和缩放时只计算新的块。
+        未指定时间窗口时显示并合时刻前后 TF_DEFAULT_SPAN 秒。
+        """
+        try:
+            if kind not in TF_KINDS:
+                raise ValueError(f"不支持的时频图类型: {kind}")
+            
+            event_info = self.get_event_info(event_name)
+            file_path = self._detector_file(event_info, detector) if event_info else None
+            if not file_path or not os.path.exists(file_path):
+                logger.error(f"探测器 {detector} 的数据文件不存在: {file_path}")
+                return None
+            
+            file_info = parse_gwosc_filename(file_path) or {}
+            total_duration = file_info.get('duration', self.duration)
+            gps_start = file_info.get('gps_start')
+            if start is None or end is None:
+                center = total_duration / 2
+                if gps_start is not None and event_info.get('gps_time'):
+                    center = float(event_info['gps_time']) - gps_start
+                start = center - TF_DEFAULT_SPAN if start is None else start
+                end = center + TF_DEFAULT_SPAN if end is None else end
+            
+            fmin = TF_FREQ_RANGE[0] if fmin is None else fmin
+            fmax = TF_FREQ_RANGE[1] if fmax is None else fmax
+            if resolution is None:
+                resolution = TF_SPECTROGRAM_SEGMENT if kind == 'spectrogram' else TF_Q
+            
+            tiles = tile_bounds(start, end, TF_TILE_DURATION, total_duration)
+            if not tiles:
+                logger.error(f"时间窗口超出数据范围: {start} - {end}")
+                return None
+            if len(tiles) > TF_MAX_TILES:
+                raise ValueError(f"时间窗口过长: 需要 {len(tiles)} 个时频块，最多 {TF_MAX_TILES} 个")
+            
+            # 预处理数据只在有块需要计算时加载一次
+            series_holder = []
+            computed = []
+            def compute_tile(tile_start):
+                if not series_holder:
+                    series_holder.append(self.run_pipeline(file_path, ['processed'])['processed'])
+                computed.append(tile_start)
+                return self._time_frequency_tile(series_holder[0], kind, tile_start, fmin, fmax, resolution)
+            
+            # 谱图块计算全频段，缩放频率范围时复用；常Q的频率行取决于频率范围
+            tile_params = [kind, resolution, TF_TILE_DURATION]
+            if kind == 'qtransform':
+                tile_params += [fmin, fmax, TF_Q_FREQUENCIES, TF_Q_TIME_BINS, TF_Q_PAD]
+            
+            fingerprint = file_fingerprint(file_path)
+            results = []
+            for tile_start in tiles:
+                compute = lambda tile_start=tile_start: compute_tile(tile_start)
+                if self.result_cache is None:
+                    results.append(compute())
+                    continue
+                key = make_cache_key('tf_tile', event_name, detector, fingerprint,
+                                     self.processing_params(), tile_params, tile_start)
+                results.append(self.result_cache.get_or_compute(
+                    key, compute, namespace=f"{event_name}_{detector}",
+                    version=self._cache_version(fingerprint)))
+            if any(result is None for result in results):
+                return None
+            
+            times = np.concatenate([r[0] for r in results])
+            freqs = results[0][1]
+            power = np.concatenate([r[2] for r in results], axis=1)
+            
+            # 裁剪到请求的时间和频率范围
+            time_mask = (times >= start) & (times < end)
+            freq_mask = (freqs >= fmin) & (freqs <= fmax)
+            power = power[np.ix_(freq_mask, time_mask)]
+            if kind == 'qtransform':
+                # 按请求时间范围内各频率行的中位能量统一归一化
+                power = normalize_qtransform(power)
+            logger.info(f"{detector} {kind}: {len(tiles)} 个时频块, 新计算 {len(computed)} 个")
+            return {
+                'kind': kind,
+                'detector': detector,
+                'gps_start': gps_start,
+                'resolution': resolution,
+                'times': times[time_mask],
+                'frequencies': freqs[freq_mask],
+                'power': power,
+                'tiles': len(tiles),
+                'computed_tiles': len(computed)
+            }
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"计算时频图失败 {event_name} {detector}: {e}", exc_info=True)
+            return None
+    
+    def _time_frequency_tile(self, series, kind, tile_start, fmin, fmax, resolution):
+        """计算单个时频块，返回 (时间, 频率, 值[频率, 时间])"""
+        if series is None or len(series) == 0:
+            return None
+        if kind == 'spectrogram':
+            nperseg = max(int(round(resolution * series.sample_rate)), 16)
+            return spectrogram_tile(series.data, series.sample_rate, tile_start, TF_TILE_DURATION,
+                                    nperseg, get_window(nperseg, sym=False), self.fft_backend)
+        
+        frequencies = q_frequencies(fmin, fmax, resolution, TF_Q_FREQUENCIES, series.sample_rate)
+        time_bins = min(TF_Q_TIME_BINS, int(TF_TILE_DURATION * series.sample_rate))
+        return qtransform_tile(series.data, series.sample_rate, tile_start, TF_TILE_DURATION,
+                               frequencies, resolution, time_bins, TF_Q_PAD, self.fft_backend)
+    
+    def compute_detector_correlation(self, event_name, detectors=None):
+        """计算事件所有探测器对的互相关、时间延迟和相干性
+        
+        基于各探测器（已缓存的）白化数据，截取到共同的GPS区间后一次性向量化计算；
+        每个探测器只做一次FFT。少于两个可用探测器时返回None。
+        """
+        try:
+            results = self.analyze_event_data(event_name, detectors, ['whitened'])
+            if not results:
+                return None
+            
+            series = {
+                detector: (result['whitened_data'], result['sample_rate'], result['gps_start'])
+                for detector, result in results['detectors'].items()
+                if result.get('whitened_data') is not None
+            }
+            aligned = align_series(series)
+            if aligned is None:
+                logger.warning(f"事件 {event_name} 没有两个以上可对齐的探测器，无法计算互相关")
+                return None
+            names, data, sample_rate, gps_start = aligned
+            
+            result = correlate_detectors(data, sample_rate, self.correlation_max_delay,
+                                         self.coherence_resolution, self.fft_backend)
+            pairs, _, _ = detector_pairs(names)
+            for (first, second), delay, peak in zip(pairs, result['delay'], result['peak_correlation']):
+                logger.info(f"{first}-{second}: 时间延迟 {delay * 1000:.2f} 毫秒, 相关系数 {peak:.3f}")
+            result.update({
+                'pairs': [f"{first}-{second}" for first, second in pairs],
+                'sample_rate': sample_rate,
+                'gps_start': gps_start,
+                'duration': data.shape[1] / sample_rate
+            })
+            return result
+        except Exception as e:
+            logger.error(f"计算探测器互相关失败 {event_name}: {e}", exc_info=True)
+            return None
+    
+    def compute_statistics(self, data, fft_result=None, psd_result=None):
+        """计算数据统计信息
+        
+        fft_result / psd_result 为已经计算好的 (频率, 幅度) 结果，传入时不再重复计算。
+        """
+        try:
+            if data is None or len(data) == 0:
+                return None
+            series = self._as_timeseries(data)
+            # 时域统计：单遍按块累加各阶矩，块内以双精度计算，避免单精度下溢
+            time_stats = Moments.from_array(series.data).result()
             
             # 频域统计
-            fft_freq, fft_mag = self.compute_fft(data)
-            if fft_freq is not None and fft_mag is not None:
-                # 计算主要频率成分
-                # 使用更低的阈值以捕获更多的重要频率
-                peak_indices = signal.find_peaks(fft_mag, height=np.max(fft_mag)*0.05)[0]
-                peak_freqs = fft_freq[peak_indices]
-                peak_mags = fft_mag[peak_indices]
-                
-                # 按幅度排序
-                sorted_indices = np.argsort(peak_mags)[::-1]
-                peak_freqs = peak_freqs[sorted_indices]
-                peak_mags = peak_mags[sorted_indices]
-                
-                # 获取前5个主要频率
-                main_freqs = peak_freqs[:5]
-                main_mags = peak_mags[:5]
-                
-                # 计算带宽（使用-3dB点）
-                max_mag = np.max(fft_mag)
-                half_power = max_mag / np.sqrt(2)
-                bandwidth_mask = fft_mag >= half_power
-                bandwidth = float(np.sum(bandwidth_mask) * (fft_freq[1] - fft_freq[0]))
-                
-                freq_stats = {
-                    'main_frequencies': [float(f) for f in main_freqs],
-                    'main_magnitudes': [float(m) for m in main_mags],
-                    'bandwidth': bandwidth,
-                    'total_power': float(np.sum(fft_mag**2))
-                }
-            else:
-                freq_stats = {
-                    'main_frequencies': [],
-                    'main_magnitudes': [],
-                    'bandwidth': 0.0,
-                    'total_power': 0.0
-                }
+            fft_freq, fft_mag = fft_result if fft_result is not None else self.compute_fft(series)
+            freq_stats = self._frequency_statistics(fft_freq, fft_mag)
             
             # PSD统计
-            psd_freq, psd_power = self.compute_psd(data)
-            if psd_freq is not None and psd_power is not None:
-                # 计算功率带宽（使用-3dB点）
-                max_power = np.max(psd_power)
-                half_power = max_power / np.sqrt(2)
-                power_bandwidth_mask = psd_power >= half_power
-                power_bandwidth = float(np.sum(power_bandwidth_mask) * (psd_freq[1] - psd_freq[0]))
-                
-                # 改进的信噪比计算
-                # 使用峰值功率与平均功率的比值
-                peak_power = np.max(psd_power)
-                mean_power = np.mean(psd_power)
-                snr = float(peak_power / mean_power) if mean_power > 0 else 0.0
-                
-                psd_stats = {
-                    'mean_power': float(mean_power),
-                    'max_power': float(peak_power),
-                    'power_bandwidth': power_bandwidth,
-                    'snr': snr
-                }
-            else:
-                psd_stats = {
-                    'mean_power': 0.0,
-                    'max_power': 0.0,
-                    'power_bandwidth': 0.0,
-                    'snr': 0.0
-                }
+            psd_freq, psd_power = psd_result if psd_result is not None else self.compute_psd(series)
+            psd_stats = self._psd_statistics(psd_freq, psd_power)
             
             # 合并所有统计信息
             stats = {
@@ -498,11 +1361,93 @@ class DataProcessor:
             logger.error(f"计算统计信息失败: {e}", exc_info=True)
             return None
     
-    def create_visualization_data(self, analysis_results):
-        """创建可视化数据"""
+    def _frequency_statistics(self, fft_freq, fft_mag):
+        """由幅度谱计算主要频率成分、带宽和总功率，没有幅度谱时返回空的统计"""
+        if fft_freq is not None and fft_mag is not None:
+            fft_mag = np.asarray(fft_mag, dtype=np.float64)
+            # 计算主要频率成分
+            # 使用更低的阈值以捕获更多的重要频率
+            peak_indices = signal.find_peaks(fft_mag, height=np.max(fft_mag)*0.05)[0]
+            peak_freqs = fft_freq[peak_indices]
+            peak_mags = fft_mag[peak_indices]
+            
+            # 按幅度排序
+            sorted_indices = np.argsort(peak_mags)[::-1]
+            peak_freqs = peak_freqs[sorted_indices]
+            peak_mags = peak_mags[sorted_indices]
+            
+            # 获取前5个主要频率
+            main_freqs = peak_freqs[:5]
+            main_mags = peak_mags[:5]
+            
+            # 计算带宽（使用-3dB点）
+            max_mag = np.max(fft_mag)
+            half_power = max_mag / np.sqrt(2)
+            bandwidth_mask = fft_mag >= half_power
+            bandwidth = float(np.sum(bandwidth_mask) * (fft_freq[1] - fft_freq[0]))
+            
+            freq_stats = {
+                'main_frequencies': [float(f) for f in main_freqs],
+                'main_magnitudes': [float(m) for m in main_mags],
+                'bandwidth': bandwidth,
+                'total_power': float(np.sum(fft_mag**2))
+            }
+        else:
+            freq_stats = {
+                'main_frequencies': [],
+                'main_magnitudes': [],
+                'bandwidth': 0.0,
+                'total_power': 0.0
+            }
+        return freq_stats
+    
+    def _psd_statistics(self, psd_freq, psd_power):
+        """由功率谱密度计算平均功率、最大功率、功率带宽和峰均比"""
+        if psd_freq is not None and psd_power is not None:
+            # 计算功率带宽（使用-3dB点）
+            max_power = np.max(psd_power)
+            half_power = max_power / np.sqrt(2)
+            power_bandwidth_mask = psd_power >= half_power
+            power_bandwidth = float(np.sum(power_bandwidth_mask) * (psd_freq[1] - psd_freq[0]))
+            
+            # 改进的信噪比计算
+            # 使用峰值功率与平均功率的比值
+            peak_power = np.max(psd_power)
+            mean_power = np.mean(psd_power)
+            snr = float(peak_power / mean_power) if mean_power > 0 else 0.0
+            
+            psd_stats = {
+                'mean_power': float(mean_power),
+                'max_power': float(peak_power),
+                'power_bandwidth': power_bandwidth,
+                'snr': snr
+            }
+        else:
+            psd_stats = {
+                'mean_power': 0.0,
+                'max_power': 0.0,
+                'power_bandwidth': 0.0,
+                'snr': 0.0
+            }
+        return psd_stats
+    
+    def create_visualization_data(self, analysis_results, peak_limit=PEAK_API_LIMIT, array_format='json'):
+        """创建可视化数据，峰值只输出幅度最大的 peak_limit 个
+        
+        array_format 决定数组的表示：'json' 为数字列表，'b64' 为base64类型化数组
+        （{'dtype': 'f4', 'bdata': ...}），'numpy' 保留numpy数组（用于二进制传输和服务端绘图）。
+        """
         try:
             if not analysis_results:
                 return None
+            if array_format == 'json':
+                serialize = self._make_serializable
+            elif array_format == 'b64':
+                serialize = lambda obj: encode_arrays(obj, to_typed_array)
+            elif array_format == 'numpy':
+                serialize = lambda obj: encode_arrays(obj, np.asarray)
+            else:
+                raise ValueError(f"不支持的数组格式: {array_format}")
             
             viz_data = {
                 'detectors': {},
@@ -514,32 +1459,51 @@ class DataProcessor:
             }
             
             # 处理每个探测器的数据
+            # 只输出分析结果中实际包含的产物
             for detector, det_data in analysis_results.get('detectors', {}).items():
-                viz_data['detectors'][detector] = {
-                    'time_series': {
-                        'time': self._make_serializable(det_data.get('time', [])),
-                        'raw_data': self._make_serializable(det_data.get('raw_data', [])),
-                        'processed_data': self._make_serializable(det_data.get('processed_data', []))
-                    },
-                    'fft': {
-                        'frequencies': self._make_serializable(det_data.get('fft_frequencies', [])),
-                        'magnitude': self._make_serializable(det_data.get('fft_magnitude', []))
-                    },
-                    'psd': {
-                        'frequencies': self._make_serializable(det_data.get('psd_frequencies', [])),
-                        'power': self._make_serializable(det_data.get('psd_power', []))
-                    },
-                    'statistics': self._make_serializable(det_data.get('statistics', {}))
-                }
+                det_viz = {}
+                if 'raw_data' in det_data:
+                    det_viz['time_series'] = {
+                        'sample_rate': det_data.get('sample_rate'),
+                        'gps_start': det_data.get('gps_start'),
+                        'time': serialize(det_data.get('time', [])),
+                        'raw_data': serialize(det_data.get('raw_data', [])),
+                        'processed_data': serialize(det_data.get('processed_data', []))
+                    }
+                if 'fft_frequencies' in det_data:
+                    det_viz['fft'] = {
+                        'frequencies': serialize(det_data.get('fft_frequencies', [])),
+                        'magnitude': serialize(det_data.get('fft_magnitude', []))
+                    }
+                if 'psd_frequencies' in det_data:
+                    det_viz['psd'] = {
+                        'frequencies': serialize(det_data.get('psd_frequencies', [])),
+                        'power': serialize(det_data.get('psd_power', []))
+                    }
+                if 'statistics' in det_data:
+                    det_viz['statistics'] = serialize(det_data.get('statistics', {}))
+                if det_data.get('peaks') is not None:
+                    det_viz['peaks'] = serialize(top_peaks(det_data['peaks'], peak_limit))
+                if det_data.get('matched_filter') is not None:
+                    search = det_data['matched_filter']
+                    det_viz['matched_filter'] = serialize({
+                        key: search[key] for key in ('best_chirp_mass', 'best_snr', 'best_time',
+                                                     'best_gps_time', 'chirp_masses', 'max_snr')
+                        if key in search
+                    })
+                if det_data.get('whitened_data') is not None:
+                    whitened = det_data['whitened_data']
+                    det_viz['whitened'] = {
+                        'sample_rate': det_data.get('sample_rate'),
+                        'time': serialize(np.arange(len(whitened)) / det_data.get('sample_rate')),
+                        'data': serialize(whitened)
+                    }
+                viz_data['detectors'][detector] = det_viz
             
-            # 验证数据是否可以JSON序列化
-            try:
-                json.dumps(viz_data)
-                return viz_data
-            except (TypeError, ValueError) as e:
-                logger.error(f"数据无法JSON序列化: {e}")
-                return None
+            return viz_data
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"创建可视化数据失败: {e}", exc_info=True)
             return None
@@ -558,28 +1522,18 @@ class DataProcessor:
             return str(obj)
     
     def save_analysis_results(self, event_name, analysis_results, output_dir=None):
-        """保存分析结果"""
+        """保存分析结果
+        
+        数组写入NPZ（analysis_arrays.npz），事件信息、统计量等其余字段写入JSON元数据
+        （analysis_metadata.json）。可视化数据不再单独保存，需要时对
+        load_analysis_results 的结果调用 create_visualization_data 生成。
+        """
         try:
             if output_dir is None:
                 output_dir = os.path.join(DATA_DIR, event_name, 'analysis')
             
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 保存分析结果
-            results_file = os.path.join(output_dir, 'analysis_results.json')
-            
-            # 转换numpy数组为列表以便JSON序列化
-            serializable_results = self._make_serializable(analysis_results)
-            
-            with open(results_file, 'w', encoding='utf-8') as f:
-                json.dump(serializable_results, f, ensure_ascii=False, indent=2)
-            
-            # 保存可视化数据
-            viz_data = self.create_visualization_data(analysis_results)
-            if viz_data:
-                viz_file = os.path.join(output_dir, 'visualization_data.json')
-                with open(viz_file, 'w', encoding='utf-8') as f:
-                    json.dump(viz_data, f, ensure_ascii=False, indent=2)
+            with span('analysis.save_results'):
+                save_results(output_dir, analysis_results)
             
             logger.info(f"分析结果已保存到: {output_dir}")
             return output_dir
@@ -588,6 +1542,30 @@ class DataProcessor:
             logger.error(f"保存分析结果失败: {e}")
             return None
     
+    def load_analysis_results(self, event_name, output_dir=None):
+        """加载 save_analysis_results 保存的分析结果，数组在首次访问时才从磁盘读取
+        
+        旧版本保存的JSON结果（analysis_results.json）整体读取，数组为列表。
+        """
+        try:
+            if output_dir is None:
+                output_dir = os.path.join(DATA_DIR, event_name, 'analysis')
+            
+            results = load_results(output_dir)
+            if results is not None:
+                return results
+            
+            legacy_file = os.path.join(output_dir, 'analysis_results.json')
+            if not os.path.exists(legacy_file):
+                logger.warning(f"未找到事件 {event_name} 的分析结果: {output_dir}")
+                return None
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+            
+        except Exception as e:
+            logger.error(f"加载分析结果失败: {e}")
+            return None
+    
     def _make_serializable(self, obj):
         """将对象转换为可JSON序列化的格式"""
         if isinstance(obj, dict):
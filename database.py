@@ -3,6 +3,7 @@ import os
 import logging
 from datetime import datetime
 from config import EVENTS_FILE, DATA_FILES_DIR, DOWNLOAD_LOG_FILE, LOG_FILE
+from event_catalog import get_event_catalog
 
 # 配置日志
 logging.basicConfig(
@@ -17,10 +18,12 @@ logger = logging.getLogger(__name__)
 
 class DataManager:
     """本地文件数据管理类"""
-    def __init__(self):
-        self.events_file = EVENTS_FILE
-        self.data_files_dir = DATA_FILES_DIR
-        self.download_log_file = DOWNLOAD_LOG_FILE
+    def __init__(self, events_file=None, data_files_dir=None, download_log_file=None):
+        self.events_file = events_file or EVENTS_FILE
+        self.data_files_dir = data_files_dir or DATA_FILES_DIR
+        self.download_log_file = download_log_file or DOWNLOAD_LOG_FILE
+        # 只读查询使用进程内共享的事件目录缓存，文件变化时自动重新加载
+        self.catalog = get_event_catalog(self.events_file)
         self.init_storage()
 
     def init_storage(self):
@@ -58,6 +61,7 @@ class DataManager:
         try:
             with open(self.events_file, 'w', encoding='utf-8') as f:
                 json.dump(events, f, ensure_ascii=False, indent=2)
+            self.catalog.invalidate()
             logger.info("事件数据保存成功")
         except Exception as e:
             logger.error(f"保存事件数据失败: {e}")
@@ -170,8 +174,7 @@ class DataManager:
     def get_all_events(self):
         """获取所有事件"""
         try:
-            events = self.load_events()
-            return list(events.values())
+            return self.catalog.all()
         except Exception as e:
             logger.error(f"获取事件数据失败: {e}")
             return []
@@ -179,18 +182,11 @@ class DataManager:
     def get_event_by_name(self, event_name):
         """根据名称获取事件"""
         try:
-            events = self.load_events()
-            # 直接查找事件名称
-            if event_name in events:
-                return events[event_name]
-            
-            # 如果直接查找失败，尝试通过common_name查找
-            for key, event_data in events.items():
-                if event_data.get('common_name') == event_name:
-                    return event_data
-            
-            logger.warning(f"未找到事件: {event_name}")
-            return None
+            # 先按事件名称查找，再按common_name查找
+            event_data = self.catalog.get(event_name)
+            if event_data is None:
+                logger.warning(f"未找到事件: {event_name}")
+            return event_data
         except Exception as e:
             logger.error(f"获取事件 {event_name} 失败: {e}")
             return None
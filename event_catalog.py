@@ -0,0 +1,135 @@
+import os
+import copy
+import json
+import logging
+import threading
+
+from config import EVENTS_FILE, DATA_DIR
+from timeseries import parse_gwosc_filename
+
+logger = logging.getLogger(__name__)
+
+
+class EventCatalog:
+    """进程内共享的事件目录缓存
+
+    事件文件只在修改时间或大小变化（或显式invalidate）后重新解析，
+    get 返回事件信息的副本，调用方可以自由修改而不影响缓存。
+    """
+
+    def __init__(self, events_file=EVENTS_FILE):
+        self.events_file = events_file
+        self._events = {}
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """文件变化时重新加载事件目录，调用方需持有锁"""
+        try:
+            stat = os.stat(self.events_file)
+        except FileNotFoundError:
+            self._events, self._signature = {}, None
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with open(self.events_file, 'r', encoding='utf-8') as f:
+            self._events = json.load(f)
+        self._signature = signature
+        logger.info(f"加载事件目录: {len(self._events)} 个事件")
+
+    def invalidate(self):
+        """强制下次访问时重新加载"""
+        with self._lock:
+            self._signature = None
+
+    def names(self):
+        """全部事件名称"""
+        with self._lock:
+            self._refresh()
+            return list(self._events.keys())
+
+    def all(self):
+        """全部事件信息的副本"""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(list(self._events.values()))
+
+    def get(self, event_name):
+        """返回事件信息的副本，先按名称查找，再按common_name查找，不存在时返回None"""
+        with self._lock:
+            self._refresh()
+            event = self._events.get(event_name)
+            if event is None:
+                event = next((e for e in self._events.values() if e.get('common_name') == event_name), None)
+            return copy.deepcopy(event) if event is not None else None
+
+
+class FileManifest:
+    """按事件目录索引的应变数据文件清单
+
+    由文件名解析探测器、采样率、GPS起始时间和时长，代替逐个拼接文件名探测是否存在。
+    每个事件目录的修改时间变化（文件增删）时重新扫描该目录。
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _scan(self, directory):
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                info = parse_gwosc_filename(entry.name) if entry.is_file() else None
+                if not info or info['format'] != 'txt':
+                    continue
+                files.append({
+                    'detector': info['detector'],
+                    'file_path': entry.path,
+                    'sampling_rate': info['sample_rate'],
+                    'gps_start': info['gps_start'],
+                    'duration': info['duration'],
+                    'file_size': entry.stat().st_size
+                })
+        # 按探测器排序，同一探测器的高采样率文件在前
+        files.sort(key=lambda f: (f['detector'], -f['sampling_rate'], f['gps_start']))
+        return files
+
+    def files(self, event_name):
+        """事件目录中的应变数据文件列表（副本），目录不存在时返回空列表"""
+        directory = os.path.join(self.data_dir, event_name)
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        with self._lock:
+            cached = self._entries.get(event_name)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, self._scan(directory))
+                self._entries[event_name] = cached
+                logger.info(f"索引事件 {event_name} 的数据文件: {len(cached[1])} 个")
+            return [dict(f) for f in cached[1]]
+
+
+_catalogs = {}
+_manifests = {}
+_shared_lock = threading.Lock()
+
+
+def get_event_catalog(events_file=EVENTS_FILE):
+    """按事件文件路径共享的事件目录"""
+    with _shared_lock:
+        catalog = _catalogs.get(events_file)
+        if catalog is None:
+            catalog = _catalogs[events_file] = EventCatalog(events_file)
+        return catalog
+
+
+def get_file_manifest(data_dir=DATA_DIR):
+    """按数据目录共享的文件清单"""
+    with _shared_lock:
+        manifest = _manifests.get(data_dir)
+        if manifest is None:
+            manifest = _manifests[data_dir] = FileManifest(data_dir)
+        return manifest
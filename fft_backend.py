@@ -0,0 +1,88 @@
+import os
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+
+import scipy.fft
+
+from config import FFT_BACKEND, FFT_WORKERS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft as pyfftw_scipy_fft
+except ImportError:
+    pyfftw = None
+    pyfftw_scipy_fft = None
+
+
+def _resolve_workers(workers):
+    """None表示使用全部CPU核"""
+    return workers or os.cpu_count() or 1
+
+
+class ScipyFFTBackend:
+    """scipy.fft后端：通过workers参数使用多线程计算变换"""
+
+    name = 'scipy'
+
+    def __init__(self, workers=None):
+        self.workers = _resolve_workers(workers)
+
+    def rfft(self, data):
+        return scipy.fft.rfft(data, workers=self.workers)
+
+    def irfft(self, spectrum, n=None):
+        return scipy.fft.irfft(spectrum, n=n, workers=self.workers)
+
+    @contextmanager
+    def context(self):
+        """在此上下文中，内部使用scipy.fft的函数（如 signal.welch）同样使用多线程"""
+        with scipy.fft.set_workers(self.workers):
+            yield self
+
+    def __repr__(self):
+        return f"{type(self).__name__}(workers={self.workers})"
+
+
+class PyFFTWBackend(ScipyFFTBackend):
+    """pyFFTW后端：缓存并复用相同长度的FFTW计划"""
+
+    name = 'pyfftw'
+
+    def __init__(self, workers=None):
+        super().__init__(workers)
+        # 打开pyFFTW的计划缓存，重复长度的变换不再重新规划
+        pyfftw.interfaces.cache.enable()
+        pyfftw.interfaces.cache.set_keepalive_time(300)
+
+    def rfft(self, data):
+        return pyfftw_scipy_fft.rfft(data, workers=self.workers)
+
+    def irfft(self, spectrum, n=None):
+        return pyfftw_scipy_fft.irfft(spectrum, n=n, workers=self.workers)
+
+    @contextmanager
+    def context(self):
+        with scipy.fft.set_backend(pyfftw_scipy_fft), scipy.fft.set_workers(self.workers):
+            yield self
+
+
+FFT_BACKENDS = {
+    'scipy': ScipyFFTBackend,
+    'pyfftw': PyFFTWBackend
+}
+
+
+@lru_cache(maxsize=None)
+def get_fft_backend(name=FFT_BACKEND, workers=FFT_WORKERS):
+    """按名称获取（进程内共享的）FFT后端，pyFFTW不可用时回退到scipy"""
+    if name not in FFT_BACKENDS:
+        raise ValueError(f"不支持的FFT后端: {name}")
+    if name == 'pyfftw' and pyfftw is None:
+        logger.warning("未安装pyFFTW，FFT后端回退到scipy")
+        name = 'scipy'
+    backend = FFT_BACKENDS[name](workers)
+    logger.info(f"使用FFT后端: {backend}")
+    return backend
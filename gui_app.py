@@ -436,8 +436,11 @@ Pastro: {event['pastro']}
     
     def plot_time_series(self, analysis_results):
         """绘制时间序列"""
-        for detector, data in analysis_results.items():
-            time_axis = np.arange(len(data['processed_data'])) / self.data_processor.sample_rate
+        for detector, data in analysis_results.get('detectors', {}).items():
+            # 各探测器保留文件的原始采样率，使用分析结果中的时间轴
+            time_axis = data.get('time')
+            if time_axis is None:
+                time_axis = np.arange(len(data['processed_data'])) / data['sample_rate']
             self.ax.plot(time_axis, data['processed_data'], label=f'{detector} 探测器', linewidth=0.5)
         
         self.ax.set_xlabel('时间 (秒)')
@@ -448,8 +451,8 @@ Pastro: {event['pastro']}
     
     def plot_fft(self, analysis_results):
         """绘制FFT频谱"""
-        for detector, data in analysis_results.items():
-            self.ax.semilogy(data['frequencies'], data['fft_data'], label=f'{detector} 探测器')
+        for detector, data in analysis_results.get('detectors', {}).items():
+            self.ax.semilogy(data['fft_frequencies'], data['fft_magnitude'], label=f'{detector} 探测器')
         
         self.ax.set_xlabel('频率 (Hz)')
         self.ax.set_ylabel('幅度')
@@ -460,8 +463,8 @@ Pastro: {event['pastro']}
     
     def plot_psd(self, analysis_results):
         """绘制功率谱密度"""
-        for detector, data in analysis_results.items():
-            self.ax.semilogy(data['psd_frequencies'], data['psd_data'], label=f'{detector} 探测器')
+        for detector, data in analysis_results.get('detectors', {}).items():
+            self.ax.semilogy(data['psd_frequencies'], data['psd_power'], label=f'{detector} 探测器')
         
         self.ax.set_xlabel('频率 (Hz)')
         self.ax.set_ylabel('功率谱密度')
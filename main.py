@@ -17,6 +17,7 @@ import sys
 import os
 import argparse
 import logging
+import time
 from pathlib import Path
 
 # 添加项目根目录到Python路径
@@ -135,6 +136,77 @@ def analyze_event(event_name, detectors=None):
         logger.error(f"分析事件失败: {e}")
         return False
 
+def analyze_all_events(event_names=None, pattern=None, workers=None, force=False):
+    """批量分析全部（或指定）已下载事件"""
+    try:
+        from batch_analysis import BatchAnalyzer, print_summary
+        
+        logger.info("开始批量分析事件...")
+        start = time.perf_counter()
+        analyzer = BatchAnalyzer(workers=workers, force=force)
+        summary = analyzer.run(event_names=event_names, pattern=pattern)
+        print_summary(summary, time.perf_counter() - start)
+        
+        failed = [name for name, result in summary.items() if result['status'] == 'failed']
+        if failed:
+            logger.error(f"以下事件分析失败: {', '.join(failed)}")
+        return not failed
+        
+    except Exception as e:
+        logger.error(f"批量分析失败: {e}")
+        return False
+
+def search_event(event_name, detectors=None):
+    """用模板库匹配滤波搜索事件信号，估计啁啾质量"""
+    try:
+        logger.info(f"匹配滤波搜索事件: {event_name}")
+        
+        processor = DataProcessor()
+        results = processor.analyze_event_data(event_name, detectors, products=['matched_filter'])
+        if not results or not results.get('detectors'):
+            logger.error(f"事件 {event_name} 没有可搜索的数据")
+            return False
+        
+        print(f"\n事件 {event_name} 匹配滤波结果（{len(processor.template_bank)} 个模板）:")
+        print(f"{'探测器':<8} {'啁啾质量(M☉)':>14} {'信噪比':>8} {'并合时刻(GPS)':>18}")
+        for detector, data in results['detectors'].items():
+            search = data.get('matched_filter')
+            if not search:
+                print(f"{detector:<8} {'失败':>14}")
+                continue
+            gps_time = search.get('best_gps_time', search['best_time'])
+            print(f"{detector:<8} {search['best_chirp_mass']:>14.2f} {search['best_snr']:>8.2f} {gps_time:>18.4f}")
+        
+        event = results.get('event_info', {})
+        if event.get('chirp_mass_source'):
+            print(f"目录啁啾质量（源参考系）: {event['chirp_mass_source']} M☉")
+        return True
+        
+    except Exception as e:
+        logger.error(f"匹配滤波搜索失败: {e}")
+        return False
+
+def build_noise_atlas():
+    """由全部已下载事件构建探测器噪声图谱"""
+    try:
+        logger.info("开始构建噪声图谱...")
+        processor = DataProcessor()
+        event_names = list(DataManager().load_events().keys())
+        summary = processor.build_noise_atlas(event_names)
+        if not summary:
+            logger.error("没有可用于构建噪声图谱的数据文件")
+            return False
+        
+        print(f"\n噪声图谱（{processor.noise_atlas.atlas_file}）:")
+        print(f"{'观测运行':<10} {'探测器':<8} {'文件数':>6}")
+        for (run, detector), files in sorted(summary.items()):
+            print(f"{run:<10} {detector:<8} {files:>6}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"构建噪声图谱失败: {e}")
+        return False
+
 def download_event(event_name):
     """下载指定事件数据"""
     try:
@@ -255,6 +327,12 @@ def show_help():
     -c, --crawl [LIMIT]     运行爬虫获取事件列表
     -d, --download EVENT    下载指定事件的数据
     -a, --analyze EVENT     分析指定事件的数据
+    --analyze-all [EVENT..] 批量分析全部（或指定）已下载事件
+    --filter PATTERN        批量分析时按通配符筛选事件（如 GW19*）
+    --workers N             批量分析的工作进程数
+    --force                 批量分析时忽略断点，重新分析所有事件
+    --search EVENT          用模板库匹配滤波估计事件的啁啾质量
+    --noise-atlas           由已下载数据构建各观测运行的探测器噪声图谱
     -l, --list              列出所有事件
     -i, --info EVENT        显示事件详细信息
     -s, --setup             设置运行环境
@@ -266,6 +344,9 @@ def show_help():
     python main.py --crawl 5                # 爬取前5个事件
     python main.py --download GW150914      # 下载GW150914事件数据
     python main.py --analyze GW150914       # 分析GW150914事件数据
+    python main.py --analyze-all --workers 8  # 批量分析全部已下载事件
+    python main.py --search GW150914        # 匹配滤波估计GW150914的啁啾质量
+    python main.py --noise-atlas            # 构建探测器噪声图谱
     python main.py --list                   # 列出所有事件
     python main.py --info GW150914          # 显示GW150914详细信息
     python main.py --setup                  # 设置运行环境
@@ -292,6 +373,7 @@ def main():
   python main.py --crawl                  # 爬取事件列表
   python main.py --download GW150914      # 下载GW150914事件数据
   python main.py --analyze GW150914       # 分析GW150914事件数据
+  python main.py --analyze-all --filter 'GW19*' --workers 8
         """
     )
     
@@ -305,6 +387,18 @@ def main():
                        help='下载指定事件的数据')
     parser.add_argument('-a', '--analyze', metavar='EVENT',
                        help='分析指定事件的数据')
+    parser.add_argument('--analyze-all', nargs='*', metavar='EVENT',
+                       help='批量分析全部（或指定）已下载事件')
+    parser.add_argument('--filter', metavar='PATTERN',
+                       help='批量分析时按通配符筛选事件')
+    parser.add_argument('--workers', type=int, metavar='N',
+                       help='批量分析的工作进程数')
+    parser.add_argument('--force', action='store_true',
+                       help='批量分析时忽略断点，重新分析所有事件')
+    parser.add_argument('--search', metavar='EVENT',
+                       help='用模板库匹配滤波估计事件的啁啾质量')
+    parser.add_argument('--noise-atlas', action='store_true',
+                       help='由已下载数据构建探测器噪声图谱')
     parser.add_argument('-l', '--list', action='store_true',
                        help='列出所有事件')
     parser.add_argument('-i', '--info', metavar='EVENT',
@@ -336,6 +430,13 @@ def main():
             download_event(args.download)
         elif args.analyze:
             analyze_event(args.analyze)
+        elif args.analyze_all is not None:
+            analyze_all_events(args.analyze_all, pattern=args.filter,
+                               workers=args.workers, force=args.force)
+        elif args.search:
+            search_event(args.search)
+        elif args.noise_atlas:
+            build_noise_atlas()
         elif args.list:
             list_events()
         elif args.info:
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟GWOSC服务器
+
+提供合成的 allevents JSON、单个事件详情JSON以及gzip压缩的应变数据文件，
+可配置网络延迟和错误率，用于在离线环境下测试和评估 GWOSCCrawler。
+
+用法:
+    python mock_gwosc_server.py --events 20 --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import DURATION
+from synthetic_data import generate_strain, format_gwosc_text, gwosc_filename
+
+logger = logging.getLogger(__name__)
+
+# 合成事件的起始GPS时间（GW150914附近）
+BASE_GPS_TIME = 1126259462
+
+
+class MockGWOSCServer:
+    """模拟GWOSC事件API和数据下载服务"""
+
+    def __init__(self, host='127.0.0.1', port=0, num_events=10, detectors=('H1', 'L1'),
+                 sample_rate=4096, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.num_events = num_events
+        self.detectors = list(detectors)
+        self.sample_rate = sample_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._strain_cache = {}
+
+        # 请求统计
+        self.stats = {
+            'requests': 0,
+            'errors_injected': 0,
+            'bytes_sent': 0,
+            'strain_files': 0
+        }
+
+        self.httpd = ThreadingHTTPServer((host, port), _MockGWOSCHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def allevents_url(self):
+        """与 config.GWOSC_DATA_URL 对应的事件列表地址"""
+        return f"{self.base_url}/eventapi/json/allevents/"
+
+    def start(self):
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"模拟GWOSC服务器已启动: {self.base_url}")
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+        logger.info("模拟GWOSC服务器已停止")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def event_names(self):
+        """合成事件名称列表"""
+        return [f"GW{150914 + i:06d}" for i in range(self.num_events)]
+
+    def _event_gps(self, index):
+        return BASE_GPS_TIME + index * 100000
+
+    def _event_summary(self, index):
+        """allevents 中的单个事件条目"""
+        name = self.event_names()[index]
+        return {
+            'commonName': name,
+            'version': 1,
+            'catalog.shortName': 'MOCK-1',
+            'GPS': self._event_gps(index),
+            'jsonurl': f"{self.base_url}/eventapi/json/event/{name}/",
+            'mass_1_source': 30.0 + index % 10,
+            'mass_1_source_unit': 'M_sun',
+            'mass_2_source': 25.0 + index % 7,
+            'mass_2_source_unit': 'M_sun',
+            'network_matched_filter_snr': 10.0 + index % 5,
+            'luminosity_distance': 400.0 + 10 * index,
+            'luminosity_distance_unit': 'Mpc',
+            'chirp_mass': 24.0 + index % 6,
+            'chirp_mass_unit': 'M_sun'
+        }
+
+    def _event_detail(self, index):
+        """单个事件详情JSON，包含应变数据下载地址"""
+        detail = self._event_summary(index)
+        gps_start = self._event_gps(index) - DURATION // 2
+        detail['strain'] = [
+            {
+                'detector': detector,
+                'GPSstart': gps_start,
+                'sampling_rate': self.sample_rate,
+                'duration': DURATION,
+                'format': 'txt',
+                'url': f"{self.base_url}/strain/{gwosc_filename(detector, self.sample_rate, gps_start)}.gz"
+            }
+            for detector in self.detectors
+        ]
+        return {'events': {self.event_names()[index]: detail}}
+
+    def allevents(self):
+        return {'events': {name: self._event_summary(i) for i, name in enumerate(self.event_names())}}
+
+    def event_detail(self, name):
+        names = self.event_names()
+        if name not in names:
+            return None
+        return self._event_detail(names.index(name))
+
+    def strain_file(self, filename):
+        """返回gzip压缩后的合成应变文件内容（按文件名缓存）"""
+        with self._lock:
+            payload = self._strain_cache.get(filename)
+        if payload is not None:
+            return payload
+
+        # 文件名形如 H-H1_GWOSC_4KHZ_R1-1126259447-32.txt.gz
+        try:
+            stem = filename[:-len('.txt.gz')]
+            prefix, gps_start, duration = stem.rsplit('-', 2)
+            detector = prefix.split('_')[0].split('-')[1]
+            gps_start, duration = int(gps_start), int(duration)
+        except (ValueError, IndexError):
+            return None
+
+        seed = zlib.crc32(filename.encode('ascii'))
+        data = generate_strain(self.sample_rate, duration, seed=seed)
+        payload = gzip.compress(format_gwosc_text(data, detector, self.sample_rate, gps_start, duration),
+                                compresslevel=6)
+        with self._lock:
+            self._strain_cache[filename] = payload
+        return payload
+
+    def inject_fault(self):
+        """模拟网络延迟，并按错误率决定是否返回错误"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if fail:
+                self.stats['errors_injected'] += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def record_sent(self, nbytes, is_strain=False):
+        with self._lock:
+            self.stats['bytes_sent'] += nbytes
+            if is_strain:
+                self.stats['strain_files'] += 1
+
+
+class _MockGWOSCHandler(BaseHTTPRequestHandler):
+    """模拟服务器的HTTP请求处理器"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        mock = self.server.mock
+        if mock.inject_fault():
+            self._send(503, b'{"error": "injected failure"}', 'application/json')
+            return
+
+        path = self.path.split('?', 1)[0]
+        if path.rstrip('/') == '/eventapi/json/allevents':
+            self._send_json(mock.allevents())
+        elif path.startswith('/eventapi/json/event/'):
+            name = path[len('/eventapi/json/event/'):].strip('/')
+            detail = mock.event_detail(name)
+            if detail is None:
+                self._send(404, b'{"error": "not found"}', 'application/json')
+            else:
+                self._send_json(detail)
+        elif path.startswith('/strain/'):
+            payload = mock.strain_file(path[len('/strain/'):])
+            if payload is None:
+                self._send(404, b'not found', 'text/plain')
+            else:
+                self._send(200, payload, 'application/gzip', is_strain=True)
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+    def _send_json(self, obj):
+        self._send(200, json.dumps(obj).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type, is_strain=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if status == 200:
+            self.server.mock.record_sent(len(body), is_strain=is_strain)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟GWOSC服务器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--events', type=int, default=10, help='合成事件数量')
+    parser.add_argument('--rate', type=int, default=4096, choices=[4096, 16384], help='应变数据采样率')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回503错误的概率')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockGWOSCServer(host=args.host, port=args.port, num_events=args.events,
+                             sample_rate=args.rate, latency=args.latency, jitter=args.jitter,
+                             error_rate=args.error_rate)
+    print(f"模拟GWOSC事件列表: {server.allevents_url}")
+    print("按 Ctrl+C 停止服务器")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import math
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 每块的样本数：块内的去均值和幂次运算在缓存中完成，整体只遍历一次数据
+MOMENTS_BLOCK_SIZE = 65536
+
+
+class Moments:
+    """可合并的单遍矩累加器：样本数、均值、2~4阶中心矩之和、最小值和最大值
+
+    update 按块累加，merge 合并来自其他数据块、线程或进程的部分结果（Pébay的合并公式），
+    合并结果与对全部数据一次计算相同。偏度和峰度与 pandas 的 skew()/kurtosis()
+    一致（修正偏差的样本偏度和超额峰度）。
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_array(cls, data, block_size=MOMENTS_BLOCK_SIZE):
+        """对整个数组按块单遍计算"""
+        moments = cls()
+        data = np.asarray(data)
+        for start in range(0, len(data), block_size):
+            moments.update(data[start:start + block_size])
+        return moments
+
+    @classmethod
+    def _from_block(cls, block):
+        block = np.asarray(block, dtype=np.float64)
+        moments = cls()
+        moments.count = len(block)
+        moments.mean = float(np.mean(block))
+        deviation = block - moments.mean
+        squared = np.square(deviation)
+        moments.m2 = float(np.sum(squared))
+        moments.m3 = float(np.dot(squared, deviation))
+        moments.m4 = float(np.dot(squared, squared))
+        moments.min = float(np.min(block))
+        moments.max = float(np.max(block))
+        return moments
+
+    def update(self, block):
+        """累加一块数据（块内直接计算中心矩后合并）"""
+        if len(block) == 0:
+            return self
+        return self.merge(self._from_block(block))
+
+    def merge(self, other):
+        """就地合并另一个累加器的结果，返回self"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+
+        m4 = (self.m4 + other.m4
+              + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta_n ** 2 * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * delta_n * (na * other.m3 - nb * self.m3))
+        m3 = (self.m3 + other.m3
+              + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta_n * (na * other.m2 - nb * self.m2))
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+
+        self.mean += delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return math.nan
+        return self.m2 / (self.count - ddof)
+
+    def skewness(self):
+        """修正偏差的样本偏度（与 pandas Series.skew 相同），少于3个样本时为NaN"""
+        n = self.count
+        if n < 3:
+            return math.nan
+        if self.m2 <= 0:
+            return 0.0
+        g1 = math.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+    def kurtosis(self):
+        """修正偏差的超额峰度（与 pandas Series.kurtosis 相同），少于4个样本时为NaN"""
+        n = self.count
+        if n < 4:
+            return math.nan
+        if self.m2 <= 0:
+            return 0.0
+        g2 = n * self.m4 / self.m2 ** 2 - 3.0
+        return ((n + 1) * g2 + 6.0) * (n - 1) / ((n - 2) * (n - 3))
+
+    def result(self):
+        """时域统计字典，没有数据时返回None"""
+        if self.count == 0:
+            return None
+        variance = self.variance()
+        return {
+            'mean': self.mean,
+            'std': math.sqrt(variance),
+            'min': self.min,
+            'max': self.max,
+            'peak_to_peak': self.max - self.min,
+            # 均方 = 方差 + 均值的平方
+            'rms': math.sqrt(variance + self.mean ** 2),
+            'skewness': self.skewness(),
+            'kurtosis': self.kurtosis()
+        }
@@ -0,0 +1,171 @@
+import os
+import logging
+import tempfile
+import threading
+
+import numpy as np
+
+from config import NOISE_ATLAS_FILE, NOISE_ATLAS_FREQUENCIES, OBSERVING_RUNS
+from timeseries import parse_gwosc_filename
+
+logger = logging.getLogger(__name__)
+
+
+def observing_run(gps_time):
+    """GPS时间所属的观测运行名称，不在任何运行内时返回None"""
+    if gps_time is None:
+        return None
+    for name, start, end in OBSERVING_RUNS:
+        if start <= float(gps_time) < end:
+            return name
+    return None
+
+
+def frequency_grid():
+    """噪声图谱存储使用的对数频率网格"""
+    fmin, fmax, count = NOISE_ATLAS_FREQUENCIES
+    return np.geomspace(fmin, fmax, int(count))
+
+
+def to_grid(freqs, psd, grid):
+    """在对数-对数空间把PSD插值到网格上，超出数据频率范围的点为NaN"""
+    valid = (freqs > 0) & (psd > 0)
+    log_psd = np.interp(np.log(grid), np.log(freqs[valid]), np.log10(psd[valid]),
+                        left=np.nan, right=np.nan)
+    return log_psd
+
+
+class NoiseAtlas:
+    """探测器噪声图谱：每个观测运行、每个探测器的中位数功率谱密度
+
+    以 log10(PSD) 的float32数组存放在一个压缩的NPZ文件中，所有曲线共用同一个对数频率网格。
+    文件修改后自动重新加载。
+    """
+
+    def __init__(self, atlas_file=NOISE_ATLAS_FILE):
+        self.atlas_file = atlas_file
+        self._entries = {}
+        self._frequencies = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(run, detector):
+        return f"{run}__{detector}"
+
+    def _load(self):
+        """文件修改时间变化时重新加载图谱"""
+        try:
+            mtime = os.stat(self.atlas_file).st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._frequencies, self._mtime = {}, None, None
+            return
+        if mtime == self._mtime:
+            return
+
+        entries = {}
+        with np.load(self.atlas_file) as archive:
+            frequencies = archive['frequencies']
+            for name in archive.files:
+                if name.endswith('__log10_psd'):
+                    run, detector, _ = name.split('__')
+                    entries[(run, detector)] = {
+                        'log10_psd': archive[name],
+                        'files': int(archive[f"{run}__{detector}__files"])
+                    }
+        self._entries, self._frequencies, self._mtime = entries, frequencies, mtime
+        logger.info(f"加载噪声图谱: {len(entries)} 条曲线")
+
+    @property
+    def version(self):
+        """图谱文件的修改时间，用作依赖图谱的缓存键"""
+        with self._lock:
+            self._load()
+            return self._mtime
+
+    def list_curves(self):
+        """图谱中的全部曲线（观测运行、探测器、参与统计的文件数）"""
+        with self._lock:
+            self._load()
+            return [{'run': run, 'detector': detector, 'files': entry['files']}
+                    for (run, detector), entry in sorted(self._entries.items())]
+
+    def get(self, detector, run):
+        """返回 (频率, PSD)，图谱中没有该曲线时返回 (None, None)"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get((run, detector))
+            if entry is None:
+                return None, None
+            valid = np.isfinite(entry['log10_psd'])
+            return self._frequencies[valid], 10.0 ** entry['log10_psd'][valid].astype(np.float64)
+
+    def save(self, frequencies, curves):
+        """原子写入图谱文件，curves为 {(run, detector): (log10_psd, files)}"""
+        arrays = {'frequencies': frequencies}
+        for (run, detector), (log_psd, files) in curves.items():
+            arrays[f"{run}__{detector}__log10_psd"] = log_psd.astype(np.float32)
+            arrays[f"{run}__{detector}__files"] = np.int64(files)
+
+        directory = os.path.dirname(self.atlas_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, self.atlas_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def build(self, processor, events):
+        """由已下载的应变数据构建图谱：每个文件估计一次噪声PSD，按观测运行和探测器取中位数
+
+        events 为 {事件名: 事件信息}，返回 {(run, detector): 文件数}。
+        """
+        grid = frequency_grid()
+        groups = {}
+        for event_name, event in events.items():
+            for file_info in event.get('data_files', []):
+                file_path = file_info.get('file_path')
+                detector = file_info.get('detector')
+                if not file_path or not detector or not os.path.exists(file_path):
+                    continue
+                parsed = parse_gwosc_filename(file_path) or {}
+                run = observing_run(event.get('gps_time') or parsed.get('gps_start'))
+                if run is None:
+                    logger.warning(f"无法确定 {event_name} 的观测运行，跳过 {file_path}")
+                    continue
+
+                freqs, psd = processor.noise_psd_for_file(file_path)
+                if freqs is None:
+                    continue
+                groups.setdefault((run, detector), []).append(to_grid(freqs, psd, grid))
+
+        curves = {}
+        for key, rows in groups.items():
+            stacked = np.vstack(rows)
+            # 全部为NaN的频率点（超出所有文件的奈奎斯特频率）保持NaN
+            with np.errstate(all='ignore'):
+                median = np.full(len(grid), np.nan)
+                covered = np.any(np.isfinite(stacked), axis=0)
+                median[covered] = np.nanmedian(stacked[:, covered], axis=0)
+            curves[key] = (median, len(rows))
+
+        self.save(grid, curves)
+        logger.info(f"噪声图谱已保存到: {self.atlas_file}, {len(curves)} 条曲线")
+        return {key: files for key, (_, files) in curves.items()}
+
+
+_shared_atlas = None
+_shared_lock = threading.Lock()
+
+
+def get_noise_atlas():
+    """进程内共享的噪声图谱"""
+    global _shared_atlas
+    with _shared_lock:
+        if _shared_atlas is None:
+            _shared_atlas = NoiseAtlas()
+        return _shared_atlas
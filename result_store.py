@@ -0,0 +1,202 @@
+import os
+import json
+import struct
+import zipfile
+import logging
+import tempfile
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+from config import RESULT_STORE_COMPRESS
+from array_transport import split_arrays, is_array_placeholder, restore_arrays
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE_VERSION = 1
+METADATA_FILE = 'analysis_metadata.json'
+ARRAYS_FILE = 'analysis_arrays.npz'
+# 旧版本保存的JSON文件（数组为缩进的JSON数字列表），保存新格式时删除
+LEGACY_FILES = ('analysis_results.json', 'visualization_data.json')
+
+# 少于该长度的数组不检查是否为等间隔网格
+_GRID_MIN_SIZE = 16
+_LOCAL_HEADER = struct.Struct('<4s22xHH')
+
+
+def _grid(start, step, size):
+    return start + np.arange(size) * step
+
+
+def _uniform_grid(array):
+    """等间隔的一维浮点数组（时间轴、FFT频率轴）返回 (起点, 步长)
+
+    只有由起点和步长重新生成的数组与原数组逐位相同时才返回，否则返回None。
+    """
+    if array.ndim != 1 or array.dtype != np.float64 or array.size < _GRID_MIN_SIZE:
+        return None
+    start = float(array[0])
+    step = float(array[1] - array[0])
+    if step == 0 or not np.isfinite(step) or array[-1] != start + (array.size - 1) * step:
+        return None
+    if not np.array_equal(array, _grid(start, step, array.size)):
+        return None
+    return start, step
+
+
+def _atomic_write(file_path, write):
+    """先写入同目录的临时文件再替换，读取方不会看到写了一半的文件"""
+    directory = os.path.dirname(file_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(file_path)[1])
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_results(output_dir, results, compress=RESULT_STORE_COMPRESS):
+    """保存分析结果：数组写入NPZ（等间隔网格只记录起点和步长），其余字段写入JSON元数据"""
+    metadata, arrays = split_arrays(results)
+    grids = {}
+    for path in list(arrays):
+        grid = _uniform_grid(arrays[path])
+        if grid is not None:
+            grids[path] = [grid[0], grid[1], arrays.pop(path).size]
+
+    os.makedirs(output_dir, exist_ok=True)
+    savez = np.savez_compressed if compress else np.savez
+    _atomic_write(os.path.join(output_dir, ARRAYS_FILE), lambda f: savez(f, **arrays))
+
+    # 元数据最后写入，加载时以元数据文件作为结果存在的标志
+    document = {
+        'version': RESULT_STORE_VERSION,
+        'arrays': ARRAYS_FILE,
+        'grids': grids,
+        'results': metadata
+    }
+    content = json.dumps(document, ensure_ascii=False, indent=2).encode('utf-8')
+    _atomic_write(os.path.join(output_dir, METADATA_FILE), lambda f: f.write(content))
+
+    for name in LEGACY_FILES:
+        legacy_file = os.path.join(output_dir, name)
+        if os.path.exists(legacy_file):
+            os.remove(legacy_file)
+            logger.info(f"删除旧格式的结果文件: {legacy_file}")
+    return output_dir
+
+
+def _memmap_member(file_path, info):
+    """对NPZ中未压缩的 .npy 成员做内存映射，无法映射时返回None"""
+    with open(file_path, 'rb') as f:
+        f.seek(info.header_offset)
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+        if signature != b'PK\x03\x04':
+            return None
+        f.seek(info.header_offset + _LOCAL_HEADER.size + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if dtype.hasobject:
+        return None
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+class _ArrayArchive:
+    """NPZ数组文件的按需读取：未压缩的成员内存映射，压缩的成员在首次访问时解压，结果按路径缓存"""
+
+    def __init__(self, file_path, grids):
+        self.file_path = file_path
+        self.grids = grids
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, path):
+        with self._lock:
+            array = self._arrays.get(path)
+            if array is None:
+                array = self._arrays[path] = self._load(path)
+            return array
+
+    def _load(self, path):
+        if path in self.grids:
+            start, step, size = self.grids[path]
+            return _grid(start, step, size)
+        with zipfile.ZipFile(self.file_path) as archive:
+            info = archive.getinfo(f"{path}.npy")
+            if info.compress_type == zipfile.ZIP_STORED:
+                array = _memmap_member(self.file_path, info)
+                if array is not None:
+                    return array
+            with archive.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+
+
+def _contains_arrays(value):
+    if is_array_placeholder(value):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_arrays(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains_arrays(v) for v in value)
+    return False
+
+
+class StoredResults(Mapping):
+    """从磁盘加载的分析结果（只读映射），结构与 analyze_event_data 的返回值相同
+
+    数组只在被访问时读取；包含数组的子字典同样是 StoredResults，
+    不含数组的字段（事件信息、统计量等）返回普通的字典和列表。
+    """
+
+    def __init__(self, metadata, archive):
+        self._metadata = metadata
+        self._archive = archive
+
+    def _resolve(self, value):
+        if is_array_placeholder(value):
+            return self._archive[value['__array__']]
+        if isinstance(value, dict) and _contains_arrays(value):
+            return StoredResults(value, self._archive)
+        return restore_arrays(value, self._archive.__getitem__)
+
+    def __getitem__(self, key):
+        return self._resolve(self._metadata[key])
+
+    def __iter__(self):
+        return iter(self._metadata)
+
+    def __len__(self):
+        return len(self._metadata)
+
+    def to_dict(self):
+        """读取全部数组，返回普通字典"""
+        return restore_arrays(self._metadata, self._archive.__getitem__)
+
+    def __repr__(self):
+        return f"StoredResults({list(self._metadata)})"
+
+
+def load_results(output_dir):
+    """加载 save_results 保存的分析结果，目录中没有元数据文件时返回None"""
+    metadata_file = os.path.join(output_dir, METADATA_FILE)
+    if not os.path.exists(metadata_file):
+        return None
+    with open(metadata_file, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get('version') != RESULT_STORE_VERSION:
+        raise ValueError(f"不支持的结果文件版本: {document.get('version')}")
+    archive = _ArrayArchive(os.path.join(output_dir, document['arrays']), document.get('grids', {}))
+    return StoredResults(document['results'], archive)
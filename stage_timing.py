@@ -0,0 +1,128 @@
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from config import TIMING_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# 当前请求收集的计时区间列表，未在请求中时为None
+_request_spans = contextvars.ContextVar('request_spans', default=None)
+
+
+class LatencyHistogram:
+    """固定桶的耗时直方图，记录次数、总耗时和最大耗时，分位数按桶上界估计"""
+
+    def __init__(self, buckets=TIMING_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """第q分位数所在桶的上界，落在最后一个桶时返回最大耗时"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        """汇总信息；counts 与桶上界一一对应，最后一个为超出最大上界的次数"""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'counts': list(self.counts)
+        }
+
+
+class TimingRegistry:
+    """进程内按名称汇总的耗时直方图"""
+
+    def __init__(self, buckets=TIMING_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """记录一次耗时；在请求中时同时加入该请求的计时区间"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, seconds))
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+_registry = TimingRegistry()
+
+
+def get_timing_registry():
+    """进程内共享的计时汇总"""
+    return _registry
+
+
+def record_span(name, seconds):
+    _registry.record(name, seconds)
+
+
+@contextmanager
+def span(name):
+    """计时一个代码块并记入直方图"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def begin_request_spans():
+    """开始收集当前请求的计时区间，返回 (token, 区间列表)"""
+    spans = []
+    return _request_spans.set(spans), spans
+
+
+def end_request_spans(token):
+    _request_spans.reset(token)
+
+
+def summarize_spans(spans):
+    """按名称累加同名区间（如多个探测器的同一阶段），保持首次出现的顺序，单位为毫秒"""
+    totals = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds * 1000
+    return {name: round(ms, 3) for name, ms in totals.items()}
+
+
+def server_timing_header(spans):
+    """生成 Server-Timing 响应头的值"""
+    return ', '.join(f"{name};dur={ms:.2f}" for name, ms in summarize_spans(spans).items())
@@ -0,0 +1,91 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+
+def iter_text_blocks(file_path, block_samples):
+    """按块读取GWOSC应变txt文件（支持.gz），每块最多block_samples个数据点"""
+    reader = pd.read_csv(
+        file_path,
+        comment='#',
+        header=None,
+        engine='c',
+        dtype=np.float64,
+        na_filter=False,
+        chunksize=block_samples
+    )
+    with reader:
+        for frame in reader:
+            yield frame.iloc[:, 0].to_numpy()
+
+
+def iter_array_blocks(data, block_samples):
+    """按块遍历数组（如内存映射的缓存文件），每块复制为独立的float64数组"""
+    for start in range(0, len(data), block_samples):
+        yield np.array(data[start:start + block_samples], dtype=np.float64)
+
+
+class StreamingFilter:
+    """逐块的因果SOS滤波，在块之间传递滤波器状态
+
+    与对整段数据一次执行 sosfilt 的结果完全相同；零相位的 sosfiltfilt 需要未来数据，
+    无法流式计算，因此流式模式使用因果滤波。
+    """
+
+    def __init__(self, sos):
+        self.sos = sos
+        self._zi = None
+
+    def process(self, block):
+        if len(block) == 0:
+            return block
+        if self._zi is None:
+            # 以第一个样本初始化稳态，避免起始瞬态
+            self._zi = signal.sosfilt_zi(self.sos) * block[0]
+        filtered, self._zi = signal.sosfilt(self.sos, block, zi=self._zi)
+        return filtered
+
+
+class StreamingWelch:
+    """逐块累加的Welch功率谱密度估计
+
+    块之间保留未用完的样本，分段位置、去均值、加窗和归一化与对整段数据调用
+    signal.welch（detrend='constant', average='mean'）一致，内存只与块大小有关。
+    """
+
+    def __init__(self, sample_rate, nperseg, noverlap=None, window=None, fft_backend=None):
+        self.sample_rate = sample_rate
+        self.nperseg = nperseg
+        self.step = nperseg - (nperseg // 2 if noverlap is None else noverlap)
+        self.window = signal.windows.hann(nperseg, sym=False) if window is None else window
+        self.rfft = fft_backend.rfft if fft_backend is not None else np.fft.rfft
+        self._buffer = np.empty(0)
+        self._sum = np.zeros(nperseg // 2 + 1)
+        self.segments = 0
+
+    def update(self, block):
+        buffer = np.concatenate([self._buffer, block])
+        if len(buffer) >= self.nperseg:
+            count = (len(buffer) - self.nperseg) // self.step + 1
+            segments = sliding_window_view(buffer, self.nperseg)[::self.step][:count]
+            segments = segments - segments.mean(axis=1, keepdims=True)
+            self._sum += np.sum(np.square(np.abs(self.rfft(segments * self.window))), axis=0)
+            self.segments += count
+            buffer = buffer[count * self.step:]
+        self._buffer = buffer.copy()
+
+    def result(self):
+        """返回 (频率, 单边功率谱密度)，数据不足一个分段时返回 (None, None)"""
+        if self.segments == 0:
+            return None, None
+        psd = self._sum / self.segments / (self.sample_rate * np.sum(self.window ** 2))
+        psd[1:] *= 2
+        if self.nperseg % 2 == 0:
+            psd[-1] /= 2
+        freqs = np.fft.rfftfreq(self.nperseg, 1.0 / self.sample_rate)
+        return freqs, psd
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成引力波应变数据
+
+生成与GWOSC txt文件格式一致的确定性合成数据，
+供模拟服务器和基准测试脚本使用，不依赖真实的gwosc.org。
+"""
+
+import os
+import zlib
+
+import numpy as np
+
+from config import DURATION
+from matched_filter import MSUN_SECONDS
+
+# GWOSC文件名中的采样率标记
+RATE_TAGS = {4096: '4KHZ', 16384: '16KHZ'}
+
+
+def gwosc_filename(detector, sample_rate, gps_start, duration=DURATION):
+    """按GWOSC命名规则生成应变数据文件名，例如 H-H1_GWOSC_4KHZ_R1-1126259447-32.txt"""
+    rate_tag = RATE_TAGS.get(sample_rate, f'{sample_rate // 1024}KHZ')
+    return f"{detector[0]}-{detector}_GWOSC_{rate_tag}_R1-{int(gps_start)}-{int(duration)}.txt"
+
+
+def generate_strain(sample_rate, duration=DURATION, seed=0, amplitude=1e-21):
+    """生成确定性的高斯白噪声应变序列"""
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(int(sample_rate * duration)) * amplitude
+
+
+def design_noise_psd(freqs):
+    """aLIGO设计灵敏度的解析近似单边功率谱密度（1/Hz），10 Hz以下取10 Hz处的值"""
+    x = np.maximum(np.asarray(freqs, dtype=np.float64), 10.0) / 215.0
+    return 1e-49 * (x ** -4.14 - 5 * x ** -2 + 111 * (1 - x ** 2 + x ** 4 / 2) / (1 + x ** 2 / 2))
+
+
+def generate_colored_strain(sample_rate, duration=DURATION, seed=0):
+    """生成功率谱密度为 design_noise_psd 的确定性高斯色噪声"""
+    rng = np.random.default_rng(seed)
+    n = int(sample_rate * duration)
+    freqs = np.fft.rfftfreq(n, 1.0 / sample_rate)
+    # 单边PSD为S时，numpy rfft系数的期望 |X|^2 = n * fs * S / 2
+    sigma = np.sqrt(design_noise_psd(freqs) * n * sample_rate / 4)
+    spectrum = (rng.standard_normal(len(freqs)) + 1j * rng.standard_normal(len(freqs))) * sigma
+    spectrum[0] = 0.0
+    if n % 2 == 0:
+        spectrum[-1] = spectrum[-1].real * np.sqrt(2)
+    return np.fft.irfft(spectrum, n)
+
+
+def chirp_waveform(sample_rate, duration=DURATION, chirp_mass=30.0, coalescence_time=None,
+                   amplitude=1e-21, fmin=20.0):
+    """0PN（牛顿阶）啁啾信号的时域波形，在coalescence_time（秒，相对数据起点）并合
+
+    频率从fmin上升到等质量双星的ISCO频率，振幅按 f^(2/3) 增长并归一化到峰值amplitude，
+    起始处用半个Hann窗平滑开启。
+    """
+    n = int(sample_rate * duration)
+    if coalescence_time is None:
+        coalescence_time = duration * 0.75
+    mc = chirp_mass * MSUN_SECONDS
+    tau = coalescence_time - np.arange(n) / sample_rate
+
+    frequency = np.zeros(n)
+    before = tau > 0
+    frequency[before] = (5.0 / 256.0 / tau[before]) ** 0.375 * mc ** -0.625 / np.pi
+    f_isco = 1.0 / (6 ** 1.5 * np.pi * chirp_mass * 2 ** 1.2 * MSUN_SECONDS)
+    active = before & (frequency >= fmin) & (frequency <= f_isco)
+
+    phase = np.zeros(n)
+    phase[active] = -2.0 * (tau[active] / (5.0 * mc)) ** 0.625
+    waveform = np.where(active, (frequency / f_isco) ** (2.0 / 3.0) * np.cos(phase), 0.0)
+
+    indices = np.nonzero(active)[0]
+    if len(indices):
+        ramp = min(len(indices), int(0.1 * sample_rate))
+        waveform[indices[:ramp]] *= np.hanning(2 * ramp)[:ramp]
+    return waveform * amplitude
+
+
+def generate_event_strain(sample_rate, duration=DURATION, seed=0, chirp_mass=30.0,
+                          coalescence_time=None, amplitude=1e-21):
+    """色噪声加注入的啁啾信号，用于基准测试的确定性事件数据"""
+    return (generate_colored_strain(sample_rate, duration, seed)
+            + chirp_waveform(sample_rate, duration, chirp_mass, coalescence_time, amplitude))
+
+
+def format_gwosc_text(data, detector, sample_rate, gps_start, duration=DURATION):
+    """将应变数组格式化为GWOSC txt文件内容（含 # 注释头）"""
+    header = (
+        f"# Gravitational wave strain for {detector}_GWOSC_{RATE_TAGS.get(sample_rate, '')}_R1 "
+        f"for GPS {int(gps_start)} - {int(gps_start + duration)}\n"
+        f"# This file has {int(sample_rate)} samples per second\n"
+        f"# starting GPS {int(gps_start)} duration {int(duration)}\n"
+    )
+    body = '\n'.join(f'{x:.16e}' for x in np.asarray(data).tolist())
+    return (header + body + '\n').encode('ascii')
+
+
+def write_gwosc_file(directory, detector, sample_rate, gps_start, duration=DURATION, seed=None, data=None):
+    """在指定目录写入一个GWOSC格式的txt文件，返回文件路径"""
+    os.makedirs(directory, exist_ok=True)
+    if data is None:
+        if seed is None:
+            seed = zlib.crc32(f'{detector}-{gps_start}'.encode('ascii'))
+        data = generate_strain(sample_rate, duration, seed=seed)
+    file_path = os.path.join(directory, gwosc_filename(detector, sample_rate, gps_start, duration))
+    with open(file_path, 'wb') as f:
+        f.write(format_gwosc_text(data, detector, sample_rate, gps_start, duration))
+    return file_path
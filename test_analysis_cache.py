@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from analysis_cache import AnalysisCache, make_cache_key
+from data_processor import DataProcessor
+
+
+def _cache(tmp_path, **kwargs):
+    return AnalysisCache(cache_dir=str(tmp_path), **kwargs)
+
+
+def _disk_files(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith('.pkl'))
+
+
+def test_new_version_purges_old_version(tmp_path):
+    """写入新版本时同一命名空间下的旧版本从内存和磁盘中清除，其他命名空间不受影响"""
+    cache = _cache(tmp_path)
+    cache.put('a', {'x': np.ones(4)}, namespace='GW_H1', version='v1')
+    cache.put('b', {'x': np.ones(4)}, namespace='GW_L1', version='v1')
+    cache.put('c', {'x': np.zeros(4)}, namespace='GW_H1', version='v2')
+
+    assert [name.split('.')[:2] for name in _disk_files(tmp_path)] == [['GW_H1', 'v2'], ['GW_L1', 'v1']]
+    assert cache.get('a', namespace='GW_H1', version='v1') is None
+    assert cache.get('b', namespace='GW_L1', version='v1') is not None
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    """磁盘缓存超出字节预算时删除最久未访问的文件"""
+    value = {'x': np.arange(1000.0)}
+    cache = _cache(tmp_path, max_bytes=0)
+    cache.put('first', value, namespace='n1')
+    entry_size = os.path.getsize(tmp_path / _disk_files(tmp_path)[0])
+
+    cache = _cache(tmp_path, max_bytes=0, disk_max_bytes=int(entry_size * 2.5))
+    cache.put('second', value, namespace='n2')
+    time.sleep(0.01)
+    # 访问第一个条目后，第二个条目成为最久未访问的条目
+    assert cache.get('first', namespace='n1') is not None
+    time.sleep(0.01)
+    cache.put('third', value, namespace='n3')
+
+    assert cache.get('second', namespace='n2') is None
+    assert cache.get('first', namespace='n1') is not None
+    assert cache.get('third', namespace='n3') is not None
+    assert cache.get_stats()['disk_evictions'] == 1
+    assert cache.get_stats()['disk_bytes'] <= cache.disk_max_bytes
+
+
+def test_cached_arrays_are_read_only(tmp_path):
+    """缓存返回的数组是只读的，修改时报错而不是破坏缓存"""
+    cache = _cache(tmp_path)
+    value = cache.get_or_compute('key', lambda: {'data': np.arange(5.0), 'tiles': (np.ones(2),)})
+    for cached in (value, cache.get('key'), _cache(tmp_path).get('key')):
+        with pytest.raises(ValueError):
+            cached['data'][0] = 1.0
+        with pytest.raises(ValueError):
+            cached['tiles'][0][0] = 1.0
+
+
+def test_cache_version_includes_processing_params():
+    """处理参数变化时缓存版本变化，旧参数的缓存会被清除"""
+    processor = DataProcessor(use_result_cache=False, executor='serial')
+    fingerprint = ['/data/file.txt', 100, 1]
+    version = processor._cache_version(fingerprint)
+    processor.highpass_cutoff = 20
+    assert processor._cache_version(fingerprint) != version
+    assert make_cache_key(fingerprint)[:16] != version
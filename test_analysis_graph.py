@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from analysis_graph import AnalysisGraph
+
+
+def _counting_graph(calls, observer=None):
+    """load -> processed -> (fft, psd)，记录每个阶段的调用次数"""
+    def stage(name, func):
+        def wrapped(*args):
+            calls[name] = calls.get(name, 0) + 1
+            return func(*args)
+        return wrapped
+
+    graph = AnalysisGraph(observer=observer)
+    graph.add_stage('series', stage('series', lambda path: f"data:{path}"), deps=('file_path',))
+    graph.add_stage('processed', stage('processed', lambda series: series.upper()), deps=('series',))
+    graph.add_stage('fft', stage('fft', lambda processed: f"fft({processed})"), deps=('processed',))
+    graph.add_stage('psd', stage('psd', lambda processed: f"psd({processed})"), deps=('processed',))
+    return graph
+
+
+def test_shared_stages_run_once_per_run():
+    """同一次运行中，多个目标共享的中间阶段只计算一次"""
+    calls = {}
+    observed = []
+    graph = _counting_graph(calls, observer=lambda name, seconds: observed.append(name))
+    run = graph.run(file_path='a.txt').compute('fft', 'psd')
+
+    assert run['fft'] == 'fft(DATA:A.TXT)' and run['psd'] == 'psd(DATA:A.TXT)'
+    run.get('psd')
+    assert calls == {'series': 1, 'processed': 1, 'fft': 1, 'psd': 1}
+    assert run.computed_stages() == ['series', 'processed', 'fft', 'psd'] == observed
+
+
+def test_only_requested_stages_run():
+    """只运行目标依赖的阶段，已提供的输出不再计算"""
+    calls = {}
+    graph = _counting_graph(calls)
+    assert graph.plan(['psd'], available=['file_path']) == ['series', 'processed', 'psd']
+    assert graph.plan(['fft', 'psd'], available=['processed']) == ['fft', 'psd']
+
+    run = graph.run(file_path='a.txt', processed='GIVEN').compute('fft')
+    assert run['fft'] == 'fft(GIVEN)'
+    assert calls == {'fft': 1}
+
+    # 每次运行单独记忆，新的运行重新计算
+    graph.run(file_path='b.txt').compute('fft')
+    assert calls == {'fft': 2, 'series': 1, 'processed': 1}
+
+
+def test_cycles_and_unknown_stages_are_rejected():
+    graph = AnalysisGraph()
+    graph.add_stage('a', lambda b: b, deps=('b',))
+    graph.add_stage('b', lambda a: a, deps=('a',))
+    with pytest.raises(ValueError, match='循环依赖'):
+        graph.plan(['a'])
+    with pytest.raises(ValueError, match='未知的分析阶段'):
+        graph.plan(['missing'])
+    with pytest.raises(ValueError, match='已存在'):
+        graph.add_stage('a', lambda: None)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+import numpy as np
+
+from array_transport import (encode_arrays, from_typed_array, pack_npz, to_typed_array,
+                             transport_array, unpack_npz)
+
+
+def _round_trip(array):
+    # 经过JSON编码，确认类型化数组可以直接放入JSON响应
+    return from_typed_array(json.loads(json.dumps(to_typed_array(array))))
+
+
+def test_float_arrays_downcast_when_lossless_range():
+    """float32范围内的浮点数组以float32传输，超出范围（例如 ~1e-46 的PSD）时保留float64"""
+    data = np.linspace(-1.0, 1.0, 101)
+    spec = to_typed_array(data)
+    assert spec['dtype'] == 'f4'
+    np.testing.assert_array_equal(_round_trip(data), data.astype(np.float32))
+
+    tiny = np.array([1e-46, 2e-46, 0.0])
+    assert to_typed_array(tiny)['dtype'] == 'f8'
+    np.testing.assert_array_equal(_round_trip(tiny), tiny)
+
+    # 非有限值不影响范围判断
+    special = np.array([np.nan, np.inf, -np.inf, 1.5])
+    np.testing.assert_array_equal(_round_trip(special), special.astype(np.float32))
+
+
+def test_multidimensional_arrays_keep_shape():
+    data = np.arange(12.0).reshape(3, 4)
+    spec = to_typed_array(data)
+    assert spec['shape'] == '3, 4'
+    restored = _round_trip(data)
+    assert restored.shape == (3, 4)
+    np.testing.assert_array_equal(restored, data)
+
+
+def test_integer_and_boolean_arrays():
+    """64位整数在范围内时以int32传输，超出时为float64；布尔数组以uint8传输"""
+    ints = np.array([-5, 0, 2 ** 31 - 1], dtype=np.int64)
+    assert to_typed_array(ints)['dtype'] == 'i4'
+    np.testing.assert_array_equal(_round_trip(ints), ints)
+
+    assert transport_array(np.array([2 ** 40])).dtype == np.float64
+
+    flags = np.array([True, False, True])
+    assert to_typed_array(flags)['dtype'] == 'u1'
+    np.testing.assert_array_equal(_round_trip(flags).astype(bool), flags)
+
+
+def test_encode_arrays_converts_nested_values():
+    """嵌套对象中的数组和numpy标量被转换，其余值保持不变"""
+    obj = {'a': np.arange(3.0), 'b': [np.float64(1.5), (np.int32(2), 'x')], 'c': None}
+    encoded = encode_arrays(obj, np.ndarray.tolist)
+    assert encoded == {'a': [0.0, 1.0, 2.0], 'b': [1.5, [2, 'x']], 'c': None}
+    assert type(encoded['b'][0]) is float
+
+
+def test_npz_round_trip():
+    """NPZ打包后数组保持原始精度和形状，其余字段保持不变"""
+    obj = {
+        'success': True,
+        'data': {
+            'detectors': {
+                'H1': {'psd': np.array([1e-46, 3e-45]), 'tf': np.ones((2, 3), dtype=np.float32)},
+                'L1': {'peaks': [np.arange(4), {'count': 4}]}
+            },
+            'event': {'name': 'GW150914', 'gps_time': 1126259462.4}
+        }
+    }
+
+    restored = unpack_npz(pack_npz(obj))
+
+    assert restored['success'] is True
+    assert restored['data']['event'] == obj['data']['event']
+    h1 = restored['data']['detectors']['H1']
+    assert h1['psd'].dtype == np.float64
+    np.testing.assert_array_equal(h1['psd'], obj['data']['detectors']['H1']['psd'])
+    assert h1['tf'].dtype == np.float32 and h1['tf'].shape == (2, 3)
+    peaks = restored['data']['detectors']['L1']['peaks']
+    np.testing.assert_array_equal(peaks[0], np.arange(4))
+    assert peaks[1] == {'count': 4}
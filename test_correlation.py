@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import scipy.fft
+from scipy import signal
+
+from correlation import align_series, correlate_detectors, detector_pairs
+
+SAMPLE_RATE = 4096
+N = 8192
+
+
+def _band_limited_noise(seed=0):
+    """加边缘窗的低通噪声，互相关峰足够平滑，抛物线插值可以达到亚采样精度"""
+    rng = np.random.default_rng(seed)
+    sos = signal.butter(8, 300, btype='low', fs=SAMPLE_RATE, output='sos')
+    noise = signal.sosfiltfilt(sos, rng.standard_normal(N))
+    return noise * signal.windows.tukey(N, 0.2)
+
+
+def _delayed(data, samples):
+    """频域移位，延迟可以是非整数个采样"""
+    freqs = scipy.fft.rfftfreq(len(data))
+    return scipy.fft.irfft(scipy.fft.rfft(data) * np.exp(-2j * np.pi * freqs * samples), len(data))
+
+
+@pytest.mark.parametrize('samples', [7, -7, 5.5, -12.3])
+def test_delay_sign_and_subsample_interpolation(samples):
+    """信号先到达第二个探测器时延迟为正，非整数延迟的插值误差小于十分之一个采样"""
+    second = _band_limited_noise()
+    first = _delayed(second, samples)
+
+    result = correlate_detectors(np.vstack([first, second]), SAMPLE_RATE)
+
+    assert result['delay'][0] * SAMPLE_RATE == pytest.approx(samples, abs=0.1)
+    assert result['peak_correlation'][0] > 0.9
+
+
+def test_anticorrelated_pair_and_all_pairs():
+    """反相的探测器对给出负的峰值相关，三个探测器计算全部三个探测器对"""
+    base = _band_limited_noise()
+    data = np.vstack([base, -_delayed(base, 3), _delayed(base, -4)])
+
+    result = correlate_detectors(data, SAMPLE_RATE)
+
+    assert result['correlation'].shape == (3, len(result['lags']))
+    np.testing.assert_allclose(result['delay'] * SAMPLE_RATE, [-3, 4, 7], atol=0.1)
+    np.testing.assert_array_equal(np.sign(result['peak_correlation']), [-1, 1, -1])
+    assert np.all(np.abs(result['peak_correlation']) > 0.9)
+    assert result['coherence'].shape[0] == 3
+    assert np.all(result['coherence'] <= 1 + 1e-9)
+
+
+def test_delay_outside_window_is_not_reported():
+    """只搜索 ±max_delay 内的延迟"""
+    second = _band_limited_noise()
+    first = _delayed(second, 100)
+    result = correlate_detectors(np.vstack([first, second]), SAMPLE_RATE, max_delay=0.010)
+    assert abs(result['delay'][0]) <= 0.010 + 1 / SAMPLE_RATE
+
+
+def test_detector_pairs():
+    names, first, second = detector_pairs(['H1', 'L1', 'V1'])
+    assert names == [('H1', 'L1'), ('H1', 'V1'), ('L1', 'V1')]
+    assert list(first) == [0, 0, 1] and list(second) == [1, 2, 2]
+
+
+def test_align_series_common_interval():
+    """截取到共同的GPS时间区间，采样率不同的探测器被跳过"""
+    rate = 16
+    series = {
+        'H1': (np.arange(64.0), rate, 100.0),
+        'L1': (np.arange(64.0) + 1000, rate, 101.0),
+        'V1': (np.arange(32.0), rate * 2, 100.0)
+    }
+
+    detectors, data, sample_rate, start = align_series(series)
+
+    assert detectors == ['H1', 'L1']
+    assert sample_rate == rate and start == 101.0
+    assert data.shape == (2, 48)
+    np.testing.assert_array_equal(data[0], np.arange(16.0, 64.0))
+    np.testing.assert_array_equal(data[1], np.arange(48.0) + 1000)
+    assert align_series({'H1': series['H1'], 'V1': series['V1']}) is None
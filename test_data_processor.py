@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+from config import ANALYSIS_PROCESS_START_METHOD
+from data_processor import DataProcessor, get_executor
+from synthetic_data import generate_event_strain, write_gwosc_file
+
+EVENT_NAME = 'GWTEST'
+GPS_START = 1126259447
+
+
+class _EventProcessor(DataProcessor):
+    """从给定事件信息读取数据文件的数据处理器"""
+
+    def __init__(self, event, **kwargs):
+        super().__init__(**kwargs)
+        self._event = event
+
+    def get_event_info(self, event_name):
+        return dict(self._event) if event_name == EVENT_NAME else None
+
+
+def _write_event(directory, sample_rate=4096, duration=16):
+    data_files = []
+    for index, detector in enumerate(('H1', 'L1')):
+        strain = generate_event_strain(sample_rate, duration, seed=index)
+        file_path = write_gwosc_file(str(directory), detector, sample_rate, GPS_START,
+                                     duration=duration, data=strain)
+        data_files.append({'detector': detector, 'file_path': file_path})
+    return {'event_id': EVENT_NAME, 'gps_time': GPS_START + duration * 0.75, 'data_files': data_files}
+
+
+def test_worker_settings():
+    """子进程设置使用处理器的实际属性，不包含缓存键的派生字段"""
+    processor = DataProcessor(use_result_cache=False, executor='serial')
+    settings = processor.worker_settings()
+    assert settings['template_bank'] is processor.template_bank
+    assert 'version' not in settings and 'noise_atlas_version' not in settings
+
+
+def test_matched_filter_process_pool(tmp_path):
+    """进程池中的匹配滤波结果与顺序执行相同"""
+    event = _write_event(tmp_path)
+    products = ['matched_filter']
+    serial = _EventProcessor(event, use_strain_cache=False, use_result_cache=False, executor='serial')
+    pooled = _EventProcessor(event, use_strain_cache=False, use_result_cache=False,
+                             executor='process', workers=2)
+
+    expected = serial.analyze_event_data(EVENT_NAME, products=products)
+    results = pooled.analyze_event_data(EVENT_NAME, products=products)
+
+    assert set(results['detectors']) == {'H1', 'L1'}
+    for detector, det_results in results['detectors'].items():
+        search = det_results['matched_filter']
+        assert search is not None
+        reference = expected['detectors'][detector]['matched_filter']
+        assert search['best_chirp_mass'] == reference['best_chirp_mass']
+        assert np.allclose(search['max_snr'], reference['max_snr'])
+
+
+def _worker_fft_threads():
+    import data_processor
+    return data_processor._worker_fft_workers
+
+
+def test_process_pool_limits_fft_threads():
+    """进程池不使用fork启动，每个工作进程的FFT线程数按工作进程数均分CPU核"""
+    executor = get_executor('process', 2)
+    assert executor._mp_context.get_start_method() == ANALYSIS_PROCESS_START_METHOD != 'fork'
+    assert executor.submit(_worker_fft_threads).result() == max(1, (os.cpu_count() or 1) // 2)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import pickle
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from moments import Moments
+
+
+def _data(size=10000, seed=0):
+    """非对称分布、非零均值的数据，偏度和峰度都不为零"""
+    rng = np.random.default_rng(seed)
+    return rng.gamma(2.0, 3.0, size) + 5.0
+
+
+def _assert_matches(moments, data):
+    assert moments.count == len(data)
+    assert moments.mean == pytest.approx(np.mean(data), rel=1e-12)
+    assert moments.variance() == pytest.approx(np.var(data), rel=1e-12)
+    assert moments.variance(ddof=1) == pytest.approx(np.var(data, ddof=1), rel=1e-12)
+    assert moments.skewness() == pytest.approx(stats.skew(data, bias=False), rel=1e-10)
+    assert moments.kurtosis() == pytest.approx(stats.kurtosis(data, fisher=True, bias=False), rel=1e-10)
+    assert moments.min == np.min(data) and moments.max == np.max(data)
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 1000, 65536])
+def test_from_array_matches_scipy(block_size):
+    """按不同块大小单遍计算的结果与 numpy/scipy 对整段数据的计算一致"""
+    data = _data(2000)
+    _assert_matches(Moments.from_array(data, block_size=block_size), data)
+
+
+def test_merge_of_unequal_parts_matches_whole():
+    """合并长度不等、均值不同的部分结果与整段计算一致"""
+    data = np.concatenate([_data(3, seed=1), _data(5000, seed=2) * 10, _data(777, seed=3) - 40])
+    parts = [Moments.from_array(part) for part in np.split(data, [3, 5003])]
+
+    merged = Moments()
+    for part in parts:
+        merged.merge(part)
+
+    _assert_matches(merged, data)
+    # 合并顺序不影响结果
+    reverse = Moments()
+    for part in reversed(parts):
+        reverse.merge(part)
+    _assert_matches(reverse, data)
+
+
+def test_pickle_round_trip():
+    """部分结果可以在进程之间传递"""
+    data = _data(100)
+    moments = pickle.loads(pickle.dumps(Moments.from_array(data)))
+    _assert_matches(moments, data)
+
+
+def test_empty_and_small_samples():
+    """空数据没有统计结果；样本太少时偏度和峰度为NaN，常数数据为0"""
+    empty = Moments.from_array(np.array([]))
+    assert empty.result() is None
+    assert empty.merge(Moments()).count == 0
+    assert math.isnan(Moments.from_array([1.0, 2.0]).skewness())
+    assert math.isnan(Moments.from_array([1.0, 2.0, 3.0]).kurtosis())
+
+    constant = Moments.from_array(np.full(10, 2.5)).result()
+    assert constant['std'] == 0.0 and constant['rms'] == 2.5
+    assert constant['skewness'] == 0.0 and constant['kurtosis'] == 0.0
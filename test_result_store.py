@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from result_store import (ARRAYS_FILE, LEGACY_FILES, METADATA_FILE, StoredResults, _uniform_grid,
+                          load_results, save_results)
+
+
+def _results():
+    time = np.arange(4096) / 4096.0
+    return {
+        'event_info': {'event_id': 'GWTEST', 'gps_time': 1126259462.4},
+        'detectors': {
+            'H1': {
+                'time': time,
+                'processed_data': np.random.default_rng(0).standard_normal(4096) * 1e-21,
+                'fft_frequencies': np.fft.rfftfreq(4096, 1 / 4096.0),
+                'psd_power': np.geomspace(1e-48, 1e-40, 100),
+                'spectrogram': np.arange(12, dtype=np.float32).reshape(3, 4),
+                'peaks': [np.arange(5), {'count': 5}],
+                'statistics': {'time_domain': {'mean': 0.0, 'std': 1e-21}}
+            }
+        }
+    }
+
+
+def _assert_equal(actual, expected):
+    if isinstance(expected, np.ndarray):
+        assert actual.dtype == expected.dtype and actual.shape == expected.shape
+        np.testing.assert_array_equal(actual, expected)
+    elif isinstance(expected, dict):
+        assert set(actual) == set(expected)
+        for key in expected:
+            _assert_equal(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            _assert_equal(a, e)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_round_trip(tmp_path, compress):
+    """保存后加载的结果与原结果逐位相同，子字典按需读取"""
+    results = _results()
+    save_results(str(tmp_path), results, compress=compress)
+
+    loaded = load_results(str(tmp_path))
+
+    assert isinstance(loaded, StoredResults)
+    assert isinstance(loaded['detectors']['H1'], StoredResults)
+    assert loaded['event_info'] == results['event_info']
+    _assert_equal(loaded.to_dict(), results)
+    _assert_equal(dict(loaded['detectors']['H1']), results['detectors']['H1'])
+
+
+def test_uniform_grids_store_start_and_step(tmp_path):
+    """等间隔的时间轴和频率轴只记录起点和步长，不写入NPZ"""
+    save_results(str(tmp_path), _results())
+    with open(tmp_path / METADATA_FILE, encoding='utf-8') as f:
+        grids = json.load(f)['grids']
+    assert set(grids) == {'detectors/H1/time', 'detectors/H1/fft_frequencies'}
+    with np.load(tmp_path / ARRAYS_FILE) as archive:
+        assert 'detectors/H1/time' not in archive.files
+        assert 'detectors/H1/psd_power' in archive.files
+
+
+def test_uniform_grid_detection():
+    assert _uniform_grid(np.arange(100) * 0.25 + 3.0) == (3.0, 0.25)
+    # 非等间隔、过短、非float64或多维的数组不作为网格
+    assert _uniform_grid(np.geomspace(1, 100, 100)) is None
+    jittered = np.arange(100, dtype=np.float64)
+    jittered[50] += 1e-9
+    assert _uniform_grid(jittered) is None
+    assert _uniform_grid(np.arange(4, dtype=np.float64)) is None
+    assert _uniform_grid(np.arange(100, dtype=np.float32)) is None
+    assert _uniform_grid(np.zeros((10, 10))) is None
+    assert _uniform_grid(np.zeros(100)) is None
+
+
+@pytest.mark.parametrize('compress, memmapped', [(False, True), (True, False)])
+def test_uncompressed_members_are_memory_mapped(tmp_path, compress, memmapped):
+    """未压缩的NPZ成员以内存映射读取，压缩的成员解压为普通数组"""
+    results = _results()
+    save_results(str(tmp_path), results, compress=compress)
+
+    detector = load_results(str(tmp_path))['detectors']['H1']
+
+    for key in ('processed_data', 'spectrogram'):
+        assert isinstance(detector[key], np.memmap) == memmapped
+        np.testing.assert_array_equal(detector[key], results['detectors']['H1'][key])
+    # 重复访问返回同一个数组
+    assert detector['processed_data'] is detector['processed_data']
+
+
+def test_legacy_files_removed_and_missing_metadata(tmp_path):
+    """保存新格式时删除旧格式的JSON文件；没有元数据文件时返回None"""
+    assert load_results(str(tmp_path)) is None
+    for name in LEGACY_FILES:
+        (tmp_path / name).write_text('{}', encoding='utf-8')
+
+    save_results(str(tmp_path), _results())
+
+    assert not any(os.path.exists(tmp_path / name) for name in LEGACY_FILES)
+    assert load_results(str(tmp_path)) is not None
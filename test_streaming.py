@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from scipy import signal
+
+from data_processor import DataProcessor, get_filter_sos
+from moments import Moments
+from synthetic_data import generate_event_strain, write_gwosc_file
+
+EVENT_NAME = 'GWTEST'
+GPS_START = 1126259447
+SAMPLE_RATE = 1024
+DURATION = 64
+
+
+class _EventProcessor(DataProcessor):
+    """从给定事件信息读取数据文件的数据处理器"""
+
+    def __init__(self, event, **kwargs):
+        super().__init__(**kwargs)
+        self._event = event
+
+    def get_event_info(self, event_name):
+        return dict(self._event) if event_name == EVENT_NAME else None
+
+
+def _processor(event=None, **kwargs):
+    kwargs = dict(use_strain_cache=False, use_result_cache=False, executor='serial', **kwargs)
+    return _EventProcessor(event, **kwargs) if event is not None else DataProcessor(**kwargs)
+
+
+def _write_file(directory):
+    strain = generate_event_strain(SAMPLE_RATE, DURATION, seed=0)
+    return write_gwosc_file(str(directory), 'H1', SAMPLE_RATE, GPS_START, duration=DURATION, data=strain)
+
+
+def _in_memory(processor, raw):
+    """与流式分析定义相同的整段计算：因果高通滤波、无全局窗函数的Welch功率谱"""
+    sos = get_filter_sos(processor.filter_order, processor.highpass_cutoff, SAMPLE_RATE, 'high')
+    filtered, _ = signal.sosfilt(sos, raw, zi=signal.sosfilt_zi(sos) * raw[0])
+    nperseg = processor.psd_segment_length
+    freqs, power = signal.welch(filtered, fs=SAMPLE_RATE, window=signal.windows.hann(nperseg, sym=False),
+                                nperseg=nperseg, detrend='constant', average='mean')
+    return filtered, freqs, power
+
+
+def _assert_stats_close(actual, expected):
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        np.testing.assert_allclose(actual[key], value, rtol=1e-9, atol=1e-30, err_msg=key)
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    """逐块流式分析的功率谱和统计量与整段计算一致"""
+    file_path = _write_file(tmp_path)
+    processor = _processor()
+    raw = processor.load_data_file(file_path).data.astype(np.float64)
+    filtered, freqs, power = _in_memory(processor, raw)
+
+    streamed = processor.analyze_file_streaming(file_path, block_seconds=5)
+
+    assert streamed['samples'] == len(raw)
+    assert streamed['blocks'] > 1
+    np.testing.assert_allclose(streamed['psd_frequencies'], freqs)
+    np.testing.assert_allclose(streamed['psd_power'], power, rtol=1e-9, atol=0)
+    _assert_stats_close(streamed['raw_statistics'], Moments.from_array(raw).result())
+    _assert_stats_close(streamed['statistics'], Moments.from_array(filtered).result())
+
+
+def test_analyze_event_data_streams_long_files(tmp_path):
+    """数据时长达到阈值时 analyze_event_data 使用流式分析的功率谱和统计量，低于阈值时整段分析"""
+    file_path = _write_file(tmp_path)
+    event = {'event_id': EVENT_NAME, 'gps_time': GPS_START + DURATION / 2,
+             'data_files': [{'detector': 'H1', 'file_path': file_path}]}
+
+    streaming = _processor(event)
+    streaming.stream_min_duration = DURATION
+    results = streaming.analyze_event_data(EVENT_NAME, products=['psd', 'stats', 'fft'])
+    detector = results['detectors']['H1']
+    streamed = streaming.analyze_file_streaming(file_path)
+
+    assert 'fft_magnitude' not in detector
+    np.testing.assert_array_equal(detector['psd_power'], streamed['psd_power'])
+    assert detector['statistics']['time_domain'] == streamed['statistics']
+    assert detector['statistics']['frequency_domain']['main_frequencies'] == []
+    assert detector['statistics']['psd']['max_power'] == float(np.max(streamed['psd_power']))
+
+    in_memory = _processor(event)
+    in_memory.stream_min_duration = DURATION + 1
+    detector = in_memory.analyze_event_data(EVENT_NAME, products=['psd', 'fft'])['detectors']['H1']
+    assert 'fft_magnitude' in detector
+    assert len(detector['psd_power']) == len(streamed['psd_power'])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from scipy import signal
+
+from fft_backend import get_fft_backend
+from time_frequency import (
+    tile_bounds, spectrogram_tile, q_frequencies, qtransform_tile, normalize_qtransform
+)
+
+SAMPLE_RATE = 1024
+
+
+def _noise(duration, seed=0):
+    return np.random.default_rng(seed).normal(size=int(duration * SAMPLE_RATE))
+
+
+def test_tile_bounds():
+    """覆盖请求范围的块起点，裁剪到数据范围内"""
+    assert tile_bounds(0.5, 2.5, 1.0, 8.0) == [0.0, 1.0, 2.0]
+    assert tile_bounds(-1.0, 1.0, 1.0, 8.0) == [0.0]
+    assert tile_bounds(7.5, 20.0, 1.0, 8.0) == [7.0]
+    assert tile_bounds(9.0, 10.0, 1.0, 8.0) == []
+
+
+def test_spectrogram_tiles_concatenate_to_whole():
+    """逐块计算再拼接的谱图与一次计算整个时间范围的结果相同"""
+    data = _noise(8)
+    nperseg = 256
+    window = signal.windows.hann(nperseg, sym=False)
+    backend = get_fft_backend()
+
+    tiles = [spectrogram_tile(data, SAMPLE_RATE, start, 1.0, nperseg, window, backend)
+             for start in tile_bounds(2.0, 6.0, 1.0, 8.0)]
+    times, freqs, power = spectrogram_tile(data, SAMPLE_RATE, 2.0, 4.0, nperseg, window, backend)
+
+    assert np.allclose(np.concatenate([t[0] for t in tiles]), times)
+    assert np.array_equal(tiles[0][1], freqs)
+    assert np.allclose(np.concatenate([t[2] for t in tiles], axis=1), power)
+
+
+def test_qtransform_tiles_concatenate_to_whole():
+    """常Q块两侧补充的数据使逐块拼接的能量与整体计算一致"""
+    data = _noise(8, seed=1)
+    freqs = q_frequencies(30, 200, 8, 12, SAMPLE_RATE)
+    backend = get_fft_backend()
+
+    tiles = [qtransform_tile(data, SAMPLE_RATE, start, 1.0, freqs, 8, 32, 1.0, backend)
+             for start in (2.0, 3.0)]
+    times, _, energy = qtransform_tile(data, SAMPLE_RATE, 2.0, 2.0, freqs, 8, 64, 1.0, backend)
+
+    assert np.allclose(np.concatenate([t[0] for t in tiles]), times)
+    assert np.allclose(np.concatenate([t[2] for t in tiles], axis=1), energy, rtol=1e-2,
+                       atol=1e-3 * energy.mean())
+
+
+def test_qtransform_normalization_is_shared_across_tiles():
+    """归一化使用整个时间范围的参考值：噪声水平不同的块保持真实的能量比例，而不是各自归一化到1"""
+    data = _noise(6, seed=2)
+    data[3 * SAMPLE_RATE:] *= 2.0
+    freqs = q_frequencies(30, 200, 8, 12, SAMPLE_RATE)
+    backend = get_fft_backend()
+
+    tiles = [qtransform_tile(data, SAMPLE_RATE, start, 1.0, freqs, 8, 32, 0.5, backend)
+             for start in (1.0, 2.0, 3.0, 4.0)]
+    energy = normalize_qtransform(np.concatenate([t[2] for t in tiles], axis=1))
+
+    quiet = np.median(energy[:, :64])
+    loud = np.median(energy[:, 64:])
+    assert 3.0 < loud / quiet < 5.0
@@ -0,0 +1,113 @@
+import logging
+
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# 时频图类型
+TF_KINDS = ('spectrogram', 'qtransform')
+
+
+def _padded_chunk(data, start, stop):
+    """取 data[start:stop]，超出数据范围的部分补零"""
+    lo = max(start, 0)
+    hi = min(stop, len(data))
+    chunk = np.zeros(stop - start, dtype=np.float64)
+    if hi > lo:
+        chunk[lo - start:hi - start] = data[lo:hi]
+    return chunk
+
+
+def tile_bounds(start, end, tile_duration, total_duration):
+    """返回覆盖 [start, end) 的所有时频块的起始时间（秒，相对数据起点）"""
+    start = max(0.0, start)
+    end = min(end, total_duration)
+    if end <= start:
+        return []
+    first = int(np.floor(start / tile_duration))
+    last = int(np.ceil(end / tile_duration))
+    return [i * tile_duration for i in range(first, last) if i * tile_duration < total_duration]
+
+
+def spectrogram_tile(data, sample_rate, tile_start, tile_duration, nperseg, window, fft_backend):
+    """计算一个时频块内的短时功率谱密度（所有分段一次批量FFT）
+
+    分段中心均匀分布在块内，相邻分段重叠75%，块边缘的分段使用块外的数据（超出数据范围时补零），
+    因此相邻块拼接后与整体计算的结果一致。返回 (中心时间, 频率, 功率谱密度[频率, 时间])。
+    """
+    hop = max(nperseg // 4, 1)
+    tile_samples = int(round(tile_duration * sample_rate))
+    n_segments = max(tile_samples // hop, 1)
+    first = int(round(tile_start * sample_rate))
+
+    lo = first - nperseg // 2
+    chunk = _padded_chunk(data, lo, first + n_segments * hop + nperseg // 2 + hop)
+    segments = sliding_window_view(chunk, nperseg)[hop // 2::hop][:n_segments]
+
+    spectrum = fft_backend.rfft(segments * window)
+    power = np.square(np.abs(spectrum))
+    # 单边功率谱密度，与 scipy.signal.welch 的 density 归一化一致
+    power *= 2.0 / (sample_rate * np.sum(window ** 2))
+    power[:, 0] /= 2.0
+    if nperseg % 2 == 0:
+        power[:, -1] /= 2.0
+
+    times = (first + hop // 2 + np.arange(n_segments) * hop) / sample_rate
+    freqs = scipy.fft.rfftfreq(nperseg, 1.0 / sample_rate)
+    return times, freqs, power.T
+
+
+def q_frequencies(fmin, fmax, q, n_freqs, sample_rate):
+    """常Q变换的对数均匀频率行，上限受奈奎斯特频率和带宽限制"""
+    bandwidth_factor = np.sqrt(11) / q
+    fmax = min(fmax, sample_rate / 2 / (1 + bandwidth_factor))
+    return np.geomspace(fmin, fmax, n_freqs)
+
+
+def qtransform_tile(data, sample_rate, tile_start, tile_duration, frequencies, q, time_bins,
+                    pad, fft_backend):
+    """计算一个时频块的常Q变换能量（未归一化）
+
+    块两侧各取 pad 秒的数据一起做一次FFT，每个频率行在频域乘以双二次窗，
+    所有频率行一起做一次批量逆FFT得到解析信号，能量按时间分箱。
+    块的结果只取决于数据本身，拼接后由 normalize_qtransform 按整个时间范围统一归一化。
+    返回 (时间箱中心, 频率, 能量[频率, 时间])。
+    """
+    tile_samples = int(round(tile_duration * sample_rate))
+    pad_samples = int(round(pad * sample_rate))
+    first = int(round(tile_start * sample_rate))
+    chunk = _padded_chunk(data, first - pad_samples, first + tile_samples + pad_samples)
+    n = len(chunk)
+
+    spectrum = fft_backend.rfft(chunk)
+    fft_freqs = scipy.fft.rfftfreq(n, 1.0 / sample_rate)
+
+    # 双二次窗：半宽 f0*sqrt(11)/Q
+    half_width = frequencies[:, None] * np.sqrt(11) / q
+    offset = (fft_freqs[None, :] - frequencies[:, None]) / half_width
+    windows = np.where(np.abs(offset) < 1, (1 - offset ** 2) ** 2, 0.0)
+
+    # 只保留正频率得到解析信号，逆变换在所有频率行上批量进行
+    analytic = np.zeros((len(frequencies), n), dtype=np.complex128)
+    analytic[:, :len(fft_freqs)] = 2.0 * spectrum[None, :] * windows
+    with fft_backend.context():
+        energy = np.square(np.abs(scipy.fft.ifft(analytic, axis=1)))
+
+    energy = energy[:, pad_samples:pad_samples + tile_samples]
+
+    edges = np.linspace(0, tile_samples, time_bins + 1).astype(int)
+    binned = np.add.reduceat(energy, edges[:-1], axis=1) / np.diff(edges)[None, :]
+    times = (first + (edges[:-1] + edges[1:]) / 2) / sample_rate
+    return times, frequencies, binned
+
+
+def normalize_qtransform(energy):
+    """常Q能量除以每个频率行在整个时间范围内的中位数
+
+    所有时频块使用同一个参考值，拼接处不会因为各块噪声水平不同而出现接缝。
+    """
+    median = np.median(energy, axis=1, keepdims=True)
+    median[median == 0] = 1.0
+    return energy / median
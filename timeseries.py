@@ -0,0 +1,81 @@
+import os
+import re
+import logging
+
+import numpy as np
+from scipy import signal
+
+logger = logging.getLogger(__name__)
+
+# GWOSC文件名，例如 H-H1_GWOSC_16KHZ_R1-1126259447-32.txt(.gz)
+GWOSC_FILENAME_PATTERN = re.compile(
+    r'^(?P<site>[A-Z])-(?P<detector>[A-Z]\d)_(?P<source>[A-Z]+)_(?P<rate>\d+)KHZ_(?P<release>[A-Z0-9]+)'
+    r'-(?P<gps_start>\d+)-(?P<duration>\d+)\.(?P<format>txt|hdf5|gwf)(?:\.gz)?$',
+    re.IGNORECASE
+)
+
+
+def parse_gwosc_filename(filename):
+    """从GWOSC文件名中解析探测器、采样率、GPS起始时间和时长，无法解析时返回None"""
+    match = GWOSC_FILENAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    return {
+        'detector': match.group('detector').upper(),
+        'sample_rate': int(match.group('rate')) * 1024,
+        'gps_start': int(match.group('gps_start')),
+        'duration': int(match.group('duration')),
+        'format': match.group('format').lower()
+    }
+
+
+class TimeSeries:
+    """带采样率和GPS起始时间的应变时间序列"""
+
+    __slots__ = ('data', 'sample_rate', 'gps_start')
+
+    def __init__(self, data, sample_rate, gps_start=None):
+        self.data = np.asarray(data)
+        self.sample_rate = sample_rate
+        self.gps_start = gps_start
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype)
+
+    def __repr__(self):
+        return (f"TimeSeries(samples={len(self.data)}, sample_rate={self.sample_rate}, "
+                f"gps_start={self.gps_start})")
+
+    @property
+    def dt(self):
+        return 1.0 / self.sample_rate
+
+    @property
+    def duration(self):
+        return len(self.data) / self.sample_rate
+
+    def times(self):
+        """相对于起始时间的时间轴（秒）"""
+        return np.arange(len(self.data)) / self.sample_rate
+
+    def with_data(self, data):
+        """用新的数据数组创建时间序列，保留采样率和GPS起始时间"""
+        return TimeSeries(data, self.sample_rate, self.gps_start)
+
+    def resample(self, sample_rate):
+        """多相滤波重采样到指定采样率"""
+        if sample_rate == self.sample_rate:
+            return self
+        divisor = np.gcd(int(sample_rate), int(self.sample_rate))
+        up = int(sample_rate) // divisor
+        down = int(self.sample_rate) // divisor
+        logger.info(f"多相重采样: {self.sample_rate}Hz -> {sample_rate}Hz (up={up}, down={down})")
+        return TimeSeries(signal.resample_poly(self.data, up, down), sample_rate, self.gps_start)
@@ -1,16 +1,24 @@
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, Response, render_template, jsonify, request, send_file, g
 from flask_cors import CORS
 import os
 import json
+import time
 import logging
 from datetime import datetime
 import plotly.graph_objs as go
 import plotly.utils
+from plotly.subplots import make_subplots
 import numpy as np
 
-from config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG, DATA_DIR
+from config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG, DATA_DIR, PEAK_API_LIMIT, SERVER_TIMING_ENABLED, WEB_ANALYSIS_EXECUTOR
 from database import DataManager
 from data_processor import DataProcessor
+from noise_atlas import get_noise_atlas
+from array_transport import TRANSPORT_FORMATS, NPZ_MIMETYPE, encode_arrays, transport_array, to_typed_array, pack_npz
+from stage_timing import (
+    span, record_span, begin_request_spans, end_request_spans, summarize_spans,
+    server_timing_header, get_timing_registry
+)
 from image_crawler import ImageCrawler
 from image_processor import ImageProcessor
 from image_viewer import ImageManager
@@ -22,11 +30,60 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+@app.before_request
+def start_request_timing():
+    """开始收集本次请求中各分析阶段和序列化步骤的耗时"""
+    g.timing_start = time.perf_counter()
+    g.timing_token, g.timing_spans = begin_request_spans()
+
+@app.after_request
+def attach_request_timing(response):
+    """记录请求总耗时，并在API响应中附加 Server-Timing 头（?debug=1 时附加到JSON的debug字段）"""
+    spans = getattr(g, 'timing_spans', None)
+    if spans is None:
+        return response
+    record_span(f"request.{request.endpoint}", time.perf_counter() - g.timing_start)
+    if not SERVER_TIMING_ENABLED or not request.path.startswith('/api/'):
+        return response
+    
+    response.headers['Server-Timing'] = server_timing_header(spans)
+    if request.args.get('debug') and response.is_json:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body['debug'] = {'timings_ms': summarize_spans(spans)}
+            response.set_data(json.dumps(body))
+    return response
+
+@app.teardown_request
+def end_request_timing(error=None):
+    token = getattr(g, 'timing_token', None)
+    if token is not None:
+        end_request_spans(token)
+        g.timing_token = None
+
 # 初始化组件
 db = DataManager()
-data_processor = DataProcessor()
+# Flask开发服务器是多线程的，探测器分析使用线程池
+data_processor = DataProcessor(executor=WEB_ANALYSIS_EXECUTOR)
 image_manager = ImageManager()
 
+# 时频图类型
+TIME_FREQUENCY_PLOTS = ('spectrogram', 'qtransform')
+
+# 探测器间互相关和相干性图表
+CORRELATION_PLOT = 'correlation'
+
+# 图表API支持的数组传输格式（图表为JSON响应，不支持npz）
+PLOT_TRANSPORT_FORMATS = ('json', 'b64')
+
+# 图表类型对应的分析产物
+PLOT_PRODUCTS = {
+    'time_series': 'time_series',
+    'fft': 'fft',
+    'psd': 'psd',
+    'whitened': 'whitened'
+}
+
 @app.route('/')
 def index():
     """主页"""
@@ -321,21 +378,95 @@ def api_event_data(event_name):
         if detectors:
             detectors = detectors.split(',')
         
+        # 获取请求的分析产物（time_series, fft, psd, peaks, stats），默认全部
+        products = request.args.get('products')
+        if products:
+            products = products.split(',')
+        
+        # 峰值只返回幅度最大的前N个
+        peak_limit = request.args.get('peaks', PEAK_API_LIMIT, type=int)
+        
+        # 数组传输格式：json（数字列表）、b64（base64类型化数组）或 npz（二进制）
+        transport = _transport_format()
+        
         # 分析事件数据
-        analysis_results = data_processor.analyze_event_data(event_name, detectors)
+        with span('web.analyze'):
+            analysis_results = data_processor.analyze_event_data(event_name, detectors, products)
         if not analysis_results:
             return jsonify({'success': False, 'error': '没有找到数据文件'})
         
         # 创建可视化数据
-        viz_data = data_processor.create_visualization_data(analysis_results)
+        with span('web.visualization_data'):
+            viz_data = data_processor.create_visualization_data(
+                analysis_results, peak_limit=peak_limit,
+                array_format='numpy' if transport == 'npz' else transport)
         if not viz_data:
             return jsonify({'success': False, 'error': '无法创建可视化数据'})
         
-        return jsonify({'success': True, 'data': viz_data})
+        with span('web.serialize'):
+            if transport == 'npz':
+                return Response(pack_npz({'success': True, 'data': viz_data}), mimetype=NPZ_MIMETYPE)
+            return jsonify({'success': True, 'data': viz_data})
     except Exception as e:
         logger.error(f"API获取事件数据失败: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/event/<event_name>/noise')
+def api_event_noise(event_name):
+    """API: 获取事件所在观测运行的参考噪声PSD"""
+    try:
+        detectors = request.args.get('detectors')
+        if detectors:
+            detectors = detectors.split(',')
+        
+        reference = data_processor.get_event_reference_psd(event_name, detectors)
+        if reference is None:
+            return jsonify({'success': False, 'error': '事件不存在'})
+        return jsonify({'success': True, 'reference_psd': reference})
+    except Exception as e:
+        logger.error(f"API获取参考噪声PSD失败: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/noise-atlas')
+def api_noise_atlas():
+    """API: 列出噪声图谱中的曲线"""
+    try:
+        return jsonify({'success': True, 'curves': get_noise_atlas().list_curves()})
+    except Exception as e:
+        logger.error(f"API获取噪声图谱失败: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/noise-atlas/<run>/<detector>')
+def api_noise_atlas_curve(run, detector):
+    """API: 获取某个观测运行、某个探测器的中位数PSD"""
+    try:
+        freqs, psd = get_noise_atlas().get(detector, run)
+        if freqs is None:
+            return jsonify({'success': False, 'error': '噪声图谱中没有该曲线'})
+        return jsonify({
+            'success': True,
+            'run': run,
+            'detector': detector,
+            'frequencies': freqs.tolist(),
+            'power': psd.tolist()
+        })
+    except Exception as e:
+        logger.error(f"API获取噪声图谱曲线失败: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/metrics/timing')
+def api_timing_metrics():
+    """API: 各分析阶段、序列化步骤和请求的耗时直方图（秒）"""
+    try:
+        registry = get_timing_registry()
+        histograms = registry.snapshot()
+        if request.args.get('reset'):
+            registry.reset()
+        return jsonify({'success': True, 'buckets': list(registry.buckets), 'timings': histograms})
+    except Exception as e:
+        logger.error(f"API获取耗时统计失败: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/statistics')
 def api_statistics():
     """API: 获取统计信息"""
@@ -402,31 +533,60 @@ def api_plot(event_name, plot_type):
             detectors = detectors.split(',')
         logger.info(f"API /api/plot/{event_name}/{plot_type} 请求参数: detectors={detectors}")
         
-        # 分析事件数据
-        analysis_results = data_processor.analyze_event_data(event_name, detectors)
+        # 图表为JSON响应，数组以数字列表（json）或base64类型化数组（b64，可无损时使用float32）传输，
+        # 不支持npz
+        try:
+            transport = _transport_format(PLOT_TRANSPORT_FORMATS)
+        except ValueError as e:
+            logger.warning(f"图表API请求了不支持的传输格式: {e}")
+            return jsonify({'success': False, 'error': str(e)})
+        
+        # 时频图按时频块计算，支持 start/end/fmin/fmax 参数（平移和缩放）
+        if plot_type in TIME_FREQUENCY_PLOTS:
+            return api_time_frequency_plot(event_name, plot_type, detectors, transport)
+        
+        # 互相关和相干性基于所有探测器对的白化数据
+        if plot_type == CORRELATION_PLOT:
+            return api_correlation_plot(event_name, detectors, transport)
+        
+        if plot_type not in PLOT_PRODUCTS:
+            logger.error(f"不支持的图表类型: {plot_type}")
+            return jsonify({'success': False, 'error': '不支持的图表类型'})
+        
+        # 只计算该图表需要的分析产物
+        with span('web.analyze'):
+            analysis_results = data_processor.analyze_event_data(event_name, detectors, [PLOT_PRODUCTS[plot_type]])
         if not analysis_results:
             logger.error(f"没有找到数据文件: event={event_name}, detectors={detectors}")
             return jsonify({'success': False, 'error': '没有找到数据文件'})
         
         # 创建可视化数据
-        viz_data = data_processor.create_visualization_data(analysis_results)
+        with span('web.visualization_data'):
+            if transport == 'b64':
+                viz_data = data_processor.create_visualization_data(analysis_results, array_format='numpy')
+                viz_data = encode_arrays(viz_data, transport_array) if viz_data else None
+            else:
+                viz_data = data_processor.create_visualization_data(analysis_results)
         if not viz_data:
             logger.error(f"无法创建可视化数据: event={event_name}, detectors={detectors}")
             return jsonify({'success': False, 'error': '无法创建可视化数据'})
         
-        logger.info(f"viz_data: {json.dumps(viz_data)[:500]}")
-        
         # 根据图表类型生成数据
         plot_data = None
-        if plot_type == 'time_series':
-            plot_data = generate_time_series_plot(viz_data)
-        elif plot_type == 'fft':
-            plot_data = generate_fft_plot(viz_data)
-        elif plot_type == 'psd':
-            plot_data = generate_psd_plot(viz_data)
-        else:
-            logger.error(f"不支持的图表类型: {plot_type}")
-            return jsonify({'success': False, 'error': '不支持的图表类型'})
+        with span('web.plot'):
+            if plot_type == 'time_series':
+                plot_data = generate_time_series_plot(viz_data, transport)
+            elif plot_type == 'fft':
+                plot_data = generate_fft_plot(viz_data, transport)
+            elif plot_type == 'psd':
+                # 叠加事件所在观测运行的噪声图谱参考曲线
+                viz_data['reference_psd'] = data_processor.get_event_reference_psd(event_name, detectors)
+                plot_data = generate_psd_plot(viz_data, transport)
+            elif plot_type == 'whitened':
+                plot_data = generate_whitened_plot(viz_data, transport)
+            else:
+                logger.error(f"不支持的图表类型: {plot_type}")
+                return jsonify({'success': False, 'error': '不支持的图表类型'})
         
         if not plot_data:
             logger.error(f"生成图表数据失败: event={event_name}, plot_type={plot_type}")
@@ -434,18 +594,19 @@ def api_plot(event_name, plot_type):
         
         # 确保返回的是有效的JSON数据
         try:
-            # 如果plot_data已经是字符串，尝试解析它
-            if isinstance(plot_data, str):
-                plot_data = json.loads(plot_data)
-            # 如果plot_data是字典，直接使用
-            elif isinstance(plot_data, dict):
-                pass
-            # 其他情况，尝试序列化
-            else:
-                plot_data = json.loads(json.dumps(plot_data))
-            
-            logger.info(f"plot_data: {json.dumps(plot_data)[:500]}")
-            return jsonify({'success': True, 'plot_data': plot_data})
+            with span('web.serialize'):
+                # 如果plot_data已经是字符串，尝试解析它
+                if isinstance(plot_data, str):
+                    plot_data = json.loads(plot_data)
+                # 如果plot_data是字典，直接使用
+                elif isinstance(plot_data, dict):
+                    pass
+                # 其他情况，尝试序列化
+                else:
+                    plot_data = json.loads(json.dumps(plot_data))
+                
+                logger.debug(f"plot_data: {len(plot_data.get('data', []))} 条曲线")
+                return jsonify({'success': True, 'plot_data': plot_data})
         except json.JSONDecodeError as e:
             logger.error(f"JSON解析失败: {e}")
             return jsonify({'success': False, 'error': '图表数据格式错误'})
@@ -454,7 +615,178 @@ def api_plot(event_name, plot_type):
         logger.error(f"API生成图表失败: {e}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)})
 
-def generate_time_series_plot(viz_data):
+def _transport_format(allowed=TRANSPORT_FORMATS):
+    """按 ?format= 参数或 Accept 头（application/x-npz）选择数组传输格式，默认json"""
+    transport = request.args.get('format')
+    if not transport:
+        best = request.accept_mimetypes.best_match(['application/json', NPZ_MIMETYPE])
+        transport = 'npz' if best == NPZ_MIMETYPE else 'json'
+    if transport not in allowed:
+        raise ValueError(f"不支持的传输格式: {transport}，可选: {', '.join(allowed)}")
+    return transport
+
+def _float_arg(name):
+    """读取可选的浮点数查询参数"""
+    value = request.args.get(name)
+    return float(value) if value not in (None, '') else None
+
+def api_time_frequency_plot(event_name, plot_type, detectors, transport='json'):
+    """生成时频图（谱图或常Q变换）"""
+    detector = detectors[0] if detectors else None
+    if not detector:
+        available = data_processor.get_available_detectors(event_name)
+        detector = available[0] if available else None
+    if not detector:
+        return jsonify({'success': False, 'error': '没有找到数据文件'})
+    
+    tf_data = data_processor.compute_time_frequency(
+        event_name, detector, plot_type,
+        start=_float_arg('start'), end=_float_arg('end'),
+        fmin=_float_arg('fmin'), fmax=_float_arg('fmax'),
+        resolution=_float_arg('resolution')
+    )
+    if not tf_data:
+        logger.error(f"生成时频图失败: event={event_name}, detector={detector}, type={plot_type}")
+        return jsonify({'success': False, 'error': '生成时频图失败'})
+    
+    plot_data = generate_time_frequency_plot(tf_data, transport)
+    if not plot_data:
+        return jsonify({'success': False, 'error': '生成图表数据失败'})
+    return jsonify({'success': True, 'plot_data': plot_data})
+
+def api_correlation_plot(event_name, detectors, transport='json'):
+    """生成探测器间互相关和相干性图表"""
+    correlation = data_processor.compute_detector_correlation(event_name, detectors)
+    if not correlation:
+        logger.error(f"计算探测器互相关失败: event={event_name}, detectors={detectors}")
+        return jsonify({'success': False, 'error': '至少需要两个探测器的数据'})
+    
+    plot_data = generate_correlation_plot(correlation, transport)
+    if not plot_data:
+        return jsonify({'success': False, 'error': '生成图表数据失败'})
+    return jsonify({'success': True, 'plot_data': plot_data})
+
+def figure_json(fig, transport='json'):
+    """图表的JSON字典，曲线的numpy数组（x、y、z）按传输格式编码
+    
+    json 时为数字列表，b64 时为base64类型化数组。不依赖plotly的编码方式
+    （plotly 6 的PlotlyJSONEncoder总是把数组编码为类型化数组），以列表给出的数据保持为列表。
+    """
+    encode = to_typed_array if transport == 'b64' else np.ndarray.tolist
+    arrays = {}
+    for index, trace in enumerate(fig.data):
+        for key in ('x', 'y', 'z'):
+            if key in trace and isinstance(trace[key], np.ndarray):
+                arrays[(index, key)] = encode(trace[key])
+                trace[key] = None
+    plot_data = json.loads(plotly.utils.PlotlyJSONEncoder().encode(fig))
+    for (index, key), value in arrays.items():
+        plot_data['data'][index][key] = value
+    return plot_data
+
+def generate_correlation_plot(correlation, transport='json'):
+    """生成互相关（随时间延迟）和相干性（随频率）两个子图"""
+    try:
+        fig = make_subplots(rows=2, cols=1, vertical_spacing=0.15,
+                            subplot_titles=('白化数据互相关', '相干性'))
+        lags_ms = correlation['lags'] * 1000
+        band = (correlation['coherence_frequencies'] >= data_processor.whiten_bandpass[0]) & \
+               (correlation['coherence_frequencies'] <= data_processor.whiten_bandpass[1])
+        for index, pair in enumerate(correlation['pairs']):
+            delay_ms = correlation['delay'][index] * 1000
+            fig.add_trace(go.Scatter(
+                x=lags_ms,
+                y=correlation['correlation'][index],
+                mode='lines',
+                name=f"{pair} (延迟 {delay_ms:.2f} ms)",
+                legendgroup=pair,
+                line=dict(width=1)
+            ), row=1, col=1)
+            fig.add_trace(go.Scatter(
+                x=correlation['coherence_frequencies'][band],
+                y=correlation['coherence'][index][band],
+                mode='lines',
+                name=f"{pair} 相干性",
+                legendgroup=pair,
+                showlegend=False,
+                line=dict(width=1)
+            ), row=2, col=1)
+        
+        fig.update_xaxes(title_text='时间延迟 (毫秒)', gridcolor='lightgray', row=1, col=1)
+        fig.update_yaxes(title_text='归一化互相关', gridcolor='lightgray', row=1, col=1)
+        fig.update_xaxes(title_text='频率 (Hz)', type='log', gridcolor='lightgray', row=2, col=1)
+        fig.update_yaxes(title_text='相干性', range=[0, 1], gridcolor='lightgray', row=2, col=1)
+        fig.update_layout(
+            title='探测器间互相关与相干性',
+            plot_bgcolor='white',
+            hovermode='closest',
+            showlegend=True
+        )
+        
+        plot_data = figure_json(fig, transport)
+        plot_data['config'] = {
+            'displayModeBar': True,
+            'displaylogo': False,
+            'scrollZoom': True
+        }
+        plot_data['correlation'] = {
+            pair: {
+                'delay': float(correlation['delay'][index]),
+                'peak_correlation': float(correlation['peak_correlation'][index])
+            }
+            for index, pair in enumerate(correlation['pairs'])
+        }
+        return plot_data
+    except Exception as e:
+        logger.error(f"生成互相关图表失败: {e}", exc_info=True)
+        return None
+
+def generate_time_frequency_plot(tf_data, transport='json'):
+    """生成时频图热图数据"""
+    try:
+        if tf_data['kind'] == 'spectrogram':
+            # 功率谱密度跨越多个数量级，以对数显示
+            z = np.log10(np.maximum(tf_data['power'], np.finfo(float).tiny))
+            title = f"{tf_data['detector']} 谱图"
+            colorbar_title = 'log10 PSD (1/Hz)'
+        else:
+            z = tf_data['power']
+            title = f"{tf_data['detector']} 常Q变换 (Q={tf_data['resolution']:g})"
+            colorbar_title = '归一化能量'
+        
+        trace = go.Heatmap(
+            x=tf_data['times'],
+            y=tf_data['frequencies'],
+            z=z,
+            colorscale='Viridis',
+            colorbar=dict(title=colorbar_title)
+        )
+        layout = go.Layout(
+            title=title,
+            xaxis=dict(title='时间 (秒)', gridcolor='lightgray'),
+            yaxis=dict(title='频率 (Hz)', type='log', gridcolor='lightgray'),
+            plot_bgcolor='white',
+            hovermode='closest'
+        )
+        
+        fig = go.Figure(data=[trace], layout=layout)
+        plot_data = figure_json(fig, transport)
+        plot_data['config'] = {
+            'displayModeBar': True,
+            'displaylogo': False,
+            'scrollZoom': True
+        }
+        plot_data['time_frequency'] = {
+            'kind': tf_data['kind'],
+            'tiles': tf_data['tiles'],
+            'computed_tiles': tf_data['computed_tiles']
+        }
+        return plot_data
+    except Exception as e:
+        logger.error(f"生成时频图失败: {e}", exc_info=True)
+        return None
+
+def generate_time_series_plot(viz_data, transport='json'):
     """生成时间序列图表数据"""
     try:
         traces = []
@@ -498,7 +830,7 @@ def generate_time_series_plot(viz_data):
         )
         
         fig = go.Figure(data=traces, layout=layout)
-        plot_data = json.loads(plotly.utils.PlotlyJSONEncoder().encode(fig))
+        plot_data = figure_json(fig, transport)
         
         # 添加图表配置
         plot_data['config'] = {
@@ -512,13 +844,53 @@ def generate_time_series_plot(viz_data):
             'scrollZoom': True
         }
         
-        logger.info(f"plot_data: {json.dumps(plot_data)[:500]}")
         return plot_data
     except Exception as e:
         logger.error(f"生成时间序列图表失败: {e}", exc_info=True)
         return None
 
-def generate_fft_plot(viz_data):
+def generate_whitened_plot(viz_data, transport='json'):
+    """生成白化时间序列图表数据"""
+    try:
+        traces = []
+        for detector, det_data in viz_data.get('detectors', {}).items():
+            whitened = det_data.get('whitened', {})
+            if whitened and len(whitened.get('data', [])) > 0:
+                traces.append(go.Scatter(
+                    x=whitened['time'],
+                    y=whitened['data'],
+                    mode='lines',
+                    name=f'{detector} 白化应变',
+                    line=dict(width=1)
+                ))
+        if not traces:
+            logger.error("No valid traces for whitened plot.")
+            return None
+        
+        layout = go.Layout(
+            title='白化并带通滤波后的应变数据',
+            xaxis=dict(title='时间 (秒)', gridcolor='lightgray', showgrid=True),
+            yaxis=dict(title='白化应变 (σ)', gridcolor='lightgray', showgrid=True),
+            plot_bgcolor='white',
+            hovermode='closest',
+            showlegend=True,
+            legend=dict(x=0.01, y=0.99, bgcolor='rgba(255, 255, 255, 0.8)')
+        )
+        
+        fig = go.Figure(data=traces, layout=layout)
+        plot_data = figure_json(fig, transport)
+        plot_data['config'] = {
+            'displayModeBar': True,
+            'modeBarButtonsToRemove': ['select2d', 'lasso2d', 'toggleSpikelines'],
+            'displaylogo': False,
+            'scrollZoom': True
+        }
+        return plot_data
+    except Exception as e:
+        logger.error(f"生成白化图表失败: {e}", exc_info=True)
+        return None
+
+def generate_fft_plot(viz_data, transport='json'):
     """生成FFT图表数据"""
     try:
         traces = []
@@ -571,7 +943,7 @@ def generate_fft_plot(viz_data):
         )
         
         fig = go.Figure(data=traces, layout=layout)
-        plot_data = json.loads(plotly.utils.PlotlyJSONEncoder().encode(fig))
+        plot_data = figure_json(fig, transport)
         
         # 添加图表配置
         plot_data['config'] = {
@@ -590,7 +962,7 @@ def generate_fft_plot(viz_data):
         logger.error(f"生成FFT图表失败: {e}", exc_info=True)
         return None
 
-def generate_psd_plot(viz_data):
+def generate_psd_plot(viz_data, transport='json'):
     """生成功率谱密度图表数据"""
     try:
         traces = []
@@ -613,6 +985,17 @@ def generate_psd_plot(viz_data):
                     )
                     traces.append(trace)
         
+        reference = viz_data.get('reference_psd') or {}
+        for detector, ref in reference.get('detectors', {}).items():
+            trace = go.Scatter(
+                x=ref['frequencies'],
+                y=ref['power'],
+                mode='lines',
+                name=f"{detector} {reference.get('run')} 参考",
+                line=dict(width=1, dash='dash')
+            )
+            traces.append(trace)
+        
         if not traces:
             logger.error("No valid traces for PSD plot.")
             return None
@@ -643,7 +1026,7 @@ def generate_psd_plot(viz_data):
         )
         
         fig = go.Figure(data=traces, layout=layout)
-        plot_data = json.loads(plotly.utils.PlotlyJSONEncoder().encode(fig))
+        plot_data = figure_json(fig, transport)
         
         # 添加图表配置
         plot_data['config'] = {
@@ -685,22 +1068,26 @@ def api_analyze_event(event_name):
             detectors = detectors.split(',')
         logger.info(f"API /api/event/{event_name}/analyze 请求参数: detectors={detectors}")
         
-        # 分析事件数据
-        analysis_results = data_processor.analyze_event_data(event_name, detectors)
+        # 分析事件数据（不需要峰值列表）
+        with span('web.analyze'):
+            analysis_results = data_processor.analyze_event_data(
+                event_name, detectors, ['time_series', 'fft', 'psd', 'stats'])
         if not analysis_results:
             logger.error(f"没有找到数据文件: event={event_name}, detectors={detectors}")
             return jsonify({'success': False, 'error': '没有找到数据文件'})
         
         # 创建可视化数据
-        viz_data = data_processor.create_visualization_data(analysis_results)
+        with span('web.visualization_data'):
+            viz_data = data_processor.create_visualization_data(analysis_results)
         if not viz_data:
             logger.error(f"无法创建可视化数据: event={event_name}, detectors={detectors}")
             return jsonify({'success': False, 'error': '无法创建可视化数据'})
         
         # 生成所有类型的图表数据
-        time_series_plot = generate_time_series_plot(viz_data)
-        fft_plot = generate_fft_plot(viz_data)
-        psd_plot = generate_psd_plot(viz_data)
+        with span('web.plot'):
+            time_series_plot = generate_time_series_plot(viz_data)
+            fft_plot = generate_fft_plot(viz_data)
+            psd_plot = generate_psd_plot(viz_data)
         
         if not all([time_series_plot, fft_plot, psd_plot]):
             logger.error(f"生成图表数据失败: event={event_name}")